@@ -21,8 +21,13 @@ def api_root(request):
             'movies': {
                 'list': '/api/v1/movies/',
                 'search': '/api/v1/movies/search/',
+                'popular_searches': '/api/v1/movies/search/popular/',
+                'suggest': '/api/v1/movies/suggest/?q={prefix}',
                 'genres': '/api/v1/movies/genres/',
+                'facets': '/api/v1/movies/facets/',
+                'recommendations': '/api/v1/movies/recommendations/',
                 'detail': '/api/v1/movies/{tmdb_id}/',
+                'neighbors': '/api/v1/movies/{tmdb_id}/neighbors/',
                 'favorites': '/api/v1/movies/favorites/',
                 'watchlist': '/api/v1/movies/watchlist/',
                 'rating': '/api/v1/movies/{movie_id}/rate/',
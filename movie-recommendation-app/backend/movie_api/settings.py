@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -72,6 +73,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'movies.middleware.QueryStringCanonicalizationMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -238,6 +240,16 @@ TMDB_API_KEY = config('TMDB_API_KEY', default='your-tmdb-api-key')
 TMDB_READ_TOKEN = config('TMDB_READ_TOKEN', default='')
 TMDB_BASE_URL = 'https://api.themoviedb.org/3'
 
+# Search backend for general searches: 'tmdb' (TMDB first, local catalog fallback)
+# or 'local' (local full-text search first, TMDB fallback when nothing matches)
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='tmdb')
+
+# Add pg_trgm title similarity to local search (typo tolerance); needs the pg_trgm extension
+SEARCH_TRIGRAM = config('SEARCH_TRIGRAM', default=False, cast=bool)
+
+# Directory for precomputed recommendation artifacts (memory-mapped .npy files)
+RECOMMENDER_DATA_DIR = config('RECOMMENDER_DATA_DIR', default=str(BASE_DIR / 'recommender_data'))
+
 # Debug: Check if TMDB credentials are loaded
 print(f"Django Settings: TMDB_API_KEY loaded: {'Yes' if TMDB_API_KEY and TMDB_API_KEY != 'your-tmdb-api-key' else 'No'}")
 print(f"Django Settings: TMDB_READ_TOKEN loaded: {'Yes' if TMDB_READ_TOKEN else 'No'}")
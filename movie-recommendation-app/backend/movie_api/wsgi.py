@@ -22,6 +22,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_api.settings')
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
 
+# Map the recommendation ANN indexes and the catalog snapshot once per worker
+from movies.ann import preload_indexes
+from movies.catalog import preload_snapshot
+preload_indexes()
+preload_snapshot()
+
 # Add WhiteNoise for static files in production
 try:
     from whitenoise import WhiteNoise
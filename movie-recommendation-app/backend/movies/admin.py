@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Movie, Favorite, Watchlist, MovieRating
+from .models import Movie, Favorite, Watchlist, MovieRating, MovieNeighbor, RankedListEntry
 
 
 @admin.register(Movie)
@@ -52,3 +52,21 @@ class MovieRatingAdmin(admin.ModelAdmin):
         ('Rating Info', {'fields': ('user', 'movie', 'rating', 'review')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
     )
+
+
+@admin.register(MovieNeighbor)
+class MovieNeighborAdmin(admin.ModelAdmin):
+    """Admin configuration for MovieNeighbor model"""
+    list_display = ('movie', 'rank', 'neighbor', 'score')
+    search_fields = ('movie__title', 'neighbor__title')
+    ordering = ('movie', 'rank')
+    raw_id_fields = ('movie', 'neighbor')
+
+
+@admin.register(RankedListEntry)
+class RankedListEntryAdmin(admin.ModelAdmin):
+    """Admin configuration for RankedListEntry model"""
+    list_display = ('list_key', 'rank', 'movie', 'refreshed_at')
+    list_filter = ('list_key',)
+    ordering = ('list_key', 'rank')
+    raw_id_fields = ('movie',)
@@ -0,0 +1,327 @@
+"""
+Approximate nearest-neighbour search over movie embeddings
+An IVF (inverted file) index in NumPy: vectors are clustered with k-means and
+a query only scans the lists of its closest centroids. Embeddings come from
+the content features (reduced with truncated SVD) or the ALS item factors.
+"""
+
+import time
+import numpy as np
+from scipy.sparse.linalg import svds
+from .cache_service import MovieCacheService
+from .content import ContentFeaturizer, CONTENT_FIELDS
+from .factorization import FactorModel, FACTOR_ARTIFACT
+from .models import Movie
+from .similarity import ArtifactStore, top_scored
+
+
+ANN_SOURCES = ('content', 'factors')
+CONTENT_EMBEDDING_DIMS = 64
+DEFAULT_PROBES = 8  # Inverted lists scanned per query
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000  # Centroids are trained on at most this many vectors
+ASSIGN_BATCH = 10_000
+ANN_DELTA_KEY = 'movie_api:ann:{source}:delta:{build_id}'  # Inserts embedded for one build
+ANN_BUILD_KEY = 'movie_api:ann:{source}:build'  # Published build id, checked on insert instead of the store
+MAX_DELTA_ENTRIES = 20_000  # Further inserts wait for the next build
+ANN_DELTA_TTL = 60 * 60 * 24 * 7  # Refreshed on every insert
+STALE_DELTA_TTL = 60 * 60  # Previous build's delta, for workers that haven't reloaded yet
+ANN_ARRAYS = ('centroids', 'list_offsets', 'ids', 'vectors', 'lookup_ids', 'lookup_rows', 'components')
+
+_indexes = {}
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _delta_entry(movie_id, vector):
+    return np.int64(movie_id).tobytes() + np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def push_delta(client, source, build_id, entries):
+    """Append encoded inserts to a build's delta; returns how many fit under the cap"""
+    delta_key = ANN_DELTA_KEY.format(source=source, build_id=build_id)
+    pipe = client.pipeline()
+    pipe.rpush(delta_key, *entries)
+    # Trimming the tail keeps the offsets workers have already pulled valid
+    pipe.ltrim(delta_key, 0, MAX_DELTA_ENTRIES - 1)
+    pipe.expire(delta_key, ANN_DELTA_TTL)
+    length = pipe.execute()[0]
+    return len(entries) - max(0, length - MAX_DELTA_ENTRIES)
+
+
+def _nearest_centroids(vectors, centroids):
+    """Index of the most similar centroid for each vector, in bounded batches"""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        assignments[start:start + ASSIGN_BATCH] = np.argmax(vectors[start:start + ASSIGN_BATCH] @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors, n_lists, iterations=KMEANS_ITERATIONS, seed=0):
+    """Spherical k-means on unit-length copies of the vectors"""
+    rng = np.random.default_rng(seed)
+    sample = _normalize(vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)])
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _nearest_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        # Empty lists are re-seeded from random sample points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+def build_ivf(ids, vectors, n_lists=None, seed=0):
+    """Arrays of an IVF index over (Movie id, vector) rows"""
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_lists = n_lists or max(1, int(4 * np.sqrt(len(ids))))
+    n_lists = min(n_lists, len(ids))
+
+    centroids = train_centroids(vectors, n_lists, seed=seed)
+    assignments = _nearest_centroids(_normalize(vectors), centroids)
+    order = np.argsort(assignments, kind='stable')
+    list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+
+    ordered_ids = ids[order]
+    lookup = np.argsort(ordered_ids)
+    return {
+        'centroids': centroids,
+        'list_offsets': list_offsets.astype(np.int64),
+        'ids': ordered_ids,
+        'vectors': vectors[order],
+        'lookup_ids': ordered_ids[lookup],
+        'lookup_rows': lookup.astype(np.int64),
+    }
+
+
+class MovieEmbeddingIndex:
+    """
+    IVF index over one embedding source, plus a delta of inserted movies
+
+    The IVF arrays are a published artifact, memory-mapped read-only. Movies
+    synced after the build are embedded with that build's projection and
+    appended to a Redis list keyed by its build id by `insert_movie`; each
+    worker pulls new entries into a small in-process delta that is scanned
+    exactly next to the probed lists. The next build reads those movies
+    from the database and starts a delta of its own, so offsets never shift
+    under a worker.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.store = ArtifactStore(f'ann-{source}')
+        self.build_key = ANN_BUILD_KEY.format(source=source)
+        self.build_id = None
+        self.arrays = None
+        self.metadata = None
+        self.featurizer = None
+        self.delta_offset = 0
+        self.delta_ids = np.empty(0, dtype=np.int64)
+        self.delta_vectors = None
+
+    @classmethod
+    def get(cls, source):
+        """Per-process index, reloaded when a new build is published"""
+        index = _indexes.get(source)
+        if index is None:
+            index = _indexes[source] = cls(source)
+        index.refresh()
+        return index if index.arrays is not None else None
+
+    def refresh(self):
+        build_id = self.store.current_build()
+        if build_id != self.build_id:
+            self.arrays = self.store.load(ANN_ARRAYS, build_id)
+            self.metadata = self.store.load_metadata(build_id) or {}
+            self.featurizer = (
+                ContentFeaturizer.from_dict(self.metadata['featurizer']) if 'featurizer' in self.metadata else None
+            )
+            self.build_id = build_id
+            self.reset_delta()
+        if self.arrays is not None:
+            self.pull_delta()
+
+    def reset_delta(self):
+        self.delta_offset = 0
+        self.delta_ids = np.empty(0, dtype=np.int64)
+        self.delta_vectors = None
+
+    def pull_delta(self):
+        """Fetch movies inserted since the last pull"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return
+        delta_key = ANN_DELTA_KEY.format(source=self.source, build_id=self.build_id)
+        try:
+            pipe = client.pipeline()
+            pipe.llen(delta_key)
+            pipe.lrange(delta_key, self.delta_offset, -1)
+            length, entries = pipe.execute()
+            if length < self.delta_offset:
+                # The list expired and was started again
+                self.reset_delta()
+                entries = client.lrange(delta_key, 0, -1)
+        except Exception as e:
+            print(f"⚠️ ANN delta error for {self.source}: {e}")
+            return
+        if not entries:
+            return
+
+        dims = self.arrays['vectors'].shape[1]
+        ids = np.array([np.frombuffer(entry[:8], dtype=np.int64)[0] for entry in entries], dtype=np.int64)
+        vectors = np.stack([np.frombuffer(entry[8:], dtype=np.float32) for entry in entries]).reshape(-1, dims)
+        if self.delta_vectors is not None:
+            # A movie both swept in by the build and inserted by a worker keeps one row
+            kept = ~np.isin(self.delta_ids, ids)
+            self.delta_ids = self.delta_ids[kept]
+            self.delta_vectors = self.delta_vectors[kept]
+        self.delta_ids = np.concatenate([self.delta_ids, ids])
+        self.delta_vectors = vectors if self.delta_vectors is None else np.vstack([self.delta_vectors, vectors])
+        self.delta_offset += len(entries)
+
+    def vector_for(self, movie_id):
+        """Stored embedding of a Movie id, from the build or the delta"""
+        lookup_ids = self.arrays['lookup_ids']
+        position = np.searchsorted(lookup_ids, movie_id)
+        if position < len(lookup_ids) and lookup_ids[position] == movie_id:
+            return np.asarray(self.arrays['vectors'][self.arrays['lookup_rows'][position]])
+
+        matches = np.flatnonzero(self.delta_ids == movie_id)
+        if len(matches):
+            return self.delta_vectors[matches[-1]]
+        return None
+
+    def search(self, query, limit, probes=DEFAULT_PROBES, exclude_ids=()):
+        """Top (Movie id, score) pairs by inner product with `query`"""
+        centroids = self.arrays['centroids']
+        offsets = self.arrays['list_offsets']
+        probes = min(probes, len(centroids))
+        closest = np.argpartition(-(centroids @ _normalize(query)), probes - 1)[:probes]
+
+        rows = np.concatenate([np.arange(offsets[list_id], offsets[list_id + 1]) for list_id in closest])
+        candidate_ids = self.arrays['ids'][rows]
+        scores = self.arrays['vectors'][rows] @ query
+        if self.delta_vectors is not None:
+            candidate_ids = np.concatenate([candidate_ids, self.delta_ids])
+            scores = np.concatenate([scores, self.delta_vectors @ query])
+
+        return top_scored(candidate_ids, scores, limit, exclude_ids)
+
+    def exact_search(self, query, limit, exclude_ids=()):
+        """Brute-force search over every vector (reference for benchmarks)"""
+        candidate_ids = np.asarray(self.arrays['ids'])
+        scores = self.arrays['vectors'] @ query
+        if self.delta_vectors is not None:
+            candidate_ids = np.concatenate([candidate_ids, self.delta_ids])
+            scores = np.concatenate([scores, self.delta_vectors @ query])
+        return top_scored(candidate_ids, scores, limit, exclude_ids)
+
+    def similar(self, movie_id, limit=20, probes=DEFAULT_PROBES):
+        """Nearest movies to an indexed movie, or None if it has no embedding"""
+        vector = self.vector_for(movie_id)
+        if vector is None:
+            return None
+        return self.search(vector, limit, probes, exclude_ids={movie_id})
+
+    def embed_movies(self, movies):
+        """Content embeddings for Movie rows, projected with the build's SVD components"""
+        features = self.featurizer.transform(movies)
+        return _normalize(np.asarray(features @ self.arrays['components'].T, dtype=np.float32))
+
+    @classmethod
+    def insert(cls, source, movie):
+        """
+        Make a newly synced movie searchable without a rebuild (content source only)
+
+        Uses this process's index as loaded; the store is only re-read when
+        Redis says a newer build was published, so the embedding always
+        matches the build whose delta it is appended to.
+        """
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return False
+        try:
+            index = _indexes.get(source)
+            published = client.get(ANN_BUILD_KEY.format(source=source))
+            if index is None or (published is not None and published.decode() != index.build_id):
+                index = cls.get(source)
+            if index is None or index.featurizer is None:
+                return False
+            vector = index.embed_movies([movie])[0]
+            return push_delta(client, source, index.build_id, [_delta_entry(movie.id, vector)]) == 1
+        except Exception as e:
+            print(f"⚠️ ANN insert error for movie {movie.id}: {e}")
+            return False
+
+    @staticmethod
+    def build(source, n_lists=None, dims=CONTENT_EMBEDDING_DIMS):
+        """Build and publish the index for a source; returns (build id, vector count)"""
+        store = ArtifactStore(f'ann-{source}')
+        previous_build = store.current_build()
+        metadata = {'source': source}
+        if source == 'content':
+            movies = list(Movie.objects.only(*CONTENT_FIELDS).order_by('id'))
+            if len(movies) < 2:
+                return None, 0
+            featurizer = ContentFeaturizer().fit(movies)
+            features = featurizer.transform(movies)
+            dims = max(1, min(dims, min(features.shape) - 1))
+            _, _, components = svds(features.astype(np.float64), k=dims)
+            components = components.astype(np.float32)
+            ids = np.array([movie.id for movie in movies], dtype=np.int64)
+            vectors = _normalize(np.asarray(features @ components.T, dtype=np.float32))
+            metadata['featurizer'] = featurizer.to_dict()
+        elif source == 'factors':
+            factors = FactorModel.load()
+            if factors is None:
+                return None, 0
+            ids = np.array(factors['item_ids'])
+            vectors = np.array(factors['item_factors'])
+            components = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            metadata['factor_build'] = ArtifactStore(FACTOR_ARTIFACT).current_build()
+        else:
+            raise ValueError(f'Unknown ANN source: {source}')
+
+        started = time.monotonic()
+        arrays = build_ivf(ids, vectors, n_lists=n_lists)
+        arrays['components'] = components
+        metadata['build_seconds'] = round(time.monotonic() - started, 2)
+        build_id = store.save(arrays, metadata)
+
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.set(ANN_BUILD_KEY.format(source=source), build_id)
+                if previous_build:
+                    pipe.expire(ANN_DELTA_KEY.format(source=source, build_id=previous_build), STALE_DELTA_TTL)
+                pipe.execute()
+
+                if source == 'content':
+                    # Movies synced while the build ran went to the previous delta
+                    late = list(Movie.objects.only(*CONTENT_FIELDS).filter(id__gt=ids.max()).order_by('id'))
+                    if late:
+                        late_vectors = _normalize(np.asarray(featurizer.transform(late) @ components.T, dtype=np.float32))
+                        push_delta(client, source, build_id, [
+                            _delta_entry(movie.id, vector) for movie, vector in zip(late, late_vectors)
+                        ])
+            except Exception as e:
+                print(f"⚠️ ANN delta publish error for {source}: {e}")
+        return build_id, len(ids)
+
+
+def preload_indexes():
+    """Map published indexes at worker start so the first request doesn't pay for it"""
+    for source in ANN_SOURCES:
+        try:
+            MovieEmbeddingIndex.get(source)
+        except Exception as e:
+            print(f"⚠️ ANN preload error for {source}: {e}")
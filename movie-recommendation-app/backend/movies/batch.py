@@ -0,0 +1,119 @@
+"""
+Batch movie lookups by TMDB id
+Resolves a list of ids with one cache get_many, one tmdb_id__in query for the
+cache misses and, for signed-in callers who say whether the ids are movies or
+TV shows, a bounded number of concurrent TMDB detail fetches for ids the
+catalog doesn't have yet
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from .cache_service import MovieCacheService
+from .models import Movie
+from .serializers import SimpleMovieSerializer
+from .services import TMDBService
+
+
+MAX_BATCH_IDS = 200
+BATCH_CACHE_TIMEOUT = 60 * 15  # Per-movie entries; rows change on sync, so keep them short-lived
+MAX_TMDB_FILLS = 20  # Unknown ids fetched from TMDB per request; the rest are reported missing
+BATCH_MISS_TIMEOUT = 60 * 5  # Ids TMDB couldn't resolve aren't fetched again for this long
+BATCH_MISS = 'missing:{media_type}'  # Cached in place of the movie for such ids
+TMDB_FILL_WORKERS = 8
+
+
+def batch_cache_key(tmdb_id):
+    return f'movie_api_batch_movie_{tmdb_id}'
+
+
+def parse_tmdb_ids(value):
+    """Positive integer ids from a comma-separated list, de-duplicated in request order"""
+    tmdb_ids = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if part.isdigit() and int(part) > 0:
+            tmdb_ids.append(int(part))
+    return list(dict.fromkeys(tmdb_ids))
+
+
+class MovieBatchService:
+    """Resolve many TMDB ids to serialized movies at once"""
+
+    @staticmethod
+    def fetch_from_tmdb(tmdb_ids, media_type):
+        """
+        Fetch unknown ids from TMDB concurrently and sync them; returns Movies by TMDB id
+
+        Movie and TV ids overlap on TMDB, so `media_type` picks the details
+        endpoint; looking a TV id up on /movie/{id} would sync an unrelated film.
+        """
+        tmdb_service = TMDBService()
+        get_details = tmdb_service.get_tv_details if media_type == 'tv' else tmdb_service.get_movie_details
+
+        def fetch(tmdb_id):
+            try:
+                return get_details(tmdb_id)
+            except Exception as e:
+                print(f"⚠️ Batch lookup TMDB error for {tmdb_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(TMDB_FILL_WORKERS, len(tmdb_ids))) as executor:
+            details = list(executor.map(fetch, tmdb_ids))
+
+        # Workers only make HTTP requests; rows are written from this thread
+        movies = {}
+        with MovieCacheService.deferred_catalog_versions():
+            for tmdb_id, data in zip(tmdb_ids, details):
+                # The mock fallback and error payloads don't describe the requested title
+                if not data or data.get('id') != tmdb_id:
+                    continue
+                try:
+                    movie = tmdb_service.sync_movie_to_db(data)
+                except Exception as e:
+                    print(f"⚠️ Batch lookup sync error for {tmdb_id}: {e}")
+                    continue
+                if movie is not None:
+                    movies[tmdb_id] = movie
+        return movies
+
+    @staticmethod
+    def get_movies(tmdb_ids, fill_from_tmdb=True, media_type=None):
+        """
+        Serialized movies (without per-user fields) by TMDB id; unresolved ids are left out
+
+        Ids outside the catalog are fetched from TMDB only with
+        `fill_from_tmdb` and a known `media_type` ('movie' or 'tv'); those
+        TMDB can't resolve are cached as misses of that type for a few
+        minutes so repeated requests don't fetch them again.
+        """
+        miss = BATCH_MISS.format(media_type=media_type)
+        keys = {batch_cache_key(tmdb_id): tmdb_id for tmdb_id in tmdb_ids}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception as e:
+            print(f"⚠️ Batch lookup cache error: {e}")
+            cached = {}
+        found = {keys[key]: data for key, data in cached.items() if isinstance(data, dict)}
+        known_misses = {keys[key] for key, data in cached.items() if data == miss}
+
+        missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in found and tmdb_id not in known_misses]
+        if not missing:
+            return found
+
+        movies = {movie.tmdb_id: movie for movie in Movie.objects.filter(tmdb_id__in=missing)}
+        unknown = []
+        if fill_from_tmdb and media_type in ('movie', 'tv'):
+            unknown = [tmdb_id for tmdb_id in missing if tmdb_id not in movies][:MAX_TMDB_FILLS]
+        if unknown:
+            movies.update(MovieBatchService.fetch_from_tmdb(unknown, media_type))
+
+        fresh = {tmdb_id: dict(SimpleMovieSerializer(movie).data) for tmdb_id, movie in movies.items()}
+        try:
+            cache.set_many({batch_cache_key(tmdb_id): data for tmdb_id, data in fresh.items()}, BATCH_CACHE_TIMEOUT)
+            misses = [tmdb_id for tmdb_id in unknown if tmdb_id not in movies]
+            if misses:
+                cache.set_many({batch_cache_key(tmdb_id): miss for tmdb_id in misses}, BATCH_MISS_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Batch lookup cache error: {e}")
+        found.update(fresh)
+        return found
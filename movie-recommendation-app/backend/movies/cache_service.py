@@ -5,15 +5,41 @@ Provides enhanced caching functionality with Redis
 
 import json
 import hashlib
+import threading
+from contextlib import contextmanager
 from django.core.cache import cache
 from django.conf import settings
 import requests
 from typing import Optional, Dict, Any
 
 
+_redis_client = None
+_deferred_bumps = threading.local()  # Catalog version bumps held back by deferred_catalog_versions()
+
+
 class MovieCacheService:
     """Enhanced caching service for movie data"""
-    
+
+    @staticmethod
+    def get_redis_client():
+        """Get a shared raw Redis client for sorted-set and counter operations"""
+        global _redis_client
+        if _redis_client is None:
+            try:
+                import redis
+                _redis_client = redis.Redis(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    password=getattr(settings, 'REDIS_PASSWORD', '') or None,
+                    socket_timeout=1,
+                    socket_connect_timeout=1,
+                )
+            except Exception as e:
+                print(f"⚠️ Redis client error: {e}")
+                return None
+        return _redis_client
+
     @staticmethod
     def generate_cache_key(prefix: str, **kwargs) -> str:
         """Generate a unique cache key based on parameters"""
@@ -198,6 +224,47 @@ class MovieCacheService:
             print(f"❌ Error fetching genres: {e}")
             return None
     
+    @staticmethod
+    def get_catalog_versions(media_types) -> Dict[str, int]:
+        """Get local catalog versions per media type (bumped when synced rows change)"""
+        keys = {f"movie_api_catalog_version_{media_type}": media_type for media_type in media_types}
+        try:
+            versions = cache.get_many(list(keys))
+        except Exception as e:
+            print(f"⚠️ Catalog version error: {e}")
+            versions = {}
+        return {media_type: versions.get(key, 1) for key, media_type in keys.items()}
+    
+    @staticmethod
+    @contextmanager
+    def deferred_catalog_versions():
+        """Collect catalog version bumps in this thread and apply each media type's once, at the end"""
+        if getattr(_deferred_bumps, 'media_types', None) is not None:
+            yield  # Already deferred by an enclosing batch
+            return
+        _deferred_bumps.media_types = set()
+        try:
+            yield
+        finally:
+            media_types, _deferred_bumps.media_types = _deferred_bumps.media_types, None
+            for media_type in media_types:
+                MovieCacheService.bump_catalog_version(media_type)
+    
+    @staticmethod
+    def bump_catalog_version(media_type: str) -> None:
+        """Invalidate catalog-derived caches (e.g. facet counts) for one media type"""
+        deferred = getattr(_deferred_bumps, 'media_types', None)
+        if deferred is not None:
+            deferred.add(media_type)
+            return
+        key = f"movie_api_catalog_version_{media_type}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+        except Exception as e:
+            print(f"⚠️ Catalog version bump error for {media_type}: {e}")
+    
     @staticmethod
     def clear_user_cache(user_id: int) -> bool:
         """Clear user-specific cache when user data changes"""
@@ -220,6 +287,8 @@ class MovieCacheService:
         try:
             # Clear movie details cache
             cache.delete(f"movie_api_movie_details_tmdb_id_{tmdb_id}")
+            # Clear batch lookup entry
+            cache.delete(f"movie_api_batch_movie_{tmdb_id}")
             # Clear movie ratings cache
             cache.delete(f"movie_ratings_{tmdb_id}")
             print(f"🗑️ Cleared cache for movie {tmdb_id}")
@@ -243,6 +312,31 @@ class CacheStats:
                 'cache_location': settings.CACHES['default']['LOCATION'],
                 'cache_timeout': settings.CACHES['default']['TIMEOUT'],
                 'cache_prefix': settings.CACHES['default']['KEY_PREFIX'],
+                'query_canonicalization': CacheStats.get_query_canonicalization_stats(),
             }
         except Exception as e:
-            return {'error': str(e)} 
\ No newline at end of file
+            return {'error': str(e)}
+    
+    @staticmethod
+    def get_query_canonicalization_stats() -> Dict[str, Any]:
+        """Get per-view request and collapsed query string counts (each worker flushes every few seconds)"""
+        from .middleware import QUERY_METRICS_KEY
+        
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return {}
+        
+        try:
+            raw = client.hgetall(QUERY_METRICS_KEY)
+        except Exception as e:
+            return {'error': str(e)}
+        
+        stats = {}
+        for field, value in raw.items():
+            view_name, _, metric = field.decode().rpartition(':')
+            stats.setdefault(view_name, {'requests': 0, 'collapsed': 0})[metric] = int(value)
+        
+        for view_stats in stats.values():
+            requests_count = view_stats['requests']
+            view_stats['collapsed_ratio'] = round(view_stats['collapsed'] / requests_count, 4) if requests_count else 0.0
+        return stats
@@ -0,0 +1,189 @@
+"""
+Columnar snapshot of the local movie catalog
+Numeric columns are NumPy arrays and titles one offset-indexed UTF-8 blob,
+written after every sync and memory-mapped by every worker, so browse filters,
+sorts and top-K run in-process over one shared copy per host
+"""
+
+from datetime import date
+import numpy as np
+from .models import Movie
+from .similarity import ArtifactStore
+
+
+CATALOG_ARTIFACT = 'catalog'
+CATALOG_ORDERINGS = ('popularity', 'weighted_rating')  # Each sorted descending with -id as tie-breaker
+CATALOG_COLUMNS = (
+    'ids', 'tmdb_ids', 'popularity', 'weighted_rating', 'vote_average', 'vote_count', 'runtime',
+    'release_days', 'media_types', 'languages', 'genre_masks', 'title_offsets', 'title_blob',
+) + tuple(f'{ordering}_{suffix}' for ordering in CATALOG_ORDERINGS for suffix in ('order', 'keys'))
+MEDIA_TYPE_CODES = {'movie': 0, 'tv': 1}
+NO_RELEASE_DATE = np.iinfo(np.int32).min  # Compares like NULL for year_from; year_to excludes it explicitly
+MAX_GENRES = 64  # Genres are stored as one uint64 bitmask per title
+SCAN_CHUNK = 256  # Rows of an ordering checked against the filters at a time, doubled until a page fills
+
+_loaded = {'build_id': None, 'snapshot': None}
+
+
+def _days(value):
+    return (value - date(1970, 1, 1)).days
+
+
+class CatalogSnapshot:
+    """
+    Read-only view over one published catalog build
+
+    Each ordering is stored as row positions in sort order plus the negated
+    sort values in that order, so a keyset cursor is found with a binary
+    search and a page only tests the filters on rows from that point on.
+    """
+
+    def __init__(self, arrays, metadata):
+        self.arrays = arrays
+        self.genre_bits = {genre_id: np.uint64(1 << bit) for bit, genre_id in enumerate(metadata['genres'])}
+        self.language_codes = {language: code for code, language in enumerate(metadata['languages'])}
+
+    def __len__(self):
+        return len(self.arrays['ids'])
+
+    @staticmethod
+    def build():
+        """Snapshot the Movie table and publish it; returns (build id, titles)"""
+        rows = list(
+            Movie.objects.order_by('id').values_list(
+                'id', 'tmdb_id', 'popularity', 'weighted_rating', 'vote_average', 'vote_count', 'runtime',
+                'release_date', 'media_type', 'original_language', 'genre_ids', 'title',
+            ).iterator(chunk_size=10000)
+        )
+        genres = sorted({genre_id for row in rows for genre_id in row[10] or []})
+        if len(genres) > MAX_GENRES:
+            raise ValueError(f'{len(genres)} distinct genres do not fit the {MAX_GENRES}-bit genre mask')
+        languages = sorted({row[9] for row in rows if row[9]})
+        genre_bits = {genre_id: 1 << bit for bit, genre_id in enumerate(genres)}
+        language_codes = {language: code for code, language in enumerate(languages)}
+
+        titles = [row[11].encode() for row in rows]
+        arrays = {
+            'ids': np.array([row[0] for row in rows], dtype=np.int64),
+            'tmdb_ids': np.array([row[1] for row in rows], dtype=np.int64),
+            'popularity': np.array([row[2] for row in rows], dtype=np.float64),
+            'weighted_rating': np.array([row[3] for row in rows], dtype=np.float64),
+            'vote_average': np.array([row[4] for row in rows], dtype=np.float64),
+            'vote_count': np.array([row[5] for row in rows], dtype=np.int64),
+            'runtime': np.array([row[6] for row in rows], dtype=np.int32),
+            'release_days': np.array(
+                [_days(row[7]) if row[7] else NO_RELEASE_DATE for row in rows], dtype=np.int32
+            ),
+            # Unknown media types get a code no filter value maps to
+            'media_types': np.array([MEDIA_TYPE_CODES.get(row[8], 255) for row in rows], dtype=np.uint8),
+            'languages': np.array([language_codes.get(row[9], -1) for row in rows], dtype=np.int16),
+            'genre_masks': np.array(
+                [sum(genre_bits[genre_id] for genre_id in set(row[10] or [])) for row in rows], dtype=np.uint64
+            ),
+            'title_offsets': np.concatenate(([0], np.cumsum([len(title) for title in titles]))).astype(np.int64),
+            'title_blob': np.frombuffer(b''.join(titles), dtype=np.uint8),
+        }
+        for ordering in CATALOG_ORDERINGS:
+            order = np.lexsort((-arrays['ids'], -arrays[ordering]))
+            arrays[f'{ordering}_order'] = order.astype(np.int64)
+            arrays[f'{ordering}_keys'] = -arrays[ordering][order]
+
+        build_id = ArtifactStore(CATALOG_ARTIFACT).save(arrays, {'genres': genres, 'languages': languages})
+        return build_id, len(rows)
+
+    @staticmethod
+    def current():
+        """The published snapshot, re-mapped when a new build is published; None before the first build"""
+        store = ArtifactStore(CATALOG_ARTIFACT)
+        build_id = store.current_build()
+        if build_id != _loaded['build_id']:
+            arrays = store.load(CATALOG_COLUMNS, build_id)
+            metadata = store.load_metadata(build_id)
+            _loaded['snapshot'] = CatalogSnapshot(arrays, metadata) if arrays is not None and metadata else None
+            _loaded['build_id'] = build_id
+        return _loaded['snapshot']
+
+    def title(self, row):
+        offsets = self.arrays['title_offsets']
+        return bytes(self.arrays['title_blob'][offsets[row]:offsets[row + 1]]).decode()
+
+    def mask(self, filters, rows):
+        """Which of `rows` pass Movie.objects.browse() filters, with the same semantics"""
+        arrays = self.arrays
+        keep = np.ones(len(rows), dtype=bool)
+
+        if filters.get('media_type'):
+            keep &= arrays['media_types'][rows] == MEDIA_TYPE_CODES.get(filters['media_type'], -1)
+        if filters.get('genre_ids'):
+            known = [self.genre_bits[genre_id] for genre_id in filters['genre_ids'] if genre_id in self.genre_bits]
+            bits = np.bitwise_or.reduce(known) if known else np.uint64(0)
+            masks = arrays['genre_masks'][rows]
+            if filters.get('genre_match') == 'any':
+                keep &= (masks & bits) != 0
+            elif len(known) < len(filters['genre_ids']):
+                keep[:] = False
+            else:
+                keep &= (masks & bits) == bits
+        if filters.get('original_language'):
+            keep &= arrays['languages'][rows] == self.language_codes.get(filters['original_language'], -2)
+        if filters.get('year_from') is not None:
+            keep &= arrays['release_days'][rows] >= _days(date(filters['year_from'], 1, 1))
+        if filters.get('year_to') is not None:
+            release_days = arrays['release_days'][rows]
+            keep &= (release_days <= _days(date(filters['year_to'], 12, 31))) & (release_days != NO_RELEASE_DATE)
+        if filters.get('min_vote_average') is not None:
+            keep &= arrays['vote_average'][rows] >= filters['min_vote_average']
+        if filters.get('min_vote_count') is not None:
+            keep &= arrays['vote_count'][rows] >= filters['min_vote_count']
+        if filters.get('min_runtime') is not None:
+            keep &= arrays['runtime'][rows] >= filters['min_runtime']
+        if filters.get('max_runtime') is not None:
+            keep &= arrays['runtime'][rows] <= filters['max_runtime']
+        return keep
+
+    def count(self, filters):
+        return int(self.mask(filters, np.arange(len(self))).sum())
+
+    def position_after(self, ordering, position):
+        """Index in the ordering of the first row after a keyset position [value, Movie id]"""
+        try:
+            value, movie_id = float(position[0]), int(position[1])
+        except (TypeError, ValueError, IndexError):
+            return 0
+
+        keys = self.arrays[f'{ordering}_keys']
+        low = int(np.searchsorted(keys, -value, side='left'))
+        high = int(np.searchsorted(keys, -value, side='right'))
+        # Ties on the value are ordered by id descending
+        tied_ids = self.arrays['ids'][self.arrays[f'{ordering}_order'][low:high]]
+        return low + int(np.searchsorted(-tied_ids, -movie_id, side='right'))
+
+    def page(self, ordering, filters, position=None, limit=20):
+        """Movie ids of the next `limit` matching rows and the keyset position to continue from"""
+        order = self.arrays[f'{ordering}_order']
+        start = 0 if position is None else self.position_after(ordering, position)
+        wanted = limit + 1
+        pieces, found = [], 0
+        chunk = max(SCAN_CHUNK, 4 * wanted)
+        while start < len(order) and found < wanted:
+            rows = np.asarray(order[start:start + chunk])
+            matched = rows[self.mask(filters, rows)][:wanted - found]
+            pieces.append(matched)
+            found += len(matched)
+            start += chunk
+            chunk *= 2
+
+        rows = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int64)
+        next_position = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_position = [float(self.arrays[ordering][last]), int(self.arrays['ids'][last])]
+        return self.arrays['ids'][rows[:limit]].tolist(), next_position
+
+    def top_k(self, ordering, filters, k):
+        return self.page(ordering, filters, limit=k)[0]
+
+
+def preload_snapshot():
+    """Map the current catalog snapshot at worker start instead of on the first request"""
+    CatalogSnapshot.current()
@@ -0,0 +1,162 @@
+"""
+Cold-start recommendations for users with favorite genres but no interactions
+Ranked lists per genre, and per popular favorite-genre combination, are
+precomputed from popularity and weighted ratings and shared through Redis;
+new users are served by merging the lists of their genres in memory
+"""
+
+import json
+import time
+from collections import Counter
+import numpy as np
+from .cache_service import MovieCacheService
+from .models import Movie
+
+
+COLD_START_KEY_PREFIX = 'movie_api:coldstart:'
+COLD_START_LISTS_KEY = COLD_START_KEY_PREFIX + 'lists'
+COLD_START_VERSION_KEY = COLD_START_KEY_PREFIX + 'version'
+COLD_START_LIST_SIZE = 200  # Titles kept per genre or combination list
+COLD_START_COMBINATIONS = 50  # Most common favorite-genre sets with their own list
+MIN_COMBINATION_USERS = 3  # A genre set needs this many profiles to get a list
+POPULARITY_SHARE = 0.6  # The rest of the base score comes from Movie.weighted_rating
+MERGED_CACHE_SIZE = 1000  # Merged lists kept per process
+
+_loaded = {'version': None, 'lists': None, 'merged': {}}
+
+
+def genre_set_key(genre_ids):
+    return ','.join(str(genre_id) for genre_id in sorted(set(genre_ids)))
+
+
+def profile_genre_ids(favorite_genres):
+    """Integer genre ids from a UserProfile.favorite_genres value"""
+    return sorted({int(genre) for genre in favorite_genres or [] if str(genre).isdigit()})
+
+
+class ColdStartService:
+    """Build, cache and serve the precomputed cold-start lists"""
+
+    @staticmethod
+    def base_scores(popularity, weighted_rating):
+        """Blend of log popularity and Bayesian rating, both scaled to 0..1"""
+        popularity_score = np.log1p(np.maximum(popularity, 0))
+        top_popularity = popularity_score.max() if len(popularity_score) else 0
+        if top_popularity > 0:
+            popularity_score = popularity_score / top_popularity
+        return POPULARITY_SHARE * popularity_score + (1 - POPULARITY_SHARE) * weighted_rating / 10.0
+
+    @staticmethod
+    def top_list(movie_ids, scores, mask):
+        candidates = np.flatnonzero(mask & (scores > 0))
+        top = candidates[np.argsort(-scores[candidates], kind='stable')[:COLD_START_LIST_SIZE]]
+        return [[int(movie_ids[index]), round(float(scores[index]), 6)] for index in top]
+
+    @staticmethod
+    def common_genre_sets():
+        """The most common multi-genre favorite sets among user profiles"""
+        from users.models import UserProfile
+
+        counts = Counter()
+        for favorite_genres in UserProfile.objects.exclude(favorite_genres=[]).values_list('favorite_genres', flat=True).iterator(chunk_size=10000):
+            genre_ids = profile_genre_ids(favorite_genres)
+            if len(genre_ids) > 1:
+                counts[tuple(genre_ids)] += 1
+        return [genre_ids for genre_ids, count in counts.most_common(COLD_START_COMBINATIONS) if count >= MIN_COMBINATION_USERS]
+
+    @staticmethod
+    def rebuild():
+        """Recompute every list and publish them; returns (genre lists, combination lists)"""
+        rows = list(Movie.objects.values_list('id', 'genre_ids', 'popularity', 'weighted_rating'))
+        movie_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        scores = ColdStartService.base_scores(
+            np.array([row[2] for row in rows], dtype=np.float64),
+            np.array([row[3] for row in rows], dtype=np.float64),
+        )
+
+        genre_members = {}
+        for index, (_, genre_ids, _, _) in enumerate(rows):
+            for genre_id in set(genre_ids or []):
+                genre_members.setdefault(genre_id, []).append(index)
+        genre_masks = {}
+        for genre_id, members in genre_members.items():
+            mask = np.zeros(len(rows), dtype=bool)
+            mask[members] = True
+            genre_masks[genre_id] = mask
+
+        lists = {'genres': {}, 'combinations': {}}
+        for genre_id, mask in genre_masks.items():
+            lists['genres'][str(genre_id)] = ColdStartService.top_list(movie_ids, scores, mask)
+
+        # A title's score in a combination grows with how many of the set's genres it has,
+        # matching what merging the single-genre lists gives
+        for genre_ids in ColdStartService.common_genre_sets():
+            masks = [genre_masks[genre_id] for genre_id in genre_ids if genre_id in genre_masks]
+            if not masks:
+                continue
+            matched = np.sum(masks, axis=0, dtype=np.float64)
+            lists['combinations'][genre_set_key(genre_ids)] = ColdStartService.top_list(
+                movie_ids, scores * matched / len(genre_ids), matched > 0
+            )
+
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.set(COLD_START_LISTS_KEY, json.dumps(lists, separators=(',', ':')))
+                pipe.set(COLD_START_VERSION_KEY, f'{time.time():.6f}')
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠️ Cold-start cache error: {e}")
+        return len(lists['genres']), len(lists['combinations'])
+
+    @staticmethod
+    def load():
+        """The published lists, re-read from Redis only when a new version is published"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return _loaded['lists']
+
+        try:
+            version = client.get(COLD_START_VERSION_KEY)
+            if version != _loaded['version']:
+                data = client.get(COLD_START_LISTS_KEY)
+                _loaded['lists'] = json.loads(data) if data else None
+                _loaded['version'] = version
+                _loaded['merged'] = {}
+        except Exception as e:
+            print(f"⚠️ Cold-start cache error: {e}")
+        return _loaded['lists']
+
+    @staticmethod
+    def get_ranked(genre_ids):
+        """Full ranked (Movie id, score) list for a set of favorite genres"""
+        lists = ColdStartService.load()
+        genre_ids = sorted(set(genre_ids))
+        if lists is None or not genre_ids:
+            return []
+
+        key = genre_set_key(genre_ids)
+        merged = _loaded['merged'].get(key)
+        if merged is not None:
+            return merged
+
+        if key in lists['combinations']:
+            merged = [tuple(entry) for entry in lists['combinations'][key]]
+        else:
+            scores = {}
+            for genre_id in genre_ids:
+                for movie_id, score in lists['genres'].get(str(genre_id), []):
+                    scores[movie_id] = scores.get(movie_id, 0.0) + score / len(genre_ids)
+            merged = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:COLD_START_LIST_SIZE]
+
+        if len(_loaded['merged']) >= MERGED_CACHE_SIZE:
+            _loaded['merged'].clear()
+        _loaded['merged'][key] = merged
+        return merged
+
+    @staticmethod
+    def get_recommendations(genre_ids, limit=20, offset=0):
+        """A page of the cold-start list as ((Movie id, score) pairs, total)"""
+        ranked = ColdStartService.get_ranked(genre_ids)
+        return ranked[offset:offset + limit], len(ranked)
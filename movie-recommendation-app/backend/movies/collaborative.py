@@ -0,0 +1,123 @@
+"""
+Item-item collaborative filtering over local user interactions
+Builds a sparse user x item matrix from ratings, favorites and watchlists and
+stores the top-K cosine neighbours per movie in the MovieNeighbor table
+"""
+
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from .models import Favorite, Watchlist, MovieRating, MovieNeighbor
+from .similarity import top_k_similar
+
+
+NEIGHBORS_PER_MOVIE = 50
+SIMILARITY_SHRINKAGE = 10  # Damps similarities supported by only a few co-interacting users
+NEIGHBOR_WRITE_BATCH = 5000
+
+# Interaction weights; ratings (1-5) are centered so low ratings count against similarity
+FAVORITE_WEIGHT = 1.0
+WATCHLIST_WEIGHT = 0.5
+RATING_MIDPOINT = 3.0
+RATING_SCALE = 2.0
+
+
+class ItemNeighborService:
+    """Build and serve precomputed item-item neighbours"""
+
+    @staticmethod
+    def build_interaction_matrix(return_user_ids=False):
+        """
+        Sparse user x item matrix of summed interaction weights
+
+        Returns the CSR matrix and the Movie ids of its columns, plus the User
+        ids of its rows with `return_user_ids`.
+        """
+        user_ids, movie_ids, weights = [], [], []
+
+        for user_id, movie_id in Favorite.objects.values_list('user_id', 'movie_id').iterator(chunk_size=10000):
+            user_ids.append(user_id)
+            movie_ids.append(movie_id)
+            weights.append(FAVORITE_WEIGHT)
+
+        for user_id, movie_id in Watchlist.objects.values_list('user_id', 'movie_id').iterator(chunk_size=10000):
+            user_ids.append(user_id)
+            movie_ids.append(movie_id)
+            weights.append(WATCHLIST_WEIGHT)
+
+        for user_id, movie_id, rating in MovieRating.objects.values_list('user_id', 'movie_id', 'rating').iterator(chunk_size=10000):
+            user_ids.append(user_id)
+            movie_ids.append(movie_id)
+            weights.append((rating - RATING_MIDPOINT) / RATING_SCALE)
+
+        if not user_ids:
+            empty_ids = np.array([], dtype=np.int64)
+            matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+            return (matrix, empty_ids, empty_ids) if return_user_ids else (matrix, empty_ids)
+
+        user_keys, user_index = np.unique(np.array(user_ids, dtype=np.int64), return_inverse=True)
+        item_keys, item_index = np.unique(np.array(movie_ids, dtype=np.int64), return_inverse=True)
+
+        # Duplicate (user, item) pairs are summed by the COO -> CSR conversion
+        matrix = sparse.coo_matrix(
+            (np.array(weights, dtype=np.float32), (user_index, item_index)),
+            shape=(len(user_keys), len(item_keys)),
+        ).tocsr()
+        matrix.eliminate_zeros()
+        return (matrix, item_keys, user_keys) if return_user_ids else (matrix, item_keys)
+
+    @staticmethod
+    def compute_neighbors(matrix, top_k=NEIGHBORS_PER_MOVIE, shrinkage=SIMILARITY_SHRINKAGE):
+        """
+        Top-K cosine neighbours for every item column of `matrix`
+
+        Yields (item_index, neighbor_indices, scores) with scores in descending order.
+        """
+        columns = matrix.tocsc().astype(np.float32)
+        norms = np.sqrt(np.asarray(columns.multiply(columns).sum(axis=0)).ravel())
+        norms[norms == 0] = 1.0
+        normalized = columns @ sparse.diags(1.0 / norms)
+
+        binary = columns.copy()
+        binary.data = np.ones_like(binary.data)
+        binary_t = binary.T.tocsr()
+
+        def shrink(similarity, start, stop):
+            support = (binary_t[start:stop] @ binary).toarray()
+            similarity *= support / (support + shrinkage)
+
+        return top_k_similar(normalized.T, normalized, top_k, adjust=shrink if shrinkage else None)
+
+    @staticmethod
+    def rebuild(top_k=NEIGHBORS_PER_MOVIE, shrinkage=SIMILARITY_SHRINKAGE):
+        """Recompute the neighbour table from scratch; returns (movies, neighbour rows)"""
+        matrix, item_keys = ItemNeighborService.build_interaction_matrix()
+
+        rows = []
+        movies_with_neighbors = 0
+        with transaction.atomic():
+            MovieNeighbor.objects.all().delete()
+            for item, neighbors, scores in ItemNeighborService.compute_neighbors(matrix, top_k, shrinkage):
+                movies_with_neighbors += 1
+                movie_id = int(item_keys[item])
+                rows.extend(
+                    MovieNeighbor(movie_id=movie_id, neighbor_id=int(item_keys[neighbor]), rank=rank, score=float(score))
+                    for rank, (neighbor, score) in enumerate(zip(neighbors, scores), start=1)
+                )
+                if len(rows) >= NEIGHBOR_WRITE_BATCH:
+                    MovieNeighbor.objects.bulk_create(rows, batch_size=NEIGHBOR_WRITE_BATCH)
+                    rows = []
+            if rows:
+                MovieNeighbor.objects.bulk_create(rows, batch_size=NEIGHBOR_WRITE_BATCH)
+
+        return movies_with_neighbors, MovieNeighbor.objects.count()
+
+    @staticmethod
+    def get_neighbors(tmdb_id, limit=20):
+        """Precomputed neighbours of a movie, best first"""
+        return list(
+            MovieNeighbor.objects
+            .filter(movie__tmdb_id=tmdb_id)
+            .select_related('neighbor')
+            .order_by('rank')[:limit]
+        )
@@ -0,0 +1,228 @@
+"""
+Content-based "more like this" similarity over the Movie table
+Genres, original language, release era and TF-IDF of overview/tagline text are
+combined into one sparse feature matrix; top-K neighbours per movie are stored
+as memory-mapped arrays on disk
+"""
+
+import re
+import numpy as np
+from scipy import sparse
+from .models import Movie
+from .similarity import ArtifactStore, top_k_similar
+
+
+CONTENT_NEIGHBORS_PER_MOVIE = 30
+CONTENT_ARTIFACT = 'content'
+CONTENT_FIELDS = ('id', 'overview', 'tagline', 'genre_ids', 'original_language', 'release_date')
+
+# Relative weight of each feature block in the cosine similarity
+TEXT_WEIGHT = 0.55
+GENRE_WEIGHT = 0.3
+LANGUAGE_WEIGHT = 0.1
+ERA_WEIGHT = 0.05
+
+MIN_DOCUMENT_FREQUENCY = 2  # Terms in fewer overviews than this can't link two movies
+MAX_DOCUMENT_RATIO = 0.5  # Terms in more than half of all overviews carry no signal
+
+_token_pattern = re.compile(r'[a-z][a-z0-9]{2,}')
+
+STOP_WORDS = frozenset("""
+about after again against all also and any are because been before being between both but
+can could did does doing down during each few for from further had has have having her here
+hers herself him himself his how into its itself just more most nor not now off once only
+other our ours out over own same she should some such than that the their theirs them then
+there these they this those through too under until very was were what when where which
+while who whom why will with would you your yours yourself
+""".split())
+
+_loaded = {'build_id': None, 'arrays': None}
+
+
+def tokenize(text):
+    return [token for token in _token_pattern.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+def _l2_normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def _indicator_matrix(value_lists, vocabulary, values=None):
+    """Sparse rows with `values` (default 1) in the vocabulary columns of each row's items"""
+    rows, cols, data = [], [], []
+    for row, items in enumerate(value_lists):
+        for position, item in enumerate(items):
+            column = vocabulary.get(item)
+            if column is not None:
+                rows.append(row)
+                cols.append(column)
+                data.append(values[row][position] if values is not None else 1.0)
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (rows, cols)),
+        shape=(len(value_lists), max(len(vocabulary), 1)),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+class ContentFeaturizer:
+    """
+    Content feature vectors for Movie rows
+
+    `fit` learns the vocabularies (text terms with IDF weights, genres,
+    languages, decades) from the catalog; `transform` maps any movie, including
+    ones synced later, into that fixed feature space. The fitted state is
+    JSON-serializable so it can be stored next to artifacts built from it.
+    """
+
+    def __init__(self, terms=None, idf=None, genres=None, languages=None, eras=None):
+        self.terms = terms or {}
+        self.idf = np.asarray(idf if idf is not None else [], dtype=np.float32)
+        self.genres = genres or {}
+        self.languages = languages or {}
+        self.eras = eras or {}
+
+    @staticmethod
+    def _fields(movie):
+        return {
+            'tokens': tokenize(f'{movie.overview} {movie.tagline or ""}'),
+            'genres': [str(genre_id) for genre_id in set(movie.genre_ids or [])],
+            'languages': [movie.original_language] if movie.original_language else [],
+            'eras': [str(movie.release_date.year // 10 * 10)] if movie.release_date else [],
+        }
+
+    def fit(self, movies):
+        fields = [self._fields(movie) for movie in movies]
+
+        document_frequency = {}
+        for movie_fields in fields:
+            for token in set(movie_fields['tokens']):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        max_frequency = MAX_DOCUMENT_RATIO * len(fields)
+        kept = sorted(
+            token for token, frequency in document_frequency.items()
+            if MIN_DOCUMENT_FREQUENCY <= frequency <= max_frequency
+        )
+        self.terms = {token: column for column, token in enumerate(kept)}
+        self.idf = np.array(
+            [np.log((1 + len(fields)) / (1 + document_frequency[token])) + 1.0 for token in kept],
+            dtype=np.float32,
+        )
+
+        for attribute, key in (('genres', 'genres'), ('languages', 'languages'), ('eras', 'eras')):
+            values = sorted({value for movie_fields in fields for value in movie_fields[key]})
+            setattr(self, attribute, {value: column for column, value in enumerate(values)})
+        return self
+
+    def transform(self, movies):
+        """Row-normalized sparse feature matrix"""
+        fields = [self._fields(movie) for movie in movies]
+
+        # Sublinear term frequency times IDF
+        counts = _indicator_matrix([movie_fields['tokens'] for movie_fields in fields], self.terms)
+        counts.data = 1.0 + np.log(counts.data)
+        text = counts @ sparse.diags(self.idf if len(self.idf) else np.zeros(1, dtype=np.float32))
+
+        blocks = [
+            (text, TEXT_WEIGHT),
+            (_indicator_matrix([movie_fields['genres'] for movie_fields in fields], self.genres), GENRE_WEIGHT),
+            (_indicator_matrix([movie_fields['languages'] for movie_fields in fields], self.languages), LANGUAGE_WEIGHT),
+            (_indicator_matrix([movie_fields['eras'] for movie_fields in fields], self.eras), ERA_WEIGHT),
+        ]
+        # Each block is unit length before weighting, so the weights set its share of the cosine
+        features = sparse.hstack(
+            [_l2_normalize_rows(block) * np.sqrt(weight) for block, weight in blocks],
+            format='csr',
+        ).astype(np.float32)
+        return _l2_normalize_rows(features).tocsr()
+
+    def to_dict(self):
+        return {
+            'terms': self.terms,
+            'idf': self.idf.tolist(),
+            'genres': self.genres,
+            'languages': self.languages,
+            'eras': self.eras,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class ContentSimilarityService:
+    """Build, persist and serve content-based neighbours"""
+
+    @staticmethod
+    def build_features(movies):
+        """Row-normalized sparse feature matrix for a list of Movie rows"""
+        return ContentFeaturizer().fit(movies).transform(movies)
+
+    @staticmethod
+    def rebuild(top_k=CONTENT_NEIGHBORS_PER_MOVIE):
+        """Recompute content neighbours for the whole catalog and publish them"""
+        movies = list(
+            Movie.objects
+            .only(*CONTENT_FIELDS)
+            .order_by('id')
+        )
+        ids = np.array([movie.id for movie in movies], dtype=np.int64)
+        neighbors = np.full((len(movies), top_k), -1, dtype=np.int64)
+        scores = np.zeros((len(movies), top_k), dtype=np.float32)
+
+        if len(movies) > 1:
+            features = ContentSimilarityService.build_features(movies)
+            for item, item_neighbors, item_scores in top_k_similar(features, features.T, top_k):
+                neighbors[item, :len(item_neighbors)] = ids[item_neighbors]
+                scores[item, :len(item_scores)] = item_scores
+
+        build_id = ArtifactStore(CONTENT_ARTIFACT).save({'ids': ids, 'neighbors': neighbors, 'scores': scores})
+        return build_id, len(movies)
+
+    @staticmethod
+    def load():
+        """Memory-mapped neighbour arrays of the current build, reloaded when a new build is published"""
+        store = ArtifactStore(CONTENT_ARTIFACT)
+        build_id = store.current_build()
+        if build_id != _loaded['build_id']:
+            _loaded['arrays'] = store.load(['ids', 'neighbors', 'scores'], build_id)
+            _loaded['build_id'] = build_id
+        return _loaded['arrays']
+
+    @staticmethod
+    def get_similar_ids(movie_id, limit=20):
+        """(Movie id, score) pairs most similar to a Movie id, or None if it isn't indexed"""
+        arrays = ContentSimilarityService.load()
+        if arrays is None:
+            return None
+
+        ids = arrays['ids']
+        position = np.searchsorted(ids, movie_id)
+        if position >= len(ids) or ids[position] != movie_id:
+            return None
+
+        neighbors = arrays['neighbors'][position, :limit]
+        scores = arrays['scores'][position, :limit]
+        return [(int(neighbor), float(score)) for neighbor, score in zip(neighbors, scores) if neighbor >= 0]
+
+    @staticmethod
+    def get_similar(movie, limit=20):
+        """Movies most like `movie`, best first"""
+        similar_ids = ContentSimilarityService.get_similar_ids(movie.id, limit)
+        if similar_ids is None:
+            # Titles synced since the last build are in the ANN index's delta
+            from .ann import MovieEmbeddingIndex
+            index = MovieEmbeddingIndex.get('content')
+            similar_ids = index.similar(movie.id, limit) if index is not None else None
+
+        if similar_ids is None:
+            # Not embedded anywhere yet: same genres, most popular first
+            queryset = Movie.objects.exclude(id=movie.id)
+            if movie.genre_ids:
+                queryset = queryset.with_any_genre(movie.genre_ids).filter(media_type=movie.media_type)
+            return list(queryset.by_popularity()[:limit])
+
+        movies = Movie.objects.in_bulk([movie_id for movie_id, _ in similar_ids])
+        return [movies[movie_id] for movie_id, _ in similar_ids if movie_id in movies]
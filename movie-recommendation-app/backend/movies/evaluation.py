@@ -0,0 +1,304 @@
+"""
+Offline evaluation of the recommendation engines
+Time-split evaluation on local interactions, an anonymised dump or synthetic
+data, reporting ranking quality, training cost and serving latency as JSON.
+Nothing here touches TMDB or Redis, and only the `db` source reads the database.
+"""
+
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import numpy as np
+from scipy import sparse
+from django.utils import timezone
+from .collaborative import ItemNeighborService, FAVORITE_WEIGHT, WATCHLIST_WEIGHT, RATING_MIDPOINT, RATING_SCALE
+from .factorization import ALSTrainer, DEFAULT_FACTORS
+from .models import Favorite, Watchlist, MovieRating
+
+
+DEFAULT_K = 10
+DEFAULT_TEST_FRACTION = 0.2
+EVALUATION_MODELS = ('popularity', 'item_knn', 'als')
+SYNTHETIC_FACTORS = 16  # Latent taste dimensions of generated users and items
+SYNTHETIC_DAYS = 180  # Generated interactions are spread over this many days
+SYNTHETIC_BATCH = 1000  # Users generated per batch (bounds the dense affinity block)
+
+# Share of generated interactions that are favorites and watchlist additions; the rest are ratings
+SYNTHETIC_FAVORITE_SHARE = 0.2
+SYNTHETIC_WATCHLIST_SHARE = 0.3
+
+
+def interactions_from_arrays(users, items, weights, timestamps):
+    return {
+        'users': np.asarray(users, dtype=np.int64),
+        'items': np.asarray(items, dtype=np.int64),
+        'weights': np.asarray(weights, dtype=np.float32),
+        'timestamps': np.asarray(timestamps, dtype=np.float64),
+    }
+
+
+def load_interactions():
+    """Every favorite, watchlist and rating row as interaction arrays (User id, Movie id)"""
+    users, items, weights, timestamps = [], [], [], []
+    sources = (
+        (Favorite.objects.values_list('user_id', 'movie_id', 'created_at'), lambda row: FAVORITE_WEIGHT),
+        (Watchlist.objects.values_list('user_id', 'movie_id', 'created_at'), lambda row: WATCHLIST_WEIGHT),
+        (
+            MovieRating.objects.values_list('user_id', 'movie_id', 'created_at', 'rating'),
+            lambda row: (row[3] - RATING_MIDPOINT) / RATING_SCALE,
+        ),
+    )
+    for rows, weight in sources:
+        for row in rows.iterator(chunk_size=10000):
+            users.append(row[0])
+            items.append(row[1])
+            weights.append(weight(row))
+            timestamps.append(row[2].timestamp())
+    return interactions_from_arrays(users, items, weights, timestamps)
+
+
+def save_dump(path, interactions, seed=0):
+    """Write interactions with user ids replaced by random, meaningless ones"""
+    user_keys, user_index = np.unique(interactions['users'], return_inverse=True)
+    anonymous_ids = np.random.default_rng(seed).permutation(len(user_keys))
+    np.savez_compressed(path, **{**interactions, 'users': anonymous_ids[user_index]})
+
+
+def load_dump(path):
+    with np.load(path) as dump:
+        return interactions_from_arrays(dump['users'], dump['items'], dump['weights'], dump['timestamps'])
+
+
+def generate_synthetic(n_users, n_items, interactions_per_user, seed=0):
+    """
+    Synthetic interactions with learnable structure
+
+    Users and items get random latent tastes and items a Zipf-like popularity;
+    each user picks titles by popularity plus taste affinity (Gumbel top-k
+    sampling) and rates them according to that affinity.
+    """
+    rng = np.random.default_rng(seed)
+    user_tastes = rng.standard_normal((n_users, SYNTHETIC_FACTORS)).astype(np.float32)
+    item_tastes = rng.standard_normal((n_items, SYNTHETIC_FACTORS)).astype(np.float32)
+    log_popularity = -0.8 * np.log(rng.permutation(n_items) + 1.0)
+    counts = np.clip(rng.geometric(1.0 / max(interactions_per_user, 1), n_users), 2, n_items)
+
+    users, items, affinities = [], [], []
+    for start in range(0, n_users, SYNTHETIC_BATCH):
+        stop = min(start + SYNTHETIC_BATCH, n_users)
+        affinity = user_tastes[start:stop] @ item_tastes.T / np.sqrt(SYNTHETIC_FACTORS)
+        keys = log_popularity + 2.0 * affinity + rng.gumbel(size=affinity.shape)
+        order = np.argsort(-keys, axis=1)
+        for offset in range(stop - start):
+            chosen = order[offset, :counts[start + offset]]
+            users.append(np.full(len(chosen), start + offset))
+            items.append(chosen)
+            affinities.append(affinity[offset, chosen])
+
+    users, items, affinities = np.concatenate(users), np.concatenate(items), np.concatenate(affinities)
+    kind = rng.random(len(users))
+    ratings = np.clip(np.rint(3.0 + 1.5 * affinities + rng.normal(0, 0.7, len(users))), 1, 5)
+    weights = np.where(
+        kind < SYNTHETIC_FAVORITE_SHARE, FAVORITE_WEIGHT,
+        np.where(kind < SYNTHETIC_FAVORITE_SHARE + SYNTHETIC_WATCHLIST_SHARE, WATCHLIST_WEIGHT,
+                 (ratings - RATING_MIDPOINT) / RATING_SCALE),
+    )
+    now = time.time()
+    timestamps = now - rng.random(len(users)) * SYNTHETIC_DAYS * 86400
+    return interactions_from_arrays(users, items, weights, timestamps)
+
+
+def time_split(interactions, test_fraction=DEFAULT_TEST_FRACTION):
+    """
+    Train matrix from interactions before a global time cutoff and held-out
+    positives after it
+
+    Returns the CSR train matrix over users/items seen in training, plus
+    {user row: set of item columns} of later positive interactions with items
+    the user hadn't touched in training. Test items unseen in training stay in
+    the relevant sets, so models can't score them and they count as misses.
+    """
+    cutoff = np.quantile(interactions['timestamps'], 1.0 - test_fraction)
+    train = interactions['timestamps'] < cutoff
+
+    user_keys, user_index = np.unique(interactions['users'][train], return_inverse=True)
+    item_keys, item_index = np.unique(interactions['items'][train], return_inverse=True)
+    matrix = sparse.coo_matrix(
+        (interactions['weights'][train], (user_index, item_index)),
+        shape=(len(user_keys), len(item_keys)),
+    ).tocsr()
+    matrix.eliminate_zeros()
+
+    test = ~train & (interactions['weights'] > 0)
+    n_users, n_items = len(user_keys), len(item_keys)
+    test_users = np.searchsorted(user_keys, interactions['users'][test]).clip(max=max(n_users - 1, 0))
+    test_items = np.searchsorted(item_keys, interactions['items'][test]).clip(max=max(n_items - 1, 0))
+    known_users = user_keys[test_users] == interactions['users'][test] if n_users else np.zeros(len(test_users), dtype=bool)
+    known_items = item_keys[test_items] == interactions['items'][test] if n_items else np.zeros(len(test_items), dtype=bool)
+
+    # Drop pairs the user already interacted with in training
+    seen = np.isin(test_users * n_items + test_items, user_index * n_items + item_index) & known_items
+    # Items first seen after the cutoff get columns past the matrix, which no model can recommend
+    test_items = np.where(known_items, test_items, n_items + np.arange(len(test_items)))
+
+    relevant = {}
+    keep = known_users & ~seen
+    for user, item in zip(test_users[keep].tolist(), test_items[keep].tolist()):
+        relevant.setdefault(user, set()).add(item)
+    return matrix, relevant, {'cutoff': cutoff, 'train': int(train.sum()), 'test': int(test.sum())}
+
+
+def _top_unseen(scores, seen, k):
+    scores = scores.astype(np.float64, copy=True)
+    scores[seen] = -np.inf
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top[np.isfinite(scores[top])]
+
+
+class PopularityRecommender:
+    """Most positively interacted titles the user hasn't seen (baseline)"""
+
+    def fit(self, matrix):
+        self.matrix = matrix
+        self.scores = np.asarray((matrix > 0).sum(axis=0)).ravel().astype(np.float64)
+
+    def recommend(self, user, k):
+        return _top_unseen(self.scores, self.matrix[user].indices, k)
+
+
+class ItemKNNRecommender:
+    """Summed neighbour scores of the user's titles, as served by RecommendationService"""
+
+    def fit(self, matrix):
+        self.matrix = matrix
+        rows, cols, data = [], [], []
+        for item, neighbors, scores in ItemNeighborService.compute_neighbors(matrix):
+            rows.append(np.full(len(neighbors), item))
+            cols.append(neighbors)
+            data.append(scores)
+        n_items = matrix.shape[1]
+        self.neighbors = sparse.csr_matrix(
+            (np.concatenate(data) if data else [], (np.concatenate(rows) if rows else [], np.concatenate(cols) if cols else [])),
+            shape=(n_items, n_items),
+        )
+
+    def recommend(self, user, k):
+        row = self.matrix[user]
+        scores = np.asarray((row @ self.neighbors).todense()).ravel()
+        return _top_unseen(scores, row.indices, k)
+
+
+class ALSRecommender:
+    """Implicit ALS factors trained with ALSTrainer"""
+
+    def __init__(self, factors=DEFAULT_FACTORS, iterations=10):
+        self.trainer = ALSTrainer(factors=factors)
+        self.iterations = iterations
+
+    def fit(self, matrix):
+        self.matrix = matrix
+        self.user_factors, self.item_factors = self.trainer.fit(matrix, self.iterations, log=lambda message: None)
+
+    def recommend(self, user, k):
+        return _top_unseen(self.item_factors @ self.user_factors[user], self.matrix[user].indices, k)
+
+
+def ranking_metrics(recommended, relevant, k):
+    """precision@k, recall@k and NDCG@k of one user's list with binary relevance"""
+    gains = np.array([item in relevant for item in recommended[:k]], dtype=np.float64)
+    hits = gains.sum()
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = discounts[:min(len(relevant), k)].sum()
+    return hits / k, hits / len(relevant), float(gains @ discounts[:len(gains)]) / ideal if ideal else 0.0
+
+
+def evaluate(model, matrix, relevant, k=DEFAULT_K):
+    """Train `model` and score it on the held-out users; returns the report entry"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    model.fit(matrix)
+    train_seconds = time.perf_counter() - started
+    _, train_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    precision, recall, ndcg, latency = [], [], [], []
+    recommended_items = set()
+    for user, items in relevant.items():
+        started = time.perf_counter()
+        recommended = model.recommend(user, k)
+        latency.append((time.perf_counter() - started) * 1000)
+        recommended_items.update(recommended.tolist())
+        user_precision, user_recall, user_ndcg = ranking_metrics(recommended, items, k)
+        precision.append(user_precision)
+        recall.append(user_recall)
+        ndcg.append(user_ndcg)
+
+    latency = np.array(latency) if latency else np.zeros(1)
+    return {
+        f'precision@{k}': float(np.mean(precision)) if precision else 0.0,
+        f'recall@{k}': float(np.mean(recall)) if recall else 0.0,
+        f'ndcg@{k}': float(np.mean(ndcg)) if ndcg else 0.0,
+        'catalog_coverage': len(recommended_items) / matrix.shape[1] if matrix.shape[1] else 0.0,
+        'train_seconds': round(train_seconds, 3),
+        'train_peak_mb': round(train_peak / 2 ** 20, 1),
+        'latency_ms': {
+            'mean': round(float(latency.mean()), 3),
+            'p50': round(float(np.percentile(latency, 50)), 3),
+            'p95': round(float(np.percentile(latency, 95)), 3),
+            'p99': round(float(np.percentile(latency, 99)), 3),
+        },
+    }
+
+
+def build_model(name, als_factors=DEFAULT_FACTORS, als_iterations=10):
+    if name == 'popularity':
+        return PopularityRecommender()
+    if name == 'item_knn':
+        return ItemKNNRecommender()
+    if name == 'als':
+        return ALSRecommender(factors=als_factors, iterations=als_iterations)
+    raise ValueError(f'Unknown model: {name}')
+
+
+def run_evaluation(interactions, models=EVALUATION_MODELS, k=DEFAULT_K, test_fraction=DEFAULT_TEST_FRACTION,
+                   als_factors=DEFAULT_FACTORS, als_iterations=10, source='synthetic', log=print):
+    """Full report for a set of interactions"""
+    matrix, relevant, split = time_split(interactions, test_fraction)
+    log(f'{matrix.shape[0]} users x {matrix.shape[1]} items, {split["train"]} train / {split["test"]} test '
+        f'interactions, {len(relevant)} users evaluated')
+
+    results = {}
+    for name in models:
+        log(f'Evaluating {name}...')
+        results[name] = evaluate(build_model(name, als_factors, als_iterations), matrix, relevant, k)
+        log(f'  {name}: ' + ', '.join(
+            f'{metric}={value:.4f}' for metric, value in results[name].items() if isinstance(value, float)
+        ))
+
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'dataset': {
+            'source': source,
+            'users': int(len(np.unique(interactions['users']))),
+            'items': int(len(np.unique(interactions['items']))),
+            'interactions': int(len(interactions['users'])),
+            'train_interactions': split['train'],
+            'test_interactions': split['test'],
+            'evaluated_users': len(relevant),
+            'test_fraction': test_fraction,
+        },
+        'k': k,
+        'models': results,
+        'environment': {
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+    }
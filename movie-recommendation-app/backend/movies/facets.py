@@ -0,0 +1,130 @@
+"""
+Facet counts for the local movie catalog
+Grouped counts per genre, decade, language and media type for discover filters
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, IntegerField
+from django.db.models.functions import Cast, ExtractYear
+from .cache_service import MovieCacheService
+from .models import Movie
+
+
+FACETS_CACHE_TIMEOUT = 60 * 60  # 1 hour; entries are also versioned by catalog changes
+MEDIA_TYPES = ('movie', 'tv')
+
+# Each facet is counted with every filter applied except its own, so the
+# discover page can show how many titles selecting another value would give.
+FACET_OWN_FILTERS = {
+    'total': (),
+    'genres': ('genre_ids', 'genre_match'),
+    'decades': ('year_from', 'year_to'),
+    'languages': ('original_language',),
+    'media_types': ('media_type',),
+}
+
+
+class CatalogFacetService:
+    """Compute and cache facet counts over the Movie table"""
+
+    @staticmethod
+    def get_facets(filters):
+        """
+        Get facet counts for a set of browse filters
+
+        Every facet is cached separately and keyed by the catalog version of
+        the media types it covers, so syncing new TV rows only invalidates
+        facets that include TV titles.
+        """
+        versions = MovieCacheService.get_catalog_versions(MEDIA_TYPES)
+        facet_filters = {
+            facet: {key: value for key, value in filters.items() if key not in own}
+            for facet, own in FACET_OWN_FILTERS.items()
+        }
+        cache_keys = {
+            facet: CatalogFacetService.get_cache_key(facet, facet_filters[facet], versions)
+            for facet in FACET_OWN_FILTERS
+        }
+
+        try:
+            cached = cache.get_many(list(cache_keys.values()))
+        except Exception as e:
+            print(f"⚠️ Facet cache error: {e}")
+            cached = {}
+
+        facets = {}
+        missing = {}
+        for facet, cache_key in cache_keys.items():
+            if cache_key in cached:
+                facets[facet] = cached[cache_key]
+            else:
+                facets[facet] = CatalogFacetService.count_facet(facet, facet_filters[facet])
+                missing[cache_key] = facets[facet]
+
+        if missing:
+            try:
+                cache.set_many(missing, FACETS_CACHE_TIMEOUT)
+            except Exception as e:
+                print(f"⚠️ Facet cache set error: {e}")
+        return facets
+
+    @staticmethod
+    def get_cache_key(facet, filters, versions):
+        """Cache key for one facet, its filter combination and the catalog versions it depends on"""
+        media_type = filters.get('media_type')
+        media_types = (media_type,) if media_type else MEDIA_TYPES
+        params = {key: ','.join(map(str, value)) if isinstance(value, list) else value
+                  for key, value in filters.items()}
+        params.update({f'v_{media_type}': versions[media_type] for media_type in media_types})
+        return MovieCacheService.generate_cache_key(f'facets_{facet}', **params)
+
+    @staticmethod
+    def count_facet(facet, filters):
+        queryset = Movie.objects.browse(**filters)
+        if facet == 'total':
+            return queryset.count()
+        return getattr(CatalogFacetService, f'count_{facet}')(queryset)
+
+    @staticmethod
+    def count_genres(queryset):
+        """Count titles per genre by unnesting the genre array of the filtered rows"""
+        subquery, params = queryset.order_by().values('genre_ids').query.sql_with_params()
+        sql = (
+            f'SELECT genre_id, COUNT(*) AS count '
+            f'FROM ({subquery}) AS filtered, unnest(filtered.genre_ids) AS genre_id '
+            f'GROUP BY genre_id ORDER BY count DESC, genre_id'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [{'id': genre_id, 'count': count} for genre_id, count in cursor.fetchall()]
+
+    @staticmethod
+    def count_decades(queryset):
+        rows = (
+            queryset.filter(release_date__isnull=False)
+            # EXTRACT returns numeric on Postgres; cast so the division truncates
+            .annotate(decade=Cast(ExtractYear('release_date'), IntegerField()) / 10 * 10)
+            .order_by()
+            .values('decade')
+            .annotate(count=Count('id'))
+            .order_by('-decade')
+        )
+        return [{'decade': row['decade'], 'count': row['count']} for row in rows]
+
+    @staticmethod
+    def count_languages(queryset):
+        rows = (
+            queryset.exclude(original_language__isnull=True)
+            .exclude(original_language='')
+            .order_by()
+            .values('original_language')
+            .annotate(count=Count('id'))
+            .order_by('-count', 'original_language')
+        )
+        return [{'code': row['original_language'], 'count': row['count']} for row in rows]
+
+    @staticmethod
+    def count_media_types(queryset):
+        rows = queryset.order_by().values('media_type').annotate(count=Count('id')).order_by('-count')
+        return [{'media_type': row['media_type'], 'count': row['count']} for row in rows]
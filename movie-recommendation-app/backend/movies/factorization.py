@@ -0,0 +1,286 @@
+"""
+Implicit-feedback matrix factorization (ALS) over local user interactions
+Trains user and item factor matrices from ratings, favorites and watchlists,
+publishes them as .npy files and serves scores from memory-mapped copies
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+from .collaborative import ItemNeighborService
+from .similarity import ArtifactStore, top_scored
+
+
+FACTOR_ARTIFACT = 'als'
+CHECKPOINT_ARRAYS = ('user_ids', 'item_ids', 'user_factors', 'item_factors')
+DEFAULT_FACTORS = 64
+DEFAULT_ITERATIONS = 15
+DEFAULT_REGULARIZATION = 0.1
+DEFAULT_ALPHA = 20.0  # Confidence growth per unit of interaction weight
+SOLVE_BATCH_BYTES = 64 * 1024 * 1024  # Per-thread budget for the stacked normal equations
+
+_loaded = {'build_id': None, 'arrays': None}
+
+
+def _solve_batch(fixed, gram, regularization, indptr, indices, confidence, preference, start, stop, output):
+    """
+    Solve the least-squares update for rows start..stop of one side
+
+    For each row u: (YtY + Yt(Cu - I)Y + lambda*I) x_u = Yt Cu p_u, where only
+    the row's observed entries contribute to the correction term. The systems
+    are stacked and solved in one batched call.
+    """
+    n_factors = fixed.shape[1]
+    systems = np.broadcast_to(gram + regularization * np.eye(n_factors, dtype=fixed.dtype),
+                              (stop - start, n_factors, n_factors)).copy()
+    targets = np.zeros((stop - start, n_factors), dtype=fixed.dtype)
+
+    for offset, row in enumerate(range(start, stop)):
+        lo, hi = indptr[row], indptr[row + 1]
+        if lo == hi:
+            continue
+        observed = fixed[indices[lo:hi]]
+        row_confidence = confidence[lo:hi]
+        systems[offset] += (observed.T * (row_confidence - 1.0)) @ observed
+        targets[offset] = observed.T @ (row_confidence * preference[lo:hi])
+
+    output[start:stop] = np.linalg.solve(systems, targets[..., None])[..., 0]
+
+
+def _batch_bounds(n_rows, n_factors, workers):
+    """Row ranges sized to the per-thread memory budget, several per worker"""
+    rows_per_batch = max(1, SOLVE_BATCH_BYTES // (4 * n_factors * n_factors))
+    rows_per_batch = min(rows_per_batch, max(1, -(-n_rows // (workers * 4))))
+    return [(start, min(start + rows_per_batch, n_rows)) for start in range(0, n_rows, rows_per_batch)]
+
+
+class ALSTrainer:
+    """
+    Alternating least squares for implicit feedback (Hu, Koren & Volinsky)
+
+    Interaction weights become confidences 1 + alpha * |w| and preferences
+    1 for positive weights, 0 otherwise, so low ratings are confident
+    negatives. Each half-step is solved in batches on a thread pool; NumPy
+    releases the GIL in matmul and solve, so batches run on all cores. A
+    checkpoint is written after every iteration for --resume.
+    """
+
+    def __init__(self, factors=DEFAULT_FACTORS, regularization=DEFAULT_REGULARIZATION,
+                 alpha=DEFAULT_ALPHA, workers=None, seed=0):
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.checkpoint_dir = os.path.join(settings.RECOMMENDER_DATA_DIR, f'{FACTOR_ARTIFACT}-checkpoint')
+
+    def config(self):
+        return {'factors': self.factors, 'regularization': self.regularization, 'alpha': self.alpha}
+
+    def confidence_matrices(self, matrix):
+        """Confidence and preference matrices of a user x item interaction matrix"""
+        confidence = matrix.copy()
+        confidence.data = (1.0 + self.alpha * np.abs(matrix.data)).astype(np.float32)
+        preference = matrix.copy()
+        preference.data = (matrix.data > 0).astype(np.float32)
+        return confidence, preference
+
+    def prepare(self):
+        """Confidence and preference matrices plus the Movie/User ids of their axes"""
+        matrix, item_ids, user_ids = ItemNeighborService.build_interaction_matrix(return_user_ids=True)
+        confidence, preference = self.confidence_matrices(matrix)
+        return confidence, preference, user_ids, item_ids
+
+    def half_step(self, fixed, confidence, preference, output, executor):
+        gram = fixed.T @ fixed
+        bounds = _batch_bounds(confidence.shape[0], self.factors, self.workers)
+        futures = [
+            executor.submit(
+                _solve_batch, fixed, gram, self.regularization, confidence.indptr, confidence.indices,
+                confidence.data, preference.data, start, stop, output,
+            )
+            for start, stop in bounds
+        ]
+        for future in futures:
+            future.result()
+
+    def run(self, confidence, preference, user_factors, item_factors, start_iteration, iterations,
+            after_iteration=None, log=print):
+        """Alternate half-steps in place from `start_iteration` up to `iterations`"""
+        # Confidence and preference share a sparsity pattern, so sorted indices keep their entries aligned
+        sides = []
+        for matrix in (confidence, preference, confidence.T.tocsr(), preference.T.tocsr()):
+            matrix.sort_indices()
+            sides.append(matrix)
+        confidence, preference, confidence_t, preference_t = sides
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for iteration in range(start_iteration, iterations):
+                started = time.monotonic()
+                self.half_step(item_factors, confidence, preference, user_factors, executor)
+                self.half_step(user_factors, confidence_t, preference_t, item_factors, executor)
+                if after_iteration is not None:
+                    after_iteration(iteration + 1)
+                log(f'Iteration {iteration + 1}/{iterations} in {time.monotonic() - started:.1f}s')
+        return user_factors, item_factors
+
+    def train(self, iterations=DEFAULT_ITERATIONS, resume=False, log=print):
+        confidence, preference, user_ids, item_ids = self.prepare()
+        if not len(user_ids):
+            log('No interactions to train on')
+            return None
+
+        user_factors, item_factors, start_iteration = self.initial_factors(user_ids, item_ids, resume, log, iterations)
+        self.run(
+            confidence, preference, user_factors, item_factors, start_iteration, iterations,
+            after_iteration=lambda iteration: self.save_checkpoint(user_ids, item_ids, user_factors, item_factors, iteration),
+            log=log,
+        )
+
+        build_id = ArtifactStore(FACTOR_ARTIFACT).save({
+            'user_ids': user_ids,
+            'item_ids': item_ids,
+            'user_factors': user_factors,
+            'item_factors': item_factors,
+        })
+        # A finished run leaves nothing to resume; a later --resume would republish these factors
+        self.clear_checkpoint()
+        return build_id
+
+    def fit(self, matrix, iterations=DEFAULT_ITERATIONS, log=print):
+        """Train on an in-memory user x item matrix, without checkpoints or publishing"""
+        confidence, preference = self.confidence_matrices(matrix)
+        user_factors, item_factors, _ = self.initial_factors(
+            np.arange(matrix.shape[0]), np.arange(matrix.shape[1]), resume=False, log=log
+        )
+        return self.run(confidence, preference, user_factors, item_factors, 0, iterations, log=log)
+
+    def initial_factors(self, user_ids, item_ids, resume, log, iterations=DEFAULT_ITERATIONS):
+        """Random factors, or the checkpoint's factors remapped onto the current ids"""
+        rng = np.random.default_rng(self.seed)
+        user_factors = (rng.standard_normal((len(user_ids), self.factors)) * 0.01).astype(np.float32)
+        item_factors = (rng.standard_normal((len(item_ids), self.factors)) * 0.01).astype(np.float32)
+        if not resume:
+            return user_factors, item_factors, 0
+
+        checkpoint = self.load_checkpoint()
+        if checkpoint is None:
+            log('No compatible checkpoint, starting from scratch')
+            return user_factors, item_factors, 0
+
+        state, arrays = checkpoint
+        if state['iteration'] >= iterations:
+            # Resuming would run no iterations and leave new users and movies at their random init
+            log(f"Checkpoint already finished {state['iteration']} iterations, starting from scratch")
+            return user_factors, item_factors, 0
+
+        # Users and movies added since the checkpoint keep their random initialization
+        for ids, factors, saved_ids, saved_factors in (
+            (user_ids, user_factors, arrays['user_ids'], arrays['user_factors']),
+            (item_ids, item_factors, arrays['item_ids'], arrays['item_factors']),
+        ):
+            positions = np.searchsorted(saved_ids, ids).clip(max=max(len(saved_ids) - 1, 0))
+            known = saved_ids[positions] == ids if len(saved_ids) else np.zeros(len(ids), dtype=bool)
+            factors[known] = saved_factors[positions[known]]
+
+        log(f"Resuming after iteration {state['iteration']}")
+        return user_factors, item_factors, state['iteration']
+
+    def save_checkpoint(self, user_ids, item_ids, user_factors, item_factors, iteration):
+        """
+        Write every array and the state of one iteration to a fresh directory
+
+        The directory is published by atomically replacing a CURRENT pointer
+        file, so a crash at any point leaves the previous checkpoint whole
+        instead of arrays from two different iterations.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        iteration_dir = tempfile.mkdtemp(prefix=f'iteration-{iteration}-', dir=self.checkpoint_dir)
+        for name, array in zip(CHECKPOINT_ARRAYS, (user_ids, item_ids, user_factors, item_factors)):
+            np.save(os.path.join(iteration_dir, f'{name}.npy'), array)
+        with open(os.path.join(iteration_dir, 'state.json'), 'w') as state_file:
+            json.dump({'iteration': iteration, **self.config()}, state_file)
+
+        pointer = os.path.join(self.checkpoint_dir, 'CURRENT')
+        temporary_pointer = f'{pointer}.{os.getpid()}'
+        with open(temporary_pointer, 'w') as pointer_file:
+            pointer_file.write(os.path.basename(iteration_dir))
+        os.replace(temporary_pointer, pointer)
+
+        for entry in os.listdir(self.checkpoint_dir):
+            path = os.path.join(self.checkpoint_dir, entry)
+            if os.path.isdir(path) and path != iteration_dir:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def clear_checkpoint(self):
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+    def load_checkpoint(self):
+        try:
+            with open(os.path.join(self.checkpoint_dir, 'CURRENT')) as pointer_file:
+                iteration_dir = os.path.join(self.checkpoint_dir, pointer_file.read().strip())
+            with open(os.path.join(iteration_dir, 'state.json')) as state_file:
+                state = json.load(state_file)
+            arrays = {name: np.load(os.path.join(iteration_dir, f'{name}.npy')) for name in CHECKPOINT_ARRAYS}
+        except (FileNotFoundError, ValueError):
+            return None
+        if any(state.get(key) != value for key, value in self.config().items()):
+            return None
+        return state, arrays
+
+
+class FactorModel:
+    """Serve scores from the published factor matrices (memory-mapped, shared across workers)"""
+
+    @staticmethod
+    def load():
+        store = ArtifactStore(FACTOR_ARTIFACT)
+        build_id = store.current_build()
+        if build_id != _loaded['build_id']:
+            _loaded['arrays'] = store.load(['user_ids', 'item_ids', 'user_factors', 'item_factors'], build_id)
+            _loaded['build_id'] = build_id
+        return _loaded['arrays']
+
+    @staticmethod
+    def user_vector(user_id):
+        """A user's factor vector, or None if the user wasn't in the training data"""
+        arrays = FactorModel.load()
+        if arrays is None:
+            return None
+
+        user_ids = arrays['user_ids']
+        position = np.searchsorted(user_ids, user_id)
+        if position >= len(user_ids) or user_ids[position] != user_id:
+            return None
+        return np.asarray(arrays['user_factors'][position])
+
+    @staticmethod
+    def score_items(user_id):
+        """Predicted preference of a user for every item, as (Movie ids, scores), or None"""
+        vector = FactorModel.user_vector(user_id)
+        if vector is None:
+            return None
+        arrays = FactorModel.load()
+        return arrays['item_ids'], arrays['item_factors'] @ vector
+
+    @staticmethod
+    def top_items(user_id, limit, exclude_ids=()):
+        """Best-scoring (Movie id, score) pairs for a user, skipping `exclude_ids`"""
+        from .ann import MovieEmbeddingIndex
+
+        vector = FactorModel.user_vector(user_id)
+        if vector is None:
+            return []
+
+        # The ANN index is only valid for the factor build it was built from
+        index = MovieEmbeddingIndex.get('factors')
+        if index is not None and index.metadata.get('factor_build') == _loaded['build_id']:
+            return index.search(vector, limit, exclude_ids=exclude_ids)
+
+        arrays = FactorModel.load()
+        return top_scored(arrays['item_ids'], arrays['item_factors'] @ vector, limit, exclude_ids)
@@ -0,0 +1,64 @@
+"""
+Composite home feed
+Gathers every home page section in one pass: materialized rankings first, then
+concurrent TMDB fills for sections that aren't materialized, with the local
+rows of all filled sections looked up together
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from .ranked_lists import RankedListService, fetch_list_page, list_key
+from .services import TMDBService
+
+
+HOME_SECTIONS = {'trending': 'trending', 'top_rated': 'top_rated', 'popular': 'movies'}  # Section -> list type
+HOME_SECTION_SIZE = 20
+HOME_CACHE_KEY = 'movie_api_home_feed'
+HOME_CACHE_TIMEOUT = 60 * 10  # Anonymous responses; the rankings behind them refresh on a schedule
+HOME_FILL_WORKERS = len(HOME_SECTIONS) + 1  # Every TMDB fill plus the genre list at once
+
+
+class HomeFeedService:
+    """Collect the home page sections and genre list"""
+
+    @staticmethod
+    def get_sections():
+        """(section -> (Movies, total results), genres) for the home page"""
+        sections = {}
+        missing = []
+        for section, list_type in HOME_SECTIONS.items():
+            result = RankedListService.get_page(list_key(list_type), 1, HOME_SECTION_SIZE)
+            if result is None:
+                missing.append(section)
+            else:
+                sections[section] = result
+
+        # The TMDB service answers from its cache first and only the misses go upstream
+        tmdb_service = TMDBService()
+        pages = {}
+        with ThreadPoolExecutor(max_workers=HOME_FILL_WORKERS) as executor:
+            genres_future = executor.submit(tmdb_service.get_genres)
+            futures = {
+                section: executor.submit(fetch_list_page, tmdb_service, HOME_SECTIONS[section], 1)
+                for section in missing
+            }
+            for section, future in futures.items():
+                try:
+                    pages[section] = future.result()
+                except Exception as e:
+                    print(f"⚠️ Home feed error filling {section}: {e}")
+                    pages[section] = {}
+            try:
+                genres = genres_future.result().get('genres', [])
+            except Exception as e:
+                print(f"⚠️ Home feed error fetching genres: {e}")
+                genres = []
+
+        # One lookup of local rows for every filled section
+        results = {section: pages[section].get('results', [])[:HOME_SECTION_SIZE] for section in missing}
+        movies = TMDBService.movies_for_results([item for section in missing for item in results[section]])
+        position = 0
+        for section in missing:
+            count = len(results[section])
+            sections[section] = movies[position:position + count], pages[section].get('total_results', count)
+            position += count
+        return sections, genres
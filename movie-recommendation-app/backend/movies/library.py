@@ -0,0 +1,220 @@
+"""
+Favorites, watchlist and rating writes
+Single writes are one insert-on-conflict statement that creates the movie
+placeholder if needed and upserts the library row. Bulk writes apply a list of
+adds and removes with one insert for missing movies, one conflict-ignoring
+insert for new library rows and one delete. Placeholder movies are filled in
+from TMDB in the background once the transaction commits.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection, transaction
+from .cache_service import MovieCacheService
+from .models import Movie
+from .recommendations import RecommendationService
+from .services import TMDBService
+from .trending import LocalTrendingService
+
+
+MAX_BULK_OPERATIONS = 500  # Adds plus removes per request
+MAX_NEW_PLACEHOLDERS = 50  # Added ids outside the catalog per request; each becomes a Movie row
+UPSERT_ATTEMPTS = 2  # A movie inserted by a concurrent writer after our snapshot is only visible to a retry
+
+_enrichment_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def placeholder_movie(tmdb_id, media_type=None):
+    """An unsynced Movie row for a TMDB id the catalog doesn't have yet"""
+    return Movie(
+        tmdb_id=tmdb_id,
+        title=f'Movie {tmdb_id}',  # Placeholder title
+        overview='',
+        poster_path='',
+        backdrop_path='',
+        vote_average=0.0,
+        vote_count=0,
+        popularity=0.0,
+        genre_ids=[],
+        media_type=media_type or 'movie'
+    )
+
+
+def enrich_placeholders(tmdb_ids):
+    """
+    Replace placeholder rows with TMDB movie details in the background
+
+    Movie and TV ids overlap on TMDB, so only ids the client said are movies
+    may be looked up on /movie/{id}; anything else stays a placeholder.
+    """
+    def enrich():
+        tmdb_service = TMDBService()
+        with MovieCacheService.deferred_catalog_versions():
+            for tmdb_id in tmdb_ids:
+                try:
+                    data = tmdb_service.get_movie_details(tmdb_id)
+                    # The mock fallback and error payloads don't describe the requested title
+                    if not data or data.get('id') != tmdb_id:
+                        continue
+                    if tmdb_service.sync_movie_to_db(data) is not None:
+                        MovieCacheService.clear_movie_cache(tmdb_id)
+                except Exception as e:
+                    print(f"⚠️ Placeholder enrichment error for {tmdb_id}: {e}")
+
+    _enrichment_executor.submit(enrich)
+
+
+def _columns(fields):
+    return ', '.join(connection.ops.quote_name(field.column) for field in fields)
+
+
+def _from_row(model, fields, values):
+    """A model instance from raw column values, converted as a queryset would"""
+    values = [
+        field.from_db_value(value, None, connection) if hasattr(field, 'from_db_value') else value
+        for field, value in zip(fields, values)
+    ]
+    return model.from_db(connection.alias, [field.attname for field in fields], values)
+
+
+def parse_operation_ids(value):
+    """Positive integer ids from a JSON list, de-duplicated in request order; None if malformed"""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        return None
+    tmdb_ids = []
+    for item in value:
+        if isinstance(item, bool) or not isinstance(item, int) or item <= 0:
+            return None
+        tmdb_ids.append(item)
+    return list(dict.fromkeys(tmdb_ids))
+
+
+class LibraryService:
+    """Set-based writes to a user's favorites or watchlist"""
+
+    @staticmethod
+    def insert_placeholders(tmdb_ids, media_type=None):
+        """Insert placeholder rows for unknown TMDB ids in one statement; returns Movie ids by TMDB id"""
+        # A concurrent writer may insert the same ids; those rows are skipped and read back below
+        Movie.objects.bulk_create([placeholder_movie(tmdb_id, media_type) for tmdb_id in tmdb_ids], ignore_conflicts=True)
+        return dict(Movie.objects.filter(tmdb_id__in=tmdb_ids).values_list('tmdb_id', 'id'))
+
+    @staticmethod
+    def upsert(model, user, tmdb_id, move_to_top=False, media_type=None, **values):
+        """
+        Add a title to a user's `model` rows (Favorite, Watchlist or MovieRating) in one statement
+
+        Inserts a placeholder movie unless the TMDB id is known, then inserts
+        the library row or, if the user already has one, updates it with
+        `values` and its auto_now timestamps. With `move_to_top` an existing
+        row's created_at is refreshed too, so it lists first again.
+        New placeholders are enriched from TMDB only when `media_type` says
+        the id is a movie. Returns (row with its movie attached, whether the
+        row is new).
+        """
+        movie_fields = Movie._meta.concrete_fields
+        movie_insert_fields = [field for field in movie_fields if not field.primary_key]
+        placeholder = placeholder_movie(tmdb_id, media_type)
+        movie_params = [field.get_db_prep_save(field.pre_save(placeholder, True), connection) for field in movie_insert_fields]
+
+        row = model(user=user, **values)
+        row_fields = model._meta.concrete_fields
+        row_insert_fields = [field for field in row_fields if not field.primary_key]
+        row_values, row_params = [], []
+        for field in row_insert_fields:
+            if field.attname == 'movie_id':
+                row_values.append('placeholder_or_movie.id')
+            else:
+                row_values.append('%s')
+                row_params.append(field.get_db_prep_save(field.pre_save(row, True), connection))
+        # Conflicts refresh whatever the caller set and the update timestamps, never the owner or title
+        conflict_updates = [
+            field for field in row_insert_fields
+            if field.attname in values or getattr(field, 'auto_now', False)
+            or (move_to_top and getattr(field, 'auto_now_add', False))
+        ]
+
+        quote = connection.ops.quote_name
+        movie_columns = _columns(movie_fields)
+        sql = f"""
+            WITH inserted_movie AS (
+                INSERT INTO {quote(Movie._meta.db_table)} ({_columns(movie_insert_fields)})
+                VALUES ({', '.join(['%s'] * len(movie_insert_fields))})
+                ON CONFLICT ({quote('tmdb_id')}) DO NOTHING
+                RETURNING {movie_columns}
+            ), placeholder_or_movie AS (
+                SELECT {movie_columns}, true AS movie_created FROM inserted_movie
+                UNION ALL
+                SELECT {movie_columns}, false FROM {quote(Movie._meta.db_table)} WHERE {quote('tmdb_id')} = %s
+            ), upserted AS (
+                INSERT INTO {quote(model._meta.db_table)} ({_columns(row_insert_fields)})
+                SELECT {', '.join(row_values)} FROM placeholder_or_movie
+                ON CONFLICT ({quote('user_id')}, {quote('movie_id')}) DO UPDATE SET
+                    {', '.join(f'{quote(field.column)} = EXCLUDED.{quote(field.column)}' for field in conflict_updates)}
+                RETURNING {_columns(row_fields)}, (xmax = 0) AS row_created
+            )
+            SELECT upserted.*, placeholder_or_movie.* FROM upserted CROSS JOIN placeholder_or_movie
+        """
+        params = movie_params + [tmdb_id] + row_params
+
+        with transaction.atomic():
+            for _ in range(UPSERT_ATTEMPTS):
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    result = cursor.fetchone()
+                if result is not None:
+                    break
+            else:
+                raise Movie.DoesNotExist(f"Movie {tmdb_id} could not be inserted or found")
+
+            row_created = result[len(row_fields)]
+            movie_values = result[len(row_fields) + 1:]
+            movie_created = movie_values[-1]
+            row = _from_row(model, row_fields, result[:len(row_fields)])
+            row.movie = _from_row(Movie, movie_fields, movie_values[:-1])
+            if movie_created and media_type == 'movie':
+                transaction.on_commit(lambda: enrich_placeholders([tmdb_id]))
+        return row, row_created
+
+    @staticmethod
+    def apply(model, user, add, remove, weight, media_type=None):
+        """
+        Add and remove TMDB ids in a user's `model` rows (Favorite or Watchlist)
+
+        Titles already present are left alone and titles not present are
+        ignored, so repeating a request is harmless. Returns the TMDB ids
+        actually added and removed. Raises ValueError, before writing
+        anything, if more than MAX_NEW_PLACEHOLDERS added ids are unknown.
+        """
+        adding = set(add)
+        remove = [tmdb_id for tmdb_id in remove if tmdb_id not in adding]
+        with transaction.atomic():
+            movie_ids = dict(Movie.objects.filter(tmdb_id__in=add + remove).values_list('tmdb_id', 'id'))
+            unknown = [tmdb_id for tmdb_id in add if tmdb_id not in movie_ids]
+            if len(unknown) > MAX_NEW_PLACEHOLDERS:
+                raise ValueError(f'At most {MAX_NEW_PLACEHOLDERS} ids outside the catalog per request')
+            if unknown:
+                movie_ids.update(LibraryService.insert_placeholders(unknown, media_type))
+                if media_type == 'movie':
+                    transaction.on_commit(lambda: enrich_placeholders(unknown))
+
+            present = set(
+                model.objects.filter(user=user, movie_id__in=movie_ids.values()).values_list('movie_id', flat=True)
+            )
+            added = [tmdb_id for tmdb_id in add if movie_ids[tmdb_id] not in present]
+            removed = [tmdb_id for tmdb_id in remove if movie_ids.get(tmdb_id) in present]
+
+            if added:
+                model.objects.bulk_create(
+                    [model(user=user, movie_id=movie_ids[tmdb_id]) for tmdb_id in added],
+                    ignore_conflicts=True
+                )
+            if removed:
+                model.objects.filter(user=user, movie_id__in=[movie_ids[tmdb_id] for tmdb_id in removed]).delete()
+
+        if added or removed:
+            MovieCacheService.clear_user_cache(user.id)
+            RecommendationService.record_interaction(user.id, [movie_ids[tmdb_id] for tmdb_id in added + removed])
+            LocalTrendingService.record_events([(movie_ids[tmdb_id], weight) for tmdb_id in added])
+        return added, removed
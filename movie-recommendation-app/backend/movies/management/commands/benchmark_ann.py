@@ -0,0 +1,59 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from movies.ann import MovieEmbeddingIndex, ANN_SOURCES
+
+
+class Command(BaseCommand):
+    help = 'Measure ANN recall@K and latency against brute-force search'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--source', type=str, default='content', choices=ANN_SOURCES)
+        parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+        parser.add_argument('--queries', type=int, default=200, help='Number of sampled query movies')
+        parser.add_argument(
+            '--probes',
+            type=str,
+            default='1,2,4,8,16,32',
+            help='Comma-separated numbers of inverted lists to scan'
+        )
+    
+    def handle(self, *args, **options):
+        index = MovieEmbeddingIndex.get(options['source'])
+        if index is None:
+            self.stdout.write(self.style.ERROR('No published index; run build_ann_index first'))
+            return
+        
+        k = options['k']
+        rng = np.random.default_rng(0)
+        ids = np.asarray(index.arrays['ids'])
+        query_ids = rng.choice(ids, min(options['queries'], len(ids)), replace=False)
+        queries = [(int(movie_id), index.vector_for(int(movie_id))) for movie_id in query_ids]
+        
+        exact, exact_latency = self.run(lambda movie_id, vector: index.exact_search(vector, k, exclude_ids={movie_id}), queries)
+        self.stdout.write(
+            f'{len(ids)} vectors, {len(index.arrays["centroids"])} lists, {len(queries)} queries, k={k}'
+        )
+        self.stdout.write(f'{"method":>12} {"recall@k":>9} {"mean ms":>8} {"p95 ms":>8}')
+        self.report('exact', 1.0, exact_latency)
+        
+        for probes in (int(value) for value in options['probes'].split(',')):
+            results, latency = self.run(
+                lambda movie_id, vector: index.search(vector, k, probes=probes, exclude_ids={movie_id}), queries
+            )
+            recall = np.mean([
+                len({movie_id for movie_id, _ in found} & {movie_id for movie_id, _ in truth}) / max(len(truth), 1)
+                for found, truth in zip(results, exact)
+            ])
+            self.report(f'probes={probes}', recall, latency)
+    
+    def run(self, search, queries):
+        results, latency = [], []
+        for movie_id, vector in queries:
+            started = time.perf_counter()
+            results.append(search(movie_id, vector))
+            latency.append((time.perf_counter() - started) * 1000)
+        return results, np.array(latency)
+    
+    def report(self, label, recall, latency):
+        self.stdout.write(f'{label:>12} {recall:>9.3f} {latency.mean():>8.3f} {np.percentile(latency, 95):>8.3f}')
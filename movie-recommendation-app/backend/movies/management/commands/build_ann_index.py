@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from movies.ann import MovieEmbeddingIndex, ANN_SOURCES, CONTENT_EMBEDDING_DIMS
+
+
+class Command(BaseCommand):
+    help = 'Build the approximate nearest-neighbour index over movie embeddings'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            default='content',
+            choices=ANN_SOURCES,
+            help='Embeddings to index: content features or ALS item factors'
+        )
+        parser.add_argument(
+            '--lists',
+            type=int,
+            default=None,
+            help='Number of inverted lists (defaults to 4 * sqrt(movies))'
+        )
+        parser.add_argument(
+            '--dims',
+            type=int,
+            default=CONTENT_EMBEDDING_DIMS,
+            help='Embedding dimensions for the content source'
+        )
+    
+    def handle(self, *args, **options):
+        source = options['source']
+        self.stdout.write(
+            self.style.SUCCESS(f'Building {source} ANN index...')
+        )
+        
+        build_id, vectors_count = MovieEmbeddingIndex.build(source, n_lists=options['lists'], dims=options['dims'])
+        if build_id is None:
+            self.stdout.write(
+                self.style.ERROR(f'Nothing to index for {source} (run train_factors first for factors)')
+            )
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Published build {build_id} with {vectors_count} vectors')
+        )
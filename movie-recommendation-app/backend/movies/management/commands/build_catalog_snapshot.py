@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from movies.catalog import CatalogSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Write the columnar catalog snapshot that workers browse in memory'
+    
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('Building catalog snapshot...')
+        )
+        
+        build_id, count = CatalogSnapshot.build()
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Published catalog snapshot {build_id} with {count} titles')
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from movies.cold_start import ColdStartService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the cold-start recommendation lists per genre and common genre set (run periodically)'
+    
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('Building cold-start lists...')
+        )
+        
+        genre_lists, combination_lists = ColdStartService.rebuild()
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Published {genre_lists} genre lists and {combination_lists} genre combination lists'
+            )
+        )
@@ -0,0 +1,81 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from movies.evaluation import (
+    EVALUATION_MODELS,
+    DEFAULT_K,
+    DEFAULT_TEST_FRACTION,
+    generate_synthetic,
+    load_dump,
+    load_interactions,
+    run_evaluation,
+    save_dump,
+)
+from movies.factorization import DEFAULT_FACTORS
+
+
+class Command(BaseCommand):
+    help = 'Offline time-split evaluation and latency benchmark of the recommendation models'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            default='synthetic',
+            choices=['synthetic', 'db', 'dump'],
+            help='Interactions to evaluate on: generated, the local database, or a dump file'
+        )
+        parser.add_argument('--dump', type=str, help='Dump file to read with --source dump')
+        parser.add_argument('--export-dump', type=str, help='Also write the interactions, with anonymised user ids, to this .npz file')
+        parser.add_argument('--users', type=int, default=2000, help='Synthetic users')
+        parser.add_argument('--items', type=int, default=1000, help='Synthetic movies')
+        parser.add_argument('--interactions-per-user', type=int, default=30, help='Mean synthetic interactions per user')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic data')
+        parser.add_argument('--k', type=int, default=DEFAULT_K, help='Cutoff for precision, recall and NDCG')
+        parser.add_argument('--test-fraction', type=float, default=DEFAULT_TEST_FRACTION, help='Most recent share of interactions held out')
+        parser.add_argument('--models', type=str, default=','.join(EVALUATION_MODELS), help='Comma-separated models to evaluate')
+        parser.add_argument('--als-factors', type=int, default=DEFAULT_FACTORS, help='ALS latent factors')
+        parser.add_argument('--als-iterations', type=int, default=10, help='ALS iterations')
+        parser.add_argument('--output', type=str, default='recommender_report.json', help='Path of the JSON report')
+    
+    def handle(self, *args, **options):
+        source = options['source']
+        if source == 'synthetic':
+            interactions = generate_synthetic(
+                options['users'], options['items'], options['interactions_per_user'], seed=options['seed']
+            )
+        elif source == 'dump':
+            if not options['dump']:
+                raise CommandError('--source dump needs --dump PATH')
+            interactions = load_dump(options['dump'])
+        else:
+            interactions = load_interactions()
+        
+        if len(interactions['users']) < 2:
+            raise CommandError('Not enough interactions to evaluate')
+        
+        if options['export_dump']:
+            save_dump(options['export_dump'], interactions, seed=options['seed'])
+            self.stdout.write(f'Wrote anonymised dump to {options["export_dump"]}')
+        
+        models = [name.strip() for name in options['models'].split(',') if name.strip()]
+        unknown = set(models) - set(EVALUATION_MODELS)
+        if unknown:
+            raise CommandError(f'Unknown models: {", ".join(sorted(unknown))}')
+        
+        report = run_evaluation(
+            interactions,
+            models=models,
+            k=options['k'],
+            test_fraction=options['test_fraction'],
+            als_factors=options['als_factors'],
+            als_iterations=options['als_iterations'],
+            source=source,
+            log=self.stdout.write,
+        )
+        
+        with open(options['output'], 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote report to {options["output"]}')
+        )
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from movies.precompute import RecommendationPrecomputer, active_user_ids, DEFAULT_SHARD_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Precompute every active user\'s recommendations into a new cache generation'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to all cores)')
+        parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Users per worker task')
+        parser.add_argument(
+            '--active-days',
+            type=int,
+            default=None,
+            help='Only users who logged in within this many days (default: everyone with a library)'
+        )
+    
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['active_days']) if options['active_days'] else None
+        user_ids = active_user_ids(since)
+        
+        precomputer = RecommendationPrecomputer(
+            workers=options['workers'],
+            shard_size=options['shard_size'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Precomputing {len(user_ids)} users on {precomputer.workers} workers...')
+        )
+        
+        try:
+            result = precomputer.run(user_ids)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Generation {result["generation"]}: {result["users"]} users in {result["seconds"]:.1f}s '
+                f'({result["users_per_second"]:.0f} users/s)'
+            )
+        )
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from movies.models import Favorite, Watchlist, MovieRating
+from movies.trending import (
+    LocalTrendingService, TRENDING_HALF_LIFE, FAVORITE_EVENT, WATCHLIST_EVENT, RATING_EVENT
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the local trending chart from recent favorites, watchlist additions and ratings'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=TRENDING_HALF_LIFE * 5 // (60 * 60 * 24),
+            help='How far back to replay interactions (older events have decayed away)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of events written per Redis pipeline'
+        )
+    
+    def handle(self, *args, **options):
+        deleted = LocalTrendingService.clear()
+        self.stdout.write(f'Cleared {deleted} trending keys')
+        
+        since = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        total_events = 0
+        
+        for model, weight in ((Favorite, FAVORITE_EVENT), (Watchlist, WATCHLIST_EVENT), (MovieRating, RATING_EVENT)):
+            rows = model.objects.filter(created_at__gte=since).values_list('movie_id', 'created_at')
+            batch = []
+            for movie_id, created_at in rows.iterator(chunk_size=batch_size):
+                batch.append((movie_id, weight, created_at.timestamp()))
+                if len(batch) >= batch_size:
+                    LocalTrendingService.record_events(batch)
+                    total_events += len(batch)
+                    batch = []
+            if batch:
+                LocalTrendingService.record_events(batch)
+                total_events += len(batch)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Replayed {total_events} interactions from the last {options["days"]} days')
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from movies.models import Movie
+from movies.suggest import SuggestionIndex
+
+
+class Command(BaseCommand):
+    help = 'Build the Redis typeahead prefix index from the Movie table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the existing index before rebuilding'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of movies written per Redis pipeline'
+        )
+    
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = SuggestionIndex.clear()
+            self.stdout.write(f'Cleared {deleted} suggestion keys')
+        
+        batch_size = options['batch_size']
+        movies = Movie.objects.only('tmdb_id', 'title', 'media_type', 'poster_path', 'release_date', 'popularity')
+        
+        total_indexed = 0
+        batch = []
+        for movie in movies.iterator(chunk_size=batch_size):
+            batch.append(movie)
+            if len(batch) >= batch_size:
+                total_indexed += SuggestionIndex.add_movies(batch)
+                batch = []
+        if batch:
+            total_indexed += SuggestionIndex.add_movies(batch)
+        SuggestionIndex.mark_built()
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully indexed {total_indexed} titles')
+        )
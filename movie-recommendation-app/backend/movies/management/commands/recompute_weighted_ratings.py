@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from movies.catalog import CatalogSnapshot
+from movies.top_rated import WeightedRatingService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Bayesian weighted ratings from TMDB votes and local ratings (run periodically)'
+    
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('Recomputing weighted ratings...')
+        )
+        
+        aggregates_changed, scores_changed, mean = WeightedRatingService.recompute()
+        
+        self.stdout.write(f'Catalog mean rating: {mean:.3f}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Updated local rating totals on {aggregates_changed} movies and scores on {scores_changed} movies'
+            )
+        )
+        
+        # The snapshot's top-rated ordering is stale once scores move
+        if scores_changed:
+            build_id, count = CatalogSnapshot.build()
+            self.stdout.write(f'Published catalog snapshot {build_id} with {count} titles')
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from movies.catalog import CatalogSnapshot
+from movies.ranked_lists import RankedListService, TMDB_LIST_TYPES, CATEGORY_LISTS, TMDB_PAGES
+from movies.services import TMDBService, TMDBUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Materialize the trending, top rated, movies, TV, category and per-genre lists (run periodically)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--types',
+            type=str,
+            default=','.join([*TMDB_LIST_TYPES, *CATEGORY_LISTS]),
+            help='Comma-separated TMDB list types and categories to refresh (default: all)'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=TMDB_PAGES,
+            help='TMDB pages materialized per list type'
+        )
+        parser.add_argument(
+            '--skip-genres',
+            action='store_true',
+            help='Do not rebuild the per-genre lists'
+        )
+    
+    def handle(self, *args, **options):
+        list_types = [list_type.strip() for list_type in options['types'].split(',') if list_type.strip()]
+        unknown = [list_type for list_type in list_types if list_type not in TMDB_LIST_TYPES and list_type not in CATEGORY_LISTS]
+        if unknown:
+            self.stdout.write(
+                self.style.ERROR(f'Unknown list types: {", ".join(unknown)}')
+            )
+            return
+        
+        # Without credentials TMDBService answers with mock data, which must not replace real lists
+        if list_types and settings.TMDB_API_KEY in ('', 'your-tmdb-api-key', 'your-tmdb-api-key-here') and not settings.TMDB_READ_TOKEN:
+            self.stdout.write(
+                self.style.ERROR('Please set your TMDB API key in settings')
+            )
+            return
+        
+        tmdb_service = TMDBService()
+        for list_type in list_types:
+            try:
+                count = RankedListService.refresh_tmdb_list(list_type, tmdb_service, pages=options['pages'])
+            except TMDBUnavailable as e:
+                self.stdout.write(
+                    self.style.ERROR(f'{list_type}: TMDB unavailable, keeping the previous ranking ({e})')
+                )
+                continue
+            self.stdout.write(f'{list_type}: {count} titles')
+        
+        if not options['skip_genres']:
+            genre_lists = RankedListService.refresh_genre_lists()
+            self.stdout.write(f'Genres: {genre_lists} lists')
+        
+        build_id, count = CatalogSnapshot.build()
+        self.stdout.write(
+            self.style.SUCCESS(f'Ranked lists refreshed; published catalog snapshot {build_id} with {count} titles')
+        )
@@ -1,4 +1,6 @@
 from django.core.management.base import BaseCommand
+from movies.cache_service import MovieCacheService
+from movies.catalog import CatalogSnapshot
 from movies.services import TMDBService
 from django.conf import settings
 
@@ -38,33 +40,38 @@ class Command(BaseCommand):
         
         total_synced = 0
         
-        for page in range(1, pages + 1):
-            try:
-                if movie_type == 'trending':
-                    data = tmdb_service.get_trending_movies(page=page)
-                elif movie_type == 'top_rated':
-                    data = tmdb_service.get_top_rated_movies(page=page)
-                elif movie_type == 'tv':
-                    data = tmdb_service.get_tv_shows(page=page)
-                else:
-                    data = tmdb_service.get_movies(page=page)
-                
-                synced_count = 0
-                for item in data.get('results', []):
-                    if item.get('media_type') in ['movie', 'tv']:
-                        movie = tmdb_service.sync_movie_to_db(item)
-                        synced_count += 1
-                
-                total_synced += synced_count
-                self.stdout.write(
-                    f'Page {page}: Synced {synced_count} movies'
-                )
-                
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error syncing page {page}: {str(e)}')
-                )
+        # Facet caches are invalidated once for the whole sync
+        with MovieCacheService.deferred_catalog_versions():
+            for page in range(1, pages + 1):
+                try:
+                    if movie_type == 'trending':
+                        data = tmdb_service.get_trending_movies(page=page)
+                    elif movie_type == 'top_rated':
+                        data = tmdb_service.get_top_rated_movies(page=page)
+                    elif movie_type == 'tv':
+                        data = tmdb_service.get_tv_shows(page=page)
+                    else:
+                        data = tmdb_service.get_movies(page=page)
+                    
+                    synced_count = 0
+                    for item in data.get('results', []):
+                        if item.get('media_type') in ['movie', 'tv']:
+                            movie = tmdb_service.sync_movie_to_db(item)
+                            synced_count += 1
+                    
+                    total_synced += synced_count
+                    self.stdout.write(
+                        f'Page {page}: Synced {synced_count} movies'
+                    )
+                    
+                except Exception as e:
+                    self.stdout.write(
+                        self.style.ERROR(f'Error syncing page {page}: {str(e)}')
+                    )
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully synced {total_synced} movies total')
-        ) 
\ No newline at end of file
+        )
+        
+        build_id, count = CatalogSnapshot.build()
+        self.stdout.write(f'Published catalog snapshot {build_id} with {count} titles')
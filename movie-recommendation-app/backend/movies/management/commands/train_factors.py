@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand
+from movies.factorization import (
+    ALSTrainer,
+    DEFAULT_FACTORS,
+    DEFAULT_ITERATIONS,
+    DEFAULT_REGULARIZATION,
+    DEFAULT_ALPHA,
+)
+
+
+class Command(BaseCommand):
+    help = 'Train implicit-feedback ALS factors from ratings, favorites and watchlists'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, default=DEFAULT_FACTORS, help='Latent factors per user/movie')
+        parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='ALS iterations')
+        parser.add_argument('--regularization', type=float, default=DEFAULT_REGULARIZATION, help='L2 regularization')
+        parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='Confidence scaling of interaction weights')
+        parser.add_argument('--workers', type=int, default=None, help='Solver threads (defaults to all cores)')
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue from the last checkpoint written with the same hyperparameters'
+        )
+    
+    def handle(self, *args, **options):
+        trainer = ALSTrainer(
+            factors=options['factors'],
+            regularization=options['regularization'],
+            alpha=options['alpha'],
+            workers=options['workers'],
+        )
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Training {trainer.factors} factors on {trainer.workers} threads...')
+        )
+        
+        started = time.monotonic()
+        build_id = trainer.train(iterations=options['iterations'], resume=options['resume'], log=self.stdout.write)
+        if build_id is None:
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Published build {build_id} in {time.monotonic() - started:.1f}s')
+        )
@@ -0,0 +1,198 @@
+"""
+Middleware for movie recommendation API
+Canonicalizes query strings so cache_page shares entries between equivalent URLs
+"""
+
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+from django.http import QueryDict
+from django.urls import resolve, Resolver404
+from .cache_service import MovieCacheService
+
+
+QUERY_METRICS_KEY = 'movie_api:querystring:metrics'
+METRICS_FLUSH_SECONDS = 10  # Counts are kept per process and written to Redis at most this often
+
+
+def choice_param(*choices):
+    """Build a normalizer that only accepts one of the given values"""
+    def normalize(value):
+        value = value.strip().lower()
+        return value if value in choices else None
+    return normalize
+
+
+def positive_int_param(value):
+    """Normalize a positive integer parameter, e.g. '01' -> '1'"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return str(number) if number > 0 else None
+
+
+def non_negative_number_param(value):
+    """Normalize a non-negative number parameter, e.g. '7.50' -> '7.5'"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number < 0 or number != number:
+        return None
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def int_list_param(value):
+    """Normalize a comma-separated integer list into sorted unique values"""
+    numbers = sorted({int(part) for part in value.split(',') if part.strip().isdigit()})
+    return ','.join(str(number) for number in numbers) or None
+
+
+def language_param(value):
+    """Normalize an ISO 639-1 language code"""
+    value = value.strip().lower()
+    return value if value.isalpha() and 2 <= len(value) <= 3 else None
+
+
+def opaque_param(value):
+    """Keep an opaque token (e.g. a pagination cursor) as-is"""
+    return value.strip() or None
+
+
+MOVIE_LIST_PARAMS = {
+    'type': (choice_param('movies', 'tv', 'trending', 'local_trending', 'top_rated', 'anime', 'kdrama', 'browse'), 'movies'),
+    'page': (positive_int_param, '1'),
+}
+
+MOVIE_BROWSE_PARAMS = {
+    'type': (choice_param('browse'), 'browse'),
+    'media_type': (choice_param('movie', 'tv'), None),
+    'genre_ids': (int_list_param, None),
+    'genre_match': (choice_param('all', 'any'), None),
+    'original_language': (language_param, None),
+    'year_from': (positive_int_param, None),
+    'year_to': (positive_int_param, None),
+    'min_vote_average': (non_negative_number_param, None),
+    'min_vote_count': (positive_int_param, None),
+    'min_runtime': (positive_int_param, None),
+    'max_runtime': (positive_int_param, None),
+    'cursor': (opaque_param, None),
+    'page_size': (positive_int_param, None),
+}
+
+MOVIE_TOP_RATED_PARAMS = {
+    **MOVIE_BROWSE_PARAMS,
+    'type': (choice_param('local_top_rated'), 'local_top_rated'),
+}
+
+MOVIE_GENRE_PARAMS = {
+    'type': (choice_param('genre'), 'genre'),
+    'genre_id': (positive_int_param, None),
+    'page': (positive_int_param, '1'),
+}
+
+
+def movie_list_params(query_dict):
+    """Browse and local top-rated modes read the browse filters, genre mode its genre; the rest only type and page"""
+    list_type = (query_dict.get('type') or '').strip().lower()
+    if list_type == 'browse':
+        return MOVIE_BROWSE_PARAMS
+    if list_type == 'local_top_rated':
+        return MOVIE_TOP_RATED_PARAMS
+    if list_type == 'genre':
+        return MOVIE_GENRE_PARAMS
+    return MOVIE_LIST_PARAMS
+
+
+# Query parameters each cached view actually reads: name -> (normalizer, default),
+# or a callable picking that spec from the query. Anything not listed is dropped
+# before the cache lookup.
+CANONICAL_QUERY_PARAMS = {
+    'movies:movie_list': movie_list_params,
+    'movies:movie_detail': {},
+    'movies:genres_list': {},
+}
+
+
+def canonicalize_query(query_dict, spec):
+    """Return the canonical query string for a view's parameter spec"""
+    if callable(spec):
+        spec = spec(query_dict)
+
+    params = []
+    for name, (normalize, default) in spec.items():
+        value = query_dict.get(name)
+        normalized = normalize(value) if value is not None else None
+        if normalized is None:
+            normalized = default
+        if normalized is not None:
+            params.append((name, normalized))
+    return urlencode(sorted(params))
+
+
+class QueryStringCanonicalizationMiddleware:
+    """
+    Rewrite GET query strings for cached catalog views into a canonical form
+
+    Unknown parameters (cache busters like `_t`, params a view ignores) are
+    dropped, remaining values are normalized, defaults are filled in and the
+    result is sorted, so `?page=1&type=trending` and `?type=trending&page=1&_t=123`
+    hit the same cache_page entry.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pending_metrics = Counter()
+        self.metrics_lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            self.canonicalize(request)
+        return self.get_response(request)
+
+    def canonicalize(self, request):
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return
+
+        spec = CANONICAL_QUERY_PARAMS.get(view_name)
+        if spec is None:
+            return
+
+        original = request.META.get('QUERY_STRING', '')
+        canonical = canonicalize_query(request.GET, spec)
+        collapsed = original != canonical
+
+        if collapsed:
+            request.META['QUERY_STRING'] = canonical
+            request.GET = QueryDict(canonical)
+
+        self.record_metrics(view_name, collapsed)
+
+    def record_metrics(self, view_name, collapsed):
+        """Count requests and collapsed query string variants per view, flushed to Redis in batches"""
+        with self.metrics_lock:
+            self.pending_metrics[f'{view_name}:requests'] += 1
+            if collapsed:
+                self.pending_metrics[f'{view_name}:collapsed'] += 1
+            now = time.monotonic()
+            if now - self.last_flush < METRICS_FLUSH_SECONDS:
+                return
+            pending, self.pending_metrics = self.pending_metrics, Counter()
+            self.last_flush = now
+
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return
+
+        try:
+            pipe = client.pipeline()
+            for field, count in pending.items():
+                pipe.hincrby(QUERY_METRICS_KEY, field, count)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Query string metrics error: {e}")
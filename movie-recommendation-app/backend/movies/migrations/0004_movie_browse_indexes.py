@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_movie_budget_movie_imdb_id_movie_original_language_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-popularity', '-id'], name='movie_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['media_type', '-popularity', '-id'], name='movie_type_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['original_language', 'media_type', '-popularity', '-id'], name='movie_lang_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['media_type', 'release_date'], name='movie_type_release_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Move genre_ids from a JSON list to an integer array with a GIN index"""
+
+    dependencies = [
+        ('movies', '0004_movie_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='genre_ids_array',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, size=None),
+        ),
+        # Set-based copy; non-integer JSON entries are skipped
+        migrations.RunSQL(
+            sql="""
+                UPDATE movies_movie
+                SET genre_ids_array = ARRAY(
+                    SELECT elem::text::integer
+                    FROM jsonb_array_elements(genre_ids::jsonb) AS elem
+                    WHERE jsonb_typeof(elem) = 'number'
+                )
+                WHERE jsonb_typeof(genre_ids::jsonb) = 'array';
+            """,
+            reverse_sql="""
+                UPDATE movies_movie
+                SET genre_ids = to_jsonb(genre_ids_array);
+            """,
+        ),
+        migrations.RemoveField(
+            model_name='movie',
+            name='genre_ids',
+        ),
+        migrations.RenameField(
+            model_name='movie',
+            old_name='genre_ids_array',
+            new_name='genre_ids',
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['genre_ids'], name='movie_genre_ids_gin'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}tagline, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}overview, '')), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+    """Full-text search vector maintained by trigger (the trigram title index is opt-in, see 0012)"""
+
+    dependencies = [
+        ('movies', '0005_movie_genre_ids_array'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql=f"""
+                CREATE FUNCTION movies_movie_search_vector_update() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER movies_movie_search_vector_trigger
+                BEFORE INSERT OR UPDATE ON movies_movie
+                FOR EACH ROW EXECUTE PROCEDURE movies_movie_search_vector_update();
+
+                UPDATE movies_movie SET search_vector = {SEARCH_VECTOR_SQL.format(row='')};
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS movies_movie_search_vector_trigger ON movies_movie;
+                DROP FUNCTION IF EXISTS movies_movie_search_vector_update();
+            """,
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='movie_search_vector_gin'),
+        ),
+    ]
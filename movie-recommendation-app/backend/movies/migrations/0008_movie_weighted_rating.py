@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_movie_neighbors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='local_rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='local_rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='weighted_rating',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-weighted_rating', '-id'], name='movie_weighted_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['media_type', '-weighted_rating', '-id'], name='movie_type_weighted_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_movie_weighted_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankedListEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('list_key', models.CharField(max_length=50)),
+                ('rank', models.PositiveIntegerField()),
+                ('tmdb_id', models.IntegerField()),
+                ('refreshed_at', models.DateTimeField()),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movies.movie')),
+            ],
+            options={
+                'ordering': ['list_key', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='rankedlistentry',
+            constraint=models.UniqueConstraint(fields=('list_key', 'rank'), name='ranked_list_rank_uniq'),
+        ),
+    ]
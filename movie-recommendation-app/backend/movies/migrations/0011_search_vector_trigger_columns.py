@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Only recompute the search vector when a searched column changes"""
+
+    dependencies = [
+        ('movies', '0010_library_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DROP TRIGGER IF EXISTS movies_movie_search_vector_trigger ON movies_movie;
+
+                CREATE TRIGGER movies_movie_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF title, tagline, overview ON movies_movie
+                FOR EACH ROW EXECUTE PROCEDURE movies_movie_search_vector_update();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS movies_movie_search_vector_trigger ON movies_movie;
+
+                CREATE TRIGGER movies_movie_search_vector_trigger
+                BEFORE INSERT OR UPDATE ON movies_movie
+                FOR EACH ROW EXECUTE PROCEDURE movies_movie_search_vector_update();
+            """,
+        ),
+    ]
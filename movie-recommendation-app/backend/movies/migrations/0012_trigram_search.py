@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    """Only with SEARCH_TRIGRAM, so databases without contrib/pg_trgm can still migrate"""
+    if not settings.SEARCH_TRIGRAM or schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS movie_title_trgm ON movies_movie USING gin (title gin_trgm_ops)')
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS movie_title_trgm')
+
+
+class Migration(migrations.Migration):
+    """
+    Opt-in pg_trgm title index for typo-tolerant local search
+
+    Runs only when SEARCH_TRIGRAM is enabled. To enable it on a database that
+    has already applied this migration, set SEARCH_TRIGRAM=True and run
+    `migrate movies 0011` followed by `migrate movies`.
+    """
+
+    dependencies = [
+        ('movies', '0011_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,6 +1,61 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
+from datetime import date
+
+
+class MovieQuerySet(models.QuerySet):
+    """Query helpers for browsing the local movie catalog"""
+    
+    def with_genres(self, genre_ids):
+        """Movies tagged with every one of the given genre IDs (array @>, GIN indexed)"""
+        return self.filter(genre_ids__contains=list(genre_ids))
+    
+    def with_any_genre(self, genre_ids):
+        """Movies tagged with at least one of the given genre IDs (array &&, GIN indexed)"""
+        return self.filter(genre_ids__overlap=list(genre_ids))
+    
+    def released_between(self, year_from=None, year_to=None):
+        """Movies released within an inclusive year range (range on release_date keeps the index usable)"""
+        queryset = self
+        if year_from is not None:
+            queryset = queryset.filter(release_date__gte=date(year_from, 1, 1))
+        if year_to is not None:
+            queryset = queryset.filter(release_date__lte=date(year_to, 12, 31))
+        return queryset
+    
+    def browse(self, media_type=None, genre_ids=None, genre_match='all', original_language=None,
+               year_from=None, year_to=None, min_vote_average=None, min_vote_count=None,
+               min_runtime=None, max_runtime=None):
+        """Apply catalog browse filters; arguments left as None are not filtered on"""
+        queryset = self
+        if media_type:
+            queryset = queryset.filter(media_type=media_type)
+        if genre_ids:
+            queryset = queryset.with_any_genre(genre_ids) if genre_match == 'any' else queryset.with_genres(genre_ids)
+        if original_language:
+            queryset = queryset.filter(original_language=original_language)
+        queryset = queryset.released_between(year_from=year_from, year_to=year_to)
+        if min_vote_average is not None:
+            queryset = queryset.filter(vote_average__gte=min_vote_average)
+        if min_vote_count is not None:
+            queryset = queryset.filter(vote_count__gte=min_vote_count)
+        if min_runtime is not None:
+            queryset = queryset.filter(runtime__gte=min_runtime)
+        if max_runtime is not None:
+            queryset = queryset.filter(runtime__lte=max_runtime)
+        return queryset
+    
+    def by_popularity(self):
+        """Order by popularity with the primary key as a unique tie-breaker for keyset pagination"""
+        return self.order_by('-popularity', '-id')
+    
+    def by_weighted_rating(self):
+        """Order by the Bayesian weighted rating, with the primary key as tie-breaker"""
+        return self.order_by('-weighted_rating', '-id')
 
 
 class Movie(models.Model):
@@ -14,7 +69,7 @@ class Movie(models.Model):
     vote_average = models.FloatField(default=0.0)
     vote_count = models.IntegerField(default=0)
     popularity = models.FloatField(default=0.0)
-    genre_ids = models.JSONField(default=list)
+    genre_ids = ArrayField(models.IntegerField(), default=list, blank=True)
     media_type = models.CharField(max_length=10, default='movie')  # movie or tv
     
     # Additional fields for detailed movie information
@@ -29,11 +84,34 @@ class Movie(models.Model):
     production_countries = models.JSONField(default=list)
     spoken_languages = models.JSONField(default=list)
     
+    # Aggregates of local MovieRating rows and the Bayesian score blending them
+    # with TMDB votes, refreshed in bulk by recompute_weighted_ratings
+    local_rating_count = models.IntegerField(default=0)
+    local_rating_sum = models.IntegerField(default=0)
+    weighted_rating = models.FloatField(default=0.0)
+    
+    # Weighted title/tagline/overview vector, maintained by a database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = MovieQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-popularity']
+        indexes = [
+            # Keyset pagination over the whole catalog and per media type / language
+            models.Index(fields=['-popularity', '-id'], name='movie_popularity_idx'),
+            models.Index(fields=['media_type', '-popularity', '-id'], name='movie_type_popularity_idx'),
+            models.Index(fields=['original_language', 'media_type', '-popularity', '-id'], name='movie_lang_popularity_idx'),
+            models.Index(fields=['media_type', 'release_date'], name='movie_type_release_idx'),
+            models.Index(fields=['-weighted_rating', '-id'], name='movie_weighted_rating_idx'),
+            models.Index(fields=['media_type', '-weighted_rating', '-id'], name='movie_type_weighted_idx'),
+            GinIndex(fields=['genre_ids'], name='movie_genre_ids_gin'),
+            GinIndex(fields=['search_vector'], name='movie_search_vector_gin'),
+            # The pg_trgm title index is opt-in (SEARCH_TRIGRAM), see migration 0012
+        ]
     
     def __str__(self):
         return self.title
@@ -48,6 +126,10 @@ class Favorite(models.Model):
     class Meta:
         unique_together = ['user', 'movie']
         ordering = ['-created_at']
+        indexes = [
+            # Library listings: keyset pages of one user's rows, newest first
+            models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.movie.title}"
@@ -62,6 +144,9 @@ class Watchlist(models.Model):
     class Meta:
         unique_together = ['user', 'movie']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='watchlist_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.movie.title}"
@@ -87,6 +172,46 @@ class MovieRating(models.Model):
     class Meta:
         unique_together = ['user', 'movie']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='rating_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.movie.title} - {self.rating} stars"
+
+
+class MovieNeighbor(models.Model):
+    """Precomputed item-item neighbours of a movie, rebuilt by build_item_neighbors"""
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['movie', 'rank']
+        constraints = [
+            # Serves neighbour lookups as a single index range scan
+            models.UniqueConstraint(fields=['movie', 'rank'], name='movie_neighbor_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.movie.title} -> {self.neighbor.title} ({self.score:.3f})"
+
+
+class RankedListEntry(models.Model):
+    """One position of a materialized list (a TMDB list type or a genre), rebuilt by refresh_ranked_lists"""
+    list_key = models.CharField(max_length=50)
+    rank = models.PositiveIntegerField()
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='+')
+    tmdb_id = models.IntegerField()
+    refreshed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['list_key', 'rank']
+        constraints = [
+            # A page of a list is a single index range scan on (list_key, rank)
+            models.UniqueConstraint(fields=['list_key', 'rank'], name='ranked_list_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.list_key} #{self.rank}: {self.movie.title}"
@@ -0,0 +1,177 @@
+"""
+Pagination classes for movie recommendation API
+Keyset (cursor) pagination avoids OFFSET scans and COUNT queries on large tables
+"""
+
+import base64
+import json
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .models import Movie
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over a unique ordering
+
+    The cursor stores the ordering values of the last row on the page. The
+    next page is filtered on a bound of the leading ordering column ANDed
+    with the lexicographic comparison of the rest, so Postgres starts the
+    ordering index scan at the cursor instead of walking it from the top
+    and filtering, however deep the page.
+    """
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-id',)
+    snapshot_ordering = None  # CatalogSnapshot ordering matching `ordering`, if there is one
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+
+        # Fetch one extra row to know whether there is a next page without a COUNT
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next and rows else None
+        return rows
+
+    def paginate_snapshot(self, snapshot, filters, request, view=None):
+        """Movie ids of the same page as paginate_queryset, ordered and filtered on a CatalogSnapshot"""
+        self.request = request
+        movie_ids, self.next_position = snapshot.page(
+            self.snapshot_ordering, filters, self.decode_cursor(request, Movie), self.get_page_size(request)
+        )
+        self.has_next = self.next_position is not None
+        return movie_ids
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_position(self, instance):
+        """Ordering values of an instance, in ordering order"""
+        return [self._get_value(instance, field.lstrip('-')) for field in self.ordering]
+
+    def _get_value(self, instance, field_path):
+        value = instance
+        for attr in field_path.split('__'):
+            value = getattr(value, attr)
+        return value
+
+    def get_keyset_filter(self, position):
+        """Build a <= x AND ((a < x) OR (a = x AND b < y) ...) for the ordering after `position`"""
+        keyset_filter = Q()
+        equal_prefix = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            keyset_filter |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+
+        # The OR expansion alone isn't usable as an index range bound; the leading column's is
+        leading = self.ordering[0]
+        bound = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{bound}': position[0]}) & keyset_filter
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """Ordering values from the cursor parameter, converted to their field types; 400 if malformed"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+
+        # Unchecked values would reach the keyset filter and fail in the database
+        try:
+            position = [
+                self._get_field(model, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (DjangoValidationError, TypeError, ValueError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        if any(value is None for value in position):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        return position
+
+    def _get_field(self, model, field_path):
+        *relations, name = field_path.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def get_next_cursor(self):
+        return self.encode_cursor(self.next_position) if self.next_position is not None else None
+
+    def get_next_link(self):
+        next_cursor = self.get_next_cursor()
+        if next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'next': self.get_next_link(),
+            'next_cursor': self.get_next_cursor(),
+            'page_size': self.get_page_size(self.request),
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'next': {'type': 'string', 'nullable': True},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'page_size': {'type': 'integer'},
+            },
+        }
+
+
+class PopularityKeysetPagination(KeysetPagination):
+    """Keyset pagination for catalog browsing ordered by popularity"""
+    ordering = ('-popularity', '-id')
+    snapshot_ordering = 'popularity'
+
+
+class WeightedRatingKeysetPagination(KeysetPagination):
+    """Keyset pagination for the local top-rated list"""
+    ordering = ('-weighted_rating', '-id')
+    snapshot_ordering = 'weighted_rating'
+
+
+class LibraryKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for a user's favorites, watchlist and ratings, newest first
+
+    With the user filter, the keyset's created_at <= bound makes every page an
+    index range scan on (user, -created_at, -id) starting at the cursor.
+    """
+    ordering = ('-created_at', '-id')
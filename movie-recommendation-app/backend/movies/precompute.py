@@ -0,0 +1,356 @@
+"""
+Batch precompute of every user's recommendation list
+Users are sharded across a process pool; each shard scores its users in
+vectorized batches against shared neighbour, genre and factor matrices and
+writes a new generation of the cached lists, which readers switch to at once
+"""
+
+import multiprocessing
+import time
+import numpy as np
+from scipy import sparse
+from django.db import connections
+from .cache_service import MovieCacheService
+from .collaborative import FAVORITE_WEIGHT, WATCHLIST_WEIGHT, RATING_MIDPOINT, RATING_SCALE
+from .content import ContentSimilarityService
+from .factorization import FactorModel
+from .models import Movie, Favorite, Watchlist, MovieRating, MovieNeighbor
+from .recommendations import (
+    RecommendationService,
+    RECOMMENDATIONS_GENERATION_KEY,
+    RECOMMENDATIONS_KEY_PREFIX,
+    RECOMMENDATIONS_TOUCHED_KEY,
+    MAX_CANDIDATES,
+    NEIGHBORS_PER_SIGNAL,
+    COLLABORATIVE_WEIGHT,
+    CONTENT_WEIGHT,
+    GENRE_PREFERENCE_WEIGHT,
+    GENRE_CANDIDATES,
+    FACTOR_WEIGHT,
+    _key,
+    current_generation,
+)
+
+
+PRECOMPUTE_LOCK_KEY = RECOMMENDATIONS_KEY_PREFIX + 'precompute:lock'
+PRECOMPUTE_LOCK_TTL = 60 * 60 * 6
+DEFAULT_SHARD_SIZE = 500  # Users per pool task
+SCORE_BATCH_CELLS = 10_000_000  # Dense user x movie cells scored at once (~80 MB of float64)
+WRITE_BATCH_USERS = 100  # Users per Redis pipeline
+
+# Read-only scoring inputs, built once in the parent and inherited by forked workers
+_context = {}
+
+
+def _positions(item_ids, movie_ids):
+    """Column of each Movie id on the catalog axis, and which ids are on it"""
+    positions = np.searchsorted(item_ids, movie_ids).clip(max=max(len(item_ids) - 1, 0))
+    return positions, item_ids[positions] == movie_ids
+
+
+def build_context():
+    """Catalog axis, blended neighbour matrix, genre matrix and factor mapping shared by all shards"""
+    movies = list(Movie.objects.order_by('id').values_list('id', 'popularity', 'genre_ids'))
+    item_ids = np.array([movie_id for movie_id, _, _ in movies], dtype=np.int64)
+    n_items = len(item_ids)
+
+    # Neighbours as a movie x movie matrix: collaborative plus down-weighted content scores
+    rows, cols, data = [], [], []
+    neighbor_rows = MovieNeighbor.objects.filter(rank__lte=NEIGHBORS_PER_SIGNAL).values_list('movie_id', 'neighbor_id', 'score')
+    for movie_id, neighbor_id, score in neighbor_rows.iterator(chunk_size=10000):
+        rows.append(movie_id)
+        cols.append(neighbor_id)
+        data.append(COLLABORATIVE_WEIGHT * score)
+    content = ContentSimilarityService.load()
+    if content is not None:
+        neighbors = np.asarray(content['neighbors'][:, :NEIGHBORS_PER_SIGNAL])
+        valid = neighbors >= 0
+        rows.extend(np.repeat(np.asarray(content['ids']), valid.sum(axis=1)).tolist())
+        cols.extend(neighbors[valid].tolist())
+        data.extend((CONTENT_WEIGHT * np.asarray(content['scores'][:, :NEIGHBORS_PER_SIGNAL])[valid]).tolist())
+    row_positions, row_known = _positions(item_ids, np.array(rows, dtype=np.int64))
+    col_positions, col_known = _positions(item_ids, np.array(cols, dtype=np.int64))
+    known = row_known & col_known
+    neighbor_matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float64)[known], (row_positions[known], col_positions[known])),
+        shape=(n_items, n_items),
+    )
+
+    # Genre x movie membership, for the favorite-genre candidates
+    genre_rows, genre_cols = [], []
+    for column, (_, _, genre_ids) in enumerate(movies):
+        for genre_id in genre_ids or []:
+            genre_rows.append(genre_id)
+            genre_cols.append(column)
+    genre_keys, genre_index = np.unique(np.array(genre_rows, dtype=np.int64), return_inverse=True)
+    genre_matrix = sparse.csr_matrix(
+        (np.ones(len(genre_cols), dtype=np.float32), (genre_index, genre_cols)),
+        shape=(len(genre_keys), n_items),
+    )
+    # Ties in popularity break by id, descending, as in by_popularity()
+    popularity_rank = np.empty(n_items, dtype=np.float64)
+    popularity_rank[np.lexsort((-item_ids, -np.array([popularity for _, popularity, _ in movies])))] = np.arange(n_items)
+
+    factors = FactorModel.load()
+    factor_columns = None
+    if factors is not None:
+        factor_columns, factor_known = _positions(item_ids, np.asarray(factors['item_ids']))
+        factor_columns = np.where(factor_known, factor_columns, -1)
+
+    return {
+        'item_ids': item_ids,
+        'popularity': np.array([popularity for _, popularity, _ in movies], dtype=np.float64),
+        'popularity_rank': popularity_rank,
+        'neighbor_matrix': neighbor_matrix,
+        'genre_keys': genre_keys,
+        'genre_matrix': genre_matrix,
+        'factors': factors,
+        'factor_columns': factor_columns,
+    }
+
+
+def active_user_ids(since=None):
+    """Users with a library (and, with `since`, a login after it)"""
+    from django.contrib.auth import get_user_model
+
+    # Users with only favorite genres share the cold-start lists instead
+    user_ids = set()
+    for model in (Favorite, Watchlist, MovieRating):
+        user_ids.update(model.objects.values_list('user_id', flat=True).distinct())
+    if since is not None:
+        user_ids &= set(get_user_model().objects.filter(last_login__gte=since).values_list('id', flat=True))
+    return sorted(user_ids)
+
+
+def _top_columns(scores, limit):
+    """Per row, the columns of the `limit` highest finite scores, best first"""
+    limit = min(limit, scores.shape[1])
+    top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class ShardScorer:
+    """Score one shard of users in dense batches against the shared context"""
+
+    def __init__(self, context, user_ids):
+        self.context = context
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.weights, self.library = self.library_matrices()
+        self.genres = self.genre_preferences()
+
+    def library_matrices(self):
+        """Users x movies preference weights (as interaction_weight) and library membership"""
+        item_ids = self.context['item_ids']
+        rows, cols, data = [], [], []
+        user_ids = self.user_ids.tolist()
+        sources = (
+            (Favorite.objects.filter(user_id__in=user_ids).values_list('user_id', 'movie_id'), lambda row: FAVORITE_WEIGHT),
+            (Watchlist.objects.filter(user_id__in=user_ids).values_list('user_id', 'movie_id'), lambda row: WATCHLIST_WEIGHT),
+            (
+                MovieRating.objects.filter(user_id__in=user_ids).values_list('user_id', 'movie_id', 'rating'),
+                lambda row: (row[2] - RATING_MIDPOINT) / RATING_SCALE,
+            ),
+        )
+        for queryset, weight in sources:
+            for row in queryset.iterator(chunk_size=10000):
+                rows.append(row[0])
+                cols.append(row[1])
+                data.append(weight(row))
+
+        row_positions, _ = _positions(self.user_ids, np.array(rows, dtype=np.int64))
+        col_positions, known = _positions(item_ids, np.array(cols, dtype=np.int64))
+        shape = (len(self.user_ids), len(item_ids))
+        weights = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64)[known], (row_positions[known], col_positions[known])), shape=shape
+        )
+        library = sparse.csr_matrix(
+            (np.ones(int(known.sum())), (row_positions[known], col_positions[known])), shape=shape
+        )
+        # Explicit zeros are kept: a title rated 3 stars is in the library with weight 0
+        weights.sum_duplicates()
+        library.sum_duplicates()
+        return weights, library
+
+    def genre_preferences(self):
+        """Users x genres indicator of profile favorite genres"""
+        from users.models import UserProfile
+
+        genre_keys = self.context['genre_keys']
+        rows, cols = [], []
+        profiles = UserProfile.objects.filter(user_id__in=self.user_ids.tolist()).values_list('user_id', 'favorite_genres')
+        for user_id, favorite_genres in profiles:
+            genre_ids = np.array([int(genre) for genre in favorite_genres or [] if str(genre).isdigit()], dtype=np.int64)
+            if not len(genre_ids) or not len(genre_keys):
+                continue
+            positions, known = _positions(genre_keys, genre_ids)
+            rows.extend([np.searchsorted(self.user_ids, user_id)] * int(known.sum()))
+            cols.extend(positions[known].tolist())
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(self.user_ids), max(len(genre_keys), 1))
+        )
+
+    def score_batch(self, start, stop):
+        """Blended scores for users start..stop, with library titles at -inf"""
+        context = self.context
+        n_items = len(context['item_ids'])
+        weights = self.weights[start:stop]
+        in_library = self.library[start:stop].toarray() > 0
+
+        scores = (weights @ context['neighbor_matrix']).toarray()
+
+        # Favorite-genre candidates: the most popular unseen titles in any favorite genre
+        genres = self.genres[start:stop]
+        if genres.nnz and context['genre_matrix'].shape[0]:
+            in_genre = (genres @ context['genre_matrix']).toarray() > 0
+            eligible = in_genre & ~in_library
+            ranks = np.where(eligible, context['popularity_rank'], np.inf)
+            top = _top_columns(-ranks, GENRE_CANDIDATES)
+            top_popularity = context['popularity'][top]
+            valid = np.isfinite(np.take_along_axis(ranks, top, axis=1))
+            row_max = np.where(valid, top_popularity, 0).max(axis=1, keepdims=True)
+            row_max[row_max == 0] = 1.0
+            genre_scores = np.where(valid, GENRE_PREFERENCE_WEIGHT * top_popularity / row_max, 0.0)
+            np.add.at(scores, (np.arange(stop - start)[:, None], top), genre_scores)
+
+        # Factor model: the user's best unseen titles, as FactorModel.top_items
+        factors = context['factors']
+        if factors is not None:
+            user_positions, known = _positions(np.asarray(factors['user_ids']), self.user_ids[start:stop])
+            if known.any():
+                factor_scores = np.full((stop - start, n_items), -np.inf)
+                columns = context['factor_columns']
+                on_axis = columns >= 0
+                predicted = np.asarray(factors['user_factors'])[user_positions[known]] @ np.asarray(factors['item_factors']).T
+                block = factor_scores[known]
+                block[:, columns[on_axis]] = predicted[:, on_axis]
+                factor_scores[known] = block
+                factor_scores[in_library] = -np.inf
+                top = _top_columns(factor_scores, MAX_CANDIDATES)
+                picked = np.take_along_axis(factor_scores, top, axis=1)
+                np.add.at(scores, (np.arange(stop - start)[:, None], top), np.where(np.isfinite(picked), FACTOR_WEIGHT * picked, 0.0))
+
+        scores[in_library] = -np.inf
+        return scores
+
+    def ranked_lists(self):
+        """Yield (User id, ranked (Movie id, score) pairs, library weights) for every user of the shard"""
+        item_ids = self.context['item_ids']
+        batch_size = max(1, SCORE_BATCH_CELLS // max(len(item_ids), 1))
+        for start in range(0, len(self.user_ids), batch_size):
+            stop = min(start + batch_size, len(self.user_ids))
+            scores = self.score_batch(start, stop)
+            # Zero scores aren't candidates, but negatives are kept as in build()
+            scores[scores == 0] = -np.inf
+            top = _top_columns(scores, MAX_CANDIDATES)
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            finite = np.isfinite(top_scores)
+            for offset in range(stop - start):
+                row = self.weights[start + offset]
+                library_row = self.library[start + offset]
+                weights = dict.fromkeys(item_ids[library_row.indices].tolist(), 0.0)
+                weights.update(zip(item_ids[row.indices].tolist(), row.data.tolist()))
+                keep = finite[offset]
+                ranked = list(zip(item_ids[top[offset][keep]].tolist(), top_scores[offset][keep].tolist()))
+                yield int(self.user_ids[start + offset]), ranked, weights
+
+
+def precompute_shard(task):
+    """Pool task: score and write one shard into `generation`; returns (users written, seconds)"""
+    user_ids, generation = task
+    started = time.perf_counter()
+    scorer = ShardScorer(_context, user_ids)
+    client = MovieCacheService.get_redis_client()
+
+    written = 0
+    pipe = client.pipeline(transaction=False)
+    for user_id, ranked, weights in scorer.ranked_lists():
+        RecommendationService.write_list(pipe, user_id, ranked, weights, generation)
+        written += 1
+        if written % WRITE_BATCH_USERS == 0:
+            pipe.execute()
+    pipe.execute()
+    return written, time.perf_counter() - started
+
+
+class RecommendationPrecomputer:
+    """Write a complete new generation of recommendation lists and switch readers to it"""
+
+    def __init__(self, workers=None, shard_size=DEFAULT_SHARD_SIZE, log=print):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.shard_size = shard_size
+        self.log = log
+
+    def run(self, user_ids):
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            raise RuntimeError('Redis is required to store precomputed recommendations')
+        if not client.set(PRECOMPUTE_LOCK_KEY, 1, nx=True, ex=PRECOMPUTE_LOCK_TTL):
+            raise RuntimeError('Another precompute is already running')
+
+        try:
+            previous = current_generation(client)
+            generation = previous + 1
+            # Users written to from here on are rebuilt lazily once the new generation is live
+            client.delete(RECOMMENDATIONS_TOUCHED_KEY)
+
+            started = time.perf_counter()
+            _context.clear()
+            _context.update(build_context())
+            self.log(f'Loaded scoring context for {len(_context["item_ids"])} movies in {time.perf_counter() - started:.1f}s')
+
+            shards = [(user_ids[start:start + self.shard_size], generation) for start in range(0, len(user_ids), self.shard_size)]
+            written = self.run_shards(shards)
+
+            self.publish(client, previous, generation)
+            elapsed = time.perf_counter() - started
+            return {
+                'generation': generation,
+                'users': written,
+                'seconds': elapsed,
+                'users_per_second': written / elapsed if elapsed else 0.0,
+            }
+        finally:
+            client.delete(PRECOMPUTE_LOCK_KEY)
+
+    def run_shards(self, shards):
+        written = 0
+        if self.workers == 1:
+            for shard in shards:
+                shard_written, seconds = precompute_shard(shard)
+                written += shard_written
+                self.log(f'  shard of {shard_written} users in {seconds:.1f}s ({shard_written / seconds:.0f} users/s)')
+            return written
+
+        # Forked workers inherit the scoring context; database connections are reopened per process
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(self.workers) as pool:
+            for shard_written, seconds in pool.imap_unordered(precompute_shard, shards):
+                written += shard_written
+                self.log(f'  shard of {shard_written} users in {seconds:.1f}s ({shard_written / seconds:.0f} users/s)')
+        return written
+
+    def publish(self, client, previous, generation):
+        """Switch readers to the new generation, then drop stale lists and the old generation"""
+        client.set(RECOMMENDATIONS_GENERATION_KEY, generation)
+
+        touched = [int(user_id) for user_id in client.smembers(RECOMMENDATIONS_TOUCHED_KEY)]
+        if touched:
+            pipe = client.pipeline(transaction=False)
+            for user_id in touched:
+                for kind in ('ranked', 'library', 'weights'):
+                    pipe.delete(_key(kind, user_id, generation))
+            pipe.delete(RECOMMENDATIONS_TOUCHED_KEY)
+            pipe.execute()
+            self.log(f'Dropped {len(touched)} lists changed during the run; they rebuild on next read')
+
+        stale = 0
+        batch = []
+        for key in client.scan_iter(match=f'{RECOMMENDATIONS_KEY_PREFIX}{previous}:*', count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                stale += client.unlink(*batch)
+                batch = []
+        if batch:
+            stale += client.unlink(*batch)
+        self.log(f'Published generation {generation}, removed {stale} keys of generation {previous}')
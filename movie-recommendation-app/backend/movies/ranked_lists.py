@@ -0,0 +1,188 @@
+"""
+Materialized ranked lists for the catalog list pages
+Trending, top rated, movies, TV, regional category and per-genre rankings are refreshed by a
+scheduled job into RankedListEntry and Redis, so serving a page is a slice of
+a precomputed ranking joined to local rows, with no TMDB call at request time
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .cache_service import MovieCacheService
+from .models import Movie, RankedListEntry
+
+
+RANKED_LIST_KEY_PREFIX = 'movie_api:ranked:'
+RANKED_LIST_TTL = 60 * 60 * 24 * 7  # Outlives several missed refreshes; the table is the fallback anyway
+RANKED_LIST_PAGE_SIZE = 20  # TMDB's page size, so `page` means the same on both paths
+TMDB_PAGES = 10  # TMDB pages materialized per list type
+GENRE_LIST_SIZE = 500  # Local titles kept per genre list
+
+# List types fetched from TMDB, by the TMDBService method serving them
+TMDB_LIST_TYPES = {
+    'trending': 'get_trending_movies',
+    'top_rated': 'get_top_rated_movies',
+    'movies': 'get_movies',
+    'tv': 'get_tv_shows',
+}
+
+# Regional category pages, as Movie.objects.browse() filters; refreshed from TMDB
+# discover with the same filters, and ranked from the local catalog until then
+CATEGORY_LISTS = {
+    'anime': {'media_type': 'movie', 'genre_ids': [16], 'original_language': 'ja'},  # Japanese animation
+    'kdrama': {'media_type': 'tv', 'genre_ids': [18], 'original_language': 'ko'},  # Korean drama series
+}
+
+
+def list_key(list_type, genre_id=None):
+    return f'genre:{genre_id}' if list_type == 'genre' else list_type
+
+
+def category_queryset(category):
+    return Movie.objects.browse(**CATEGORY_LISTS[category])
+
+
+def fetch_list_page(tmdb_service, list_type, page):
+    """One TMDB page of a list type or category; raises TMDBUnavailable instead of returning mock data"""
+    if list_type in CATEGORY_LISTS:
+        return tmdb_service.discover(page=page, strict=True, **CATEGORY_LISTS[list_type])
+    return getattr(tmdb_service, TMDB_LIST_TYPES[list_type])(page=page, strict=True)
+
+
+def _redis_key(key):
+    return f'{RANKED_LIST_KEY_PREFIX}{key}'
+
+
+def _upstream_totals_key(key):
+    return f'movie_api_ranked_upstream_{key}'
+
+
+class RankedListService:
+    """Refresh and serve materialized ranked lists"""
+
+    @staticmethod
+    def refresh_tmdb_list(list_type, tmdb_service, pages=TMDB_PAGES):
+        """
+        Fetch the first `pages` of a TMDB list or category, sync its titles and publish the ranking
+
+        Every page is fetched before anything is written: if TMDB fails on any
+        of them, nothing is synced, the previous ranking keeps being served and
+        TMDBUnavailable is raised. Returns the ranking's length.
+        """
+        results, upstream = [], None
+        for page in range(1, pages + 1):
+            data = fetch_list_page(tmdb_service, list_type, page)
+            if upstream is None:
+                upstream = {'total_pages': data.get('total_pages', 0), 'total_results': data.get('total_results', 0)}
+            results.extend(data.get('results', []))
+            if page >= data.get('total_pages', pages):
+                break
+
+        movies, seen = [], set()
+        # Facet caches are invalidated once for the whole refresh
+        with MovieCacheService.deferred_catalog_versions():
+            for item in results:
+                try:
+                    movie = tmdb_service.sync_movie_to_db(item)
+                except Exception as e:
+                    print(f"⚠️ Ranked list sync error for TMDB id {item.get('id')}: {e}")
+                    continue
+                if movie is not None and movie.id not in seen:
+                    seen.add(movie.id)
+                    movies.append(movie)
+        # Nothing that synced is not a ranking worth replacing the previous one with
+        if movies:
+            RankedListService.publish(list_key(list_type), movies)
+            # Only the first pages are materialized; later pages are still served from TMDB
+            try:
+                cache.set(_upstream_totals_key(list_key(list_type)), upstream, RANKED_LIST_TTL)
+            except Exception as e:
+                print(f"⚠️ Ranked list cache error for {list_type}: {e}")
+        return len(movies)
+
+    @staticmethod
+    def refresh_genre_lists():
+        """Rank the local catalog by popularity within every genre; returns the number of lists"""
+        genre_ids = set()
+        for row in Movie.objects.values_list('genre_ids', flat=True).iterator(chunk_size=10000):
+            genre_ids.update(row or [])
+        for genre_id in sorted(genre_ids):
+            movies = list(Movie.objects.with_genres([genre_id]).by_popularity().only('id', 'tmdb_id')[:GENRE_LIST_SIZE])
+            RankedListService.publish(list_key('genre', genre_id), movies)
+
+        # Genres no title has any more would otherwise keep serving their old list
+        stale_keys = set(
+            RankedListEntry.objects.filter(list_key__startswith='genre:').values_list('list_key', flat=True).distinct()
+        ) - {list_key('genre', genre_id) for genre_id in genre_ids}
+        for key in stale_keys:
+            RankedListService.publish(key, [])
+        return len(genre_ids)
+
+    @staticmethod
+    def publish(key, movies):
+        """Replace a list in the table and in Redis with `movies`, in rank order"""
+        refreshed_at = timezone.now()
+        with transaction.atomic():
+            RankedListEntry.objects.filter(list_key=key).delete()
+            RankedListEntry.objects.bulk_create([
+                RankedListEntry(list_key=key, rank=rank, movie_id=movie.id, tmdb_id=movie.tmdb_id, refreshed_at=refreshed_at)
+                for rank, movie in enumerate(movies, start=1)
+            ])
+
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return
+        try:
+            # Built under a temporary key and renamed, so readers never see a partial list
+            staging_key = f'{_redis_key(key)}:staging'
+            pipe = client.pipeline()
+            pipe.delete(staging_key)
+            if movies:
+                pipe.rpush(staging_key, *(movie.id for movie in movies))
+                pipe.rename(staging_key, _redis_key(key))
+                pipe.expire(_redis_key(key), RANKED_LIST_TTL)
+            else:
+                pipe.delete(_redis_key(key))
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Ranked list cache error for {key}: {e}")
+
+    @staticmethod
+    def get_ids(key, offset, limit):
+        """A slice of a list as (Movie ids, list length); length 0 if it was never materialized"""
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.lrange(_redis_key(key), offset, offset + limit - 1)
+                pipe.llen(_redis_key(key))
+                movie_ids, total = pipe.execute()
+                if total:
+                    return [int(movie_id) for movie_id in movie_ids], total
+            except Exception as e:
+                print(f"⚠️ Ranked list cache error for {key}: {e}")
+
+        entries = RankedListEntry.objects.filter(list_key=key)
+        movie_ids = list(
+            entries.filter(rank__gt=offset, rank__lte=offset + limit).order_by('rank').values_list('movie_id', flat=True)
+        )
+        return movie_ids, entries.count()
+
+    @staticmethod
+    def get_upstream_totals(key):
+        """TMDB's total pages and results for a list recorded at its last refresh, or None"""
+        try:
+            return cache.get(_upstream_totals_key(key))
+        except Exception as e:
+            print(f"⚠️ Ranked list cache error for {key}: {e}")
+            return None
+
+    @staticmethod
+    def get_page(key, page, page_size=RANKED_LIST_PAGE_SIZE):
+        """Movies on a page of a list and the list length, or None if the list or this page isn't materialized"""
+        offset = (page - 1) * page_size
+        movie_ids, total = RankedListService.get_ids(key, offset, page_size)
+        if offset >= total:
+            return None
+        movie_map = Movie.objects.in_bulk(movie_ids)
+        return [movie_map[movie_id] for movie_id in movie_ids if movie_id in movie_map], total
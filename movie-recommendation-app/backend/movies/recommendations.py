@@ -0,0 +1,330 @@
+"""
+Personalized "for you" recommendations
+Blends item neighbours of a user's library, their favorite genres and the
+matrix factorization model into a ranked candidate list cached per user in
+Redis, then keeps it current with incremental updates on every favorite,
+watchlist or rating write. Users with nothing but favorite genres are served
+the shared cold-start lists instead of a list of their own
+"""
+
+from collections import defaultdict
+from redis.exceptions import WatchError
+from .cache_service import MovieCacheService
+from .cold_start import ColdStartService, genre_set_key, profile_genre_ids
+from .collaborative import FAVORITE_WEIGHT, WATCHLIST_WEIGHT, RATING_MIDPOINT, RATING_SCALE
+from .content import ContentSimilarityService
+from .factorization import FactorModel
+from .models import Movie, Favorite, Watchlist, MovieRating, MovieNeighbor
+
+
+RECOMMENDATIONS_KEY_PREFIX = 'movie_api:recs:'
+RECOMMENDATIONS_GENERATION_KEY = RECOMMENDATIONS_KEY_PREFIX + 'generation'
+RECOMMENDATIONS_TOUCHED_KEY = RECOMMENDATIONS_KEY_PREFIX + 'touched'  # Users written to while a batch precompute runs
+RECOMMENDATIONS_TTL = 60 * 60 * 24 * 7
+MAX_CANDIDATES = 500  # Ranked candidates kept per user; the trimmed tail is refreshed by the next full build
+NEIGHBORS_PER_SIGNAL = 30  # Neighbours of each library title that receive score
+INTERACTION_ATTEMPTS = 3  # Optimistic retries of an incremental update before the list is dropped
+
+COLLABORATIVE_WEIGHT = 1.0
+CONTENT_WEIGHT = 0.5  # Content neighbours fill in for titles without interaction data
+GENRE_PREFERENCE_WEIGHT = 0.3
+FACTOR_WEIGHT = 1.0  # Matrix factorization scores, when a trained model is published
+GENRE_CANDIDATES = 100  # Popular titles seeded from the profile's favorite genres
+
+
+def _key(kind, user_id, generation=0):
+    return f'{RECOMMENDATIONS_KEY_PREFIX}{generation}:{kind}:{user_id}'
+
+
+def current_generation(client):
+    """Generation of the lists readers use; a batch precompute publishes a new one"""
+    return int(client.get(RECOMMENDATIONS_GENERATION_KEY) or 0)
+
+
+def interaction_weight(is_favorite, is_watchlisted, rating):
+    """Combined preference signal of one user for one movie"""
+    weight = 0.0
+    if is_favorite:
+        weight += FAVORITE_WEIGHT
+    if is_watchlisted:
+        weight += WATCHLIST_WEIGHT
+    if rating is not None:
+        weight += (rating - RATING_MIDPOINT) / RATING_SCALE
+    return weight
+
+
+class RecommendationService:
+    """
+    Cached per-user recommendation lists
+
+    Three Redis keys per user: `ranked` (sorted set of candidate Movie ids by
+    score), `library` (set of Movie ids already favorited, watchlisted or
+    rated, never recommended) and `weights` (hash of the preference weight
+    each library title currently contributes). A write only applies the
+    change in that title's weight to its neighbours, so the cost of an update
+    or a read doesn't grow with the size of the library. Keys carry the
+    generation number, so a batch precompute can write a complete new set
+    and switch readers over by bumping one counter.
+    """
+
+    @staticmethod
+    def get_neighbor_scores(movie_ids):
+        """Blended collaborative and content neighbour scores per source Movie id"""
+        neighbor_scores = defaultdict(dict)
+
+        rows = MovieNeighbor.objects.filter(
+            movie_id__in=movie_ids, rank__lte=NEIGHBORS_PER_SIGNAL
+        ).values_list('movie_id', 'neighbor_id', 'score')
+        for movie_id, neighbor_id, score in rows:
+            neighbor_scores[movie_id][neighbor_id] = COLLABORATIVE_WEIGHT * score
+
+        for movie_id in movie_ids:
+            similar = ContentSimilarityService.get_similar_ids(movie_id, NEIGHBORS_PER_SIGNAL) or []
+            scores = neighbor_scores[movie_id]
+            for neighbor_id, score in similar:
+                scores[neighbor_id] = scores.get(neighbor_id, 0.0) + CONTENT_WEIGHT * score
+
+        return neighbor_scores
+
+    @staticmethod
+    def get_library_weights(user_id, movie_ids=None):
+        """Current preference weight per Movie id from the user's library tables"""
+        favorites = Favorite.objects.filter(user_id=user_id)
+        watchlist = Watchlist.objects.filter(user_id=user_id)
+        ratings = MovieRating.objects.filter(user_id=user_id)
+        if movie_ids is not None:
+            favorites = favorites.filter(movie_id__in=movie_ids)
+            watchlist = watchlist.filter(movie_id__in=movie_ids)
+            ratings = ratings.filter(movie_id__in=movie_ids)
+
+        favorite_ids = set(favorites.values_list('movie_id', flat=True))
+        watchlist_ids = set(watchlist.values_list('movie_id', flat=True))
+        rating_values = dict(ratings.values_list('movie_id', 'rating'))
+
+        library_ids = favorite_ids | watchlist_ids | set(rating_values)
+        return {
+            movie_id: interaction_weight(movie_id in favorite_ids, movie_id in watchlist_ids, rating_values.get(movie_id))
+            for movie_id in library_ids
+        }
+
+    @staticmethod
+    def get_profile_genres(user_id):
+        from users.models import UserProfile
+
+        favorite_genres = UserProfile.objects.filter(user_id=user_id).values_list('favorite_genres', flat=True).first()
+        return profile_genre_ids(favorite_genres)
+
+    @staticmethod
+    def get_genre_scores(user_id, exclude_ids):
+        """Popular titles in the profile's favorite genres, scored by relative popularity"""
+        genre_ids = RecommendationService.get_profile_genres(user_id)
+        if not genre_ids:
+            return {}
+
+        movies = list(
+            Movie.objects.with_any_genre(genre_ids)
+            .exclude(id__in=exclude_ids)
+            .by_popularity()
+            .values_list('id', 'popularity')[:GENRE_CANDIDATES]
+        )
+        top_popularity = max((popularity for _, popularity in movies), default=0) or 1.0
+        return {movie_id: GENRE_PREFERENCE_WEIGHT * popularity / top_popularity for movie_id, popularity in movies}
+
+    @staticmethod
+    def build(user_id):
+        """Compute a user's ranked list from scratch and cache it"""
+        weights = RecommendationService.get_library_weights(user_id)
+        if not weights and FactorModel.user_vector(user_id) is None:
+            ranked = RecommendationService.build_cold(user_id)
+            if ranked is not None:
+                return ranked
+        neighbor_scores = RecommendationService.get_neighbor_scores(list(weights))
+
+        scores = defaultdict(float)
+        for movie_id, weight in weights.items():
+            for neighbor_id, score in neighbor_scores[movie_id].items():
+                scores[neighbor_id] += weight * score
+        for movie_id, score in RecommendationService.get_genre_scores(user_id, list(weights)).items():
+            scores[movie_id] += score
+        for movie_id, score in FactorModel.top_items(user_id, MAX_CANDIDATES, exclude_ids=weights):
+            scores[movie_id] += FACTOR_WEIGHT * score
+
+        ranked = sorted(
+            # Negative candidates are kept so later writes adjust them from their true score
+            ((movie_id, score) for movie_id, score in scores.items() if movie_id not in weights and score),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:MAX_CANDIDATES]
+
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                RecommendationService.write_list(pipe, user_id, ranked, weights, current_generation(client))
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠️ Recommendation cache error for user {user_id}: {e}")
+        return ranked
+
+    @staticmethod
+    def build_cold(user_id):
+        """
+        Point a user without a library at the cold-start list of their genres
+
+        Only a marker is cached; the list itself is shared by everyone with the
+        same favorite genres. Returns None until the cold-start lists are built.
+        """
+        if ColdStartService.load() is None:
+            return None
+
+        genre_ids = RecommendationService.get_profile_genres(user_id)
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                RecommendationService.write_list(pipe, user_id, [], {}, current_generation(client), cold_genres=genre_ids)
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠️ Recommendation cache error for user {user_id}: {e}")
+        return ColdStartService.get_ranked(genre_ids)
+
+    @staticmethod
+    def write_list(pipe, user_id, ranked, weights, generation, cold_genres=None):
+        """Queue the commands replacing a user's cached list in `generation`"""
+        for kind in ('ranked', 'library', 'weights'):
+            pipe.delete(_key(kind, user_id, generation))
+        if ranked:
+            pipe.zadd(_key('ranked', user_id, generation), dict(ranked))
+        if weights:
+            pipe.sadd(_key('library', user_id, generation), *weights)
+            pipe.hset(_key('weights', user_id, generation), mapping=weights)
+        # Marks the list as built even when it is empty
+        pipe.hset(_key('weights', user_id, generation), 'built', 1)
+        if cold_genres is not None:
+            pipe.hset(_key('weights', user_id, generation), 'cold', genre_set_key(cold_genres))
+        for kind in ('ranked', 'library', 'weights'):
+            pipe.expire(_key(kind, user_id, generation), RECOMMENDATIONS_TTL)
+
+    @staticmethod
+    def get_recommendations(user_id, limit=20, offset=0):
+        """A page of a user's ranked list as ((Movie id, score) pairs, total candidates)"""
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                generation = current_generation(client)
+                weights_key = _key('weights', user_id, generation)
+                built, cold = client.hmget(weights_key, ['built', 'cold'])
+                if not built:
+                    RecommendationService.build(user_id)
+                    cold = client.hget(weights_key, 'cold')
+                if cold is not None:
+                    genre_ids = [int(genre_id) for genre_id in cold.decode().split(',') if genre_id]
+                    return ColdStartService.get_recommendations(genre_ids, limit, offset)
+                pipe = client.pipeline()
+                pipe.zrevrangebyscore(
+                    _key('ranked', user_id, generation), '+inf', '(0', start=offset, num=limit, withscores=True
+                )
+                pipe.zcount(_key('ranked', user_id, generation), '(0', '+inf')
+                entries, total = pipe.execute()
+                return [(int(movie_id), score) for movie_id, score in entries], total
+            except Exception as e:
+                print(f"⚠️ Recommendation cache error for user {user_id}: {e}")
+
+        ranked = [(movie_id, score) for movie_id, score in RecommendationService.build(user_id) if score > 0]
+        return ranked[offset:offset + limit], len(ranked)
+
+    @staticmethod
+    def invalidate(user_id, generation=None):
+        """Drop a user's cached list so the next read rebuilds it"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return
+
+        try:
+            if generation is None:
+                generation = current_generation(client)
+            client.delete(*(_key(kind, user_id, generation) for kind in ('ranked', 'library', 'weights')))
+        except Exception as e:
+            print(f"⚠️ Recommendation cache error for user {user_id}: {e}")
+
+    @staticmethod
+    def record_interaction(user_id, movie_ids):
+        """
+        Apply library changes for the given Movie ids to a cached list
+
+        Call after a favorite, watchlist or rating write. Only the difference
+        between a title's new and previously applied weight is propagated to
+        its neighbours; users without a cached list are built on next read.
+        """
+        client = MovieCacheService.get_redis_client()
+        if client is None or not movie_ids:
+            return
+
+        try:
+            # Lets a running batch precompute know this user's snapshot is stale
+            pipe = client.pipeline()
+            pipe.sadd(RECOMMENDATIONS_TOUCHED_KEY, user_id)
+            pipe.expire(RECOMMENDATIONS_TOUCHED_KEY, RECOMMENDATIONS_TTL)
+            pipe.get(RECOMMENDATIONS_GENERATION_KEY)
+            generation = int(pipe.execute()[-1] or 0)
+            weights_key = _key('weights', user_id, generation)
+            ranked_key = _key('ranked', user_id, generation)
+            library_key = _key('library', user_id, generation)
+            movie_ids = list(movie_ids)
+
+            # Concurrent writes for the same user would both apply the delta from
+            # the same previous weights; the loser of the WATCH re-reads and retries
+            for _ in range(INTERACTION_ATTEMPTS):
+                with client.pipeline() as pipe:
+                    try:
+                        pipe.watch(weights_key)
+                        built, cold = pipe.hmget(weights_key, ['built', 'cold'])
+                        if not built:
+                            return
+                        if cold is not None:
+                            # A first interaction: the next read builds a personal list
+                            pipe.unwatch()
+                            RecommendationService.invalidate(user_id, generation)
+                            return
+
+                        applied = pipe.hmget(weights_key, movie_ids)
+                        current = RecommendationService.get_library_weights(user_id, movie_ids)
+                        deltas = {
+                            movie_id: current.get(movie_id, 0.0) - float(previous or 0.0)
+                            for movie_id, previous in zip(movie_ids, applied)
+                        }
+                        deltas = {movie_id: delta for movie_id, delta in deltas.items() if delta}
+                        if not deltas:
+                            return
+
+                        neighbor_scores = RecommendationService.get_neighbor_scores(list(deltas))
+                        increments = defaultdict(float)
+                        for movie_id, delta in deltas.items():
+                            for neighbor_id, score in neighbor_scores[movie_id].items():
+                                increments[neighbor_id] += delta * score
+
+                        candidates = list(increments)
+                        in_library = pipe.smismember(library_key, candidates) if candidates else []
+
+                        pipe.multi()
+                        for neighbor_id, is_member in zip(candidates, in_library):
+                            if not is_member and neighbor_id not in current:
+                                pipe.zincrby(ranked_key, increments[neighbor_id], neighbor_id)
+                        for movie_id in movie_ids:
+                            if movie_id in current:
+                                pipe.sadd(library_key, movie_id)
+                                pipe.hset(weights_key, movie_id, current[movie_id])
+                                pipe.zrem(ranked_key, movie_id)
+                            else:
+                                pipe.srem(library_key, movie_id)
+                                pipe.hdel(weights_key, movie_id)
+                        pipe.zremrangebyrank(ranked_key, 0, -(MAX_CANDIDATES + 1))
+                        pipe.execute()
+                        return
+                    except WatchError:
+                        continue
+
+            # Still contended: drop the list rather than leave double-applied deltas
+            RecommendationService.invalidate(user_id, generation)
+        except Exception as e:
+            print(f"⚠️ Recommendation update error for user {user_id}: {e}")
@@ -0,0 +1,67 @@
+"""
+Local search over the movie catalog
+Postgres full-text search (weighted tsvector), plus pg_trgm title similarity for
+typo tolerance when SEARCH_TRIGRAM is enabled
+"""
+
+import math
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from .models import Movie
+
+
+SEARCH_CONFIG = 'english'
+SEARCH_PAGE_SIZE = 20
+TITLE_SIMILARITY_WEIGHT = 0.5  # Trigram title similarity relative to full-text rank
+
+
+class LocalSearchService:
+    """Ranked search over the local Movie table"""
+
+    @staticmethod
+    def search(query, page=1, page_size=SEARCH_PAGE_SIZE, media_type=None):
+        """
+        Search titles, taglines and overviews
+
+        Rows match the full-text query (title weighted over tagline and
+        overview). With SEARCH_TRIGRAM enabled they may also match on trigram
+        title similarity, so misspelled titles still match. Results are
+        returned in the TMDB page format.
+        """
+        query = ' '.join((query or '').split())
+        if not query:
+            return LocalSearchService.empty_page(page)
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        matches = Q(search_vector=search_query)
+        rank = SearchRank(F('search_vector'), search_query)
+        if settings.SEARCH_TRIGRAM:
+            matches |= Q(title__trigram_similar=query)
+            rank = rank + TrigramSimilarity('title', query) * TITLE_SIMILARITY_WEIGHT
+        queryset = Movie.objects.filter(matches)
+        if media_type:
+            queryset = queryset.filter(media_type=media_type)
+
+        total_results = queryset.count()
+        if not total_results:
+            return LocalSearchService.empty_page(page)
+
+        ranked = queryset.annotate(rank=rank).order_by('-rank', '-popularity', '-id')
+
+        offset = (page - 1) * page_size
+        return {
+            'page': page,
+            'results': list(ranked[offset:offset + page_size]),
+            'total_pages': math.ceil(total_results / page_size),
+            'total_results': total_results,
+        }
+
+    @staticmethod
+    def empty_page(page):
+        return {
+            'page': page,
+            'results': [],
+            'total_pages': 0,
+            'total_results': 0,
+        }
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Movie, Favorite, Watchlist, MovieRating
+from .library import LibraryService
 
 
 class MovieDetailSerializer(serializers.ModelSerializer):
@@ -106,43 +107,20 @@ class FavoriteSerializer(serializers.ModelSerializer):
     """Serializer for user favorites"""
     movie = SimpleMovieSerializer(read_only=True)
     movie_id = serializers.IntegerField(write_only=True)
+    # Movie and TV ids overlap on TMDB; without it an unknown id is never looked up
+    media_type = serializers.ChoiceField(choices=['movie', 'tv'], write_only=True, required=False)
     
     class Meta:
         model = Favorite
-        fields = ['id', 'movie', 'movie_id', 'created_at']
+        fields = ['id', 'movie', 'movie_id', 'media_type', 'created_at']
         read_only_fields = ['id', 'created_at']
     
     def create(self, validated_data):
-        movie_id = validated_data.pop('movie_id')
-        user = self.context['request'].user
-        
-        # Get or create the movie
-        movie, created = Movie.objects.get_or_create(
-            tmdb_id=movie_id,
-            defaults={
-                'title': f'Movie {movie_id}',  # Placeholder title
-                'overview': '',
-                'poster_path': '',
-                'backdrop_path': '',
-                'vote_average': 0.0,
-                'vote_count': 0,
-                'popularity': 0.0,
-                'genre_ids': [],
-                'media_type': 'movie'
-            }
+        # One insert-on-conflict statement; adding a title twice just moves it to the top
+        favorite, self.created = LibraryService.upsert(
+            Favorite, self.context['request'].user, validated_data['movie_id'], move_to_top=True,
+            media_type=validated_data.get('media_type')
         )
-        
-        # Create the favorite
-        favorite, created = Favorite.objects.get_or_create(
-            user=user,
-            movie=movie,
-            defaults=validated_data
-        )
-        
-        if not created:
-            # If favorite already exists, update the created_at timestamp
-            favorite.save()
-        
         return favorite
     
     def validate_movie_id(self, value):
@@ -150,61 +128,25 @@ class FavoriteSerializer(serializers.ModelSerializer):
         if not isinstance(value, int) or value <= 0:
             raise serializers.ValidationError("movie_id must be a positive integer")
         return value
-    
-    def validate(self, data):
-        """Validate that the user hasn't already favorited this movie"""
-        user = self.context['request'].user
-        movie_id = data.get('movie_id')
-        
-        if movie_id:
-            # Check if user already has this movie in favorites
-            if Favorite.objects.filter(user=user, movie__tmdb_id=movie_id).exists():
-                raise serializers.ValidationError("This movie is already in your favorites")
-        
-        return data
 
 
 class WatchlistSerializer(serializers.ModelSerializer):
     """Serializer for user watchlist"""
     movie = SimpleMovieSerializer(read_only=True)
     movie_id = serializers.IntegerField(write_only=True)
+    media_type = serializers.ChoiceField(choices=['movie', 'tv'], write_only=True, required=False)
     
     class Meta:
         model = Watchlist
-        fields = ['id', 'movie', 'movie_id', 'created_at']
+        fields = ['id', 'movie', 'movie_id', 'media_type', 'created_at']
         read_only_fields = ['id', 'created_at']
     
     def create(self, validated_data):
-        movie_id = validated_data.pop('movie_id')
-        user = self.context['request'].user
-        
-        # Get or create the movie
-        movie, created = Movie.objects.get_or_create(
-            tmdb_id=movie_id,
-            defaults={
-                'title': f'Movie {movie_id}',
-                'overview': '',
-                'poster_path': '',
-                'backdrop_path': '',
-                'vote_average': 0.0,
-                'vote_count': 0,
-                'popularity': 0.0,
-                'genre_ids': [],
-                'media_type': 'movie'
-            }
-        )
-        
-        # Create the watchlist item
-        watchlist_item, created = Watchlist.objects.get_or_create(
-            user=user,
-            movie=movie,
-            defaults=validated_data
+        # One insert-on-conflict statement; adding a title twice just moves it to the top
+        watchlist_item, self.created = LibraryService.upsert(
+            Watchlist, self.context['request'].user, validated_data['movie_id'], move_to_top=True,
+            media_type=validated_data.get('media_type')
         )
-        
-        if not created:
-            # If watchlist item already exists, update the created_at timestamp
-            watchlist_item.save()
-        
         return watchlist_item
     
     def validate_movie_id(self, value):
@@ -212,67 +154,33 @@ class WatchlistSerializer(serializers.ModelSerializer):
         if not isinstance(value, int) or value <= 0:
             raise serializers.ValidationError("movie_id must be a positive integer")
         return value
-    
-    def validate(self, data):
-        """Validate that the user hasn't already added this movie to watchlist"""
-        user = self.context['request'].user
-        movie_id = data.get('movie_id')
-        
-        if movie_id:
-            # Check if user already has this movie in watchlist
-            if Watchlist.objects.filter(user=user, movie__tmdb_id=movie_id).exists():
-                raise serializers.ValidationError("This movie is already in your watchlist")
-        
-        return data
 
 
 class MovieRatingSerializer(serializers.ModelSerializer):
     """Serializer for movie ratings"""
     movie = MovieSerializer(read_only=True)
     movie_id = serializers.IntegerField(write_only=True)
+    media_type = serializers.ChoiceField(choices=['movie', 'tv'], write_only=True, required=False)
     
     class Meta:
         model = MovieRating
-        fields = ['id', 'movie', 'movie_id', 'rating', 'review', 'created_at', 'updated_at']
+        fields = ['id', 'movie', 'movie_id', 'media_type', 'rating', 'review', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def create(self, validated_data):
-        movie_id = validated_data.pop('movie_id')
-        user = self.context['request'].user
-        
-        # Get or create the movie
-        movie, created = Movie.objects.get_or_create(
-            tmdb_id=movie_id,
-            defaults={
-                'title': f'Movie {movie_id}',  # Placeholder title
-                'overview': '',
-                'poster_path': '',
-                'backdrop_path': '',
-                'vote_average': 0.0,
-                'vote_count': 0,
-                'popularity': 0.0,
-                'genre_ids': [],
-                'media_type': 'movie'
-            }
-        )
-        
-        # Create or update the rating
-        rating, created = MovieRating.objects.get_or_create(
-            user=user,
-            movie=movie,
-            defaults=validated_data
+        # One insert-on-conflict statement; rating a title again updates the existing rating
+        values = {field: validated_data[field] for field in ('rating', 'review') if field in validated_data}
+        rating, self.created = LibraryService.upsert(
+            MovieRating, self.context['request'].user, validated_data['movie_id'],
+            media_type=validated_data.get('media_type'), **values
         )
-        
-        if not created:
-            # Update existing rating
-            for attr, value in validated_data.items():
-                setattr(rating, attr, value)
-            rating.save()
-        
         return rating
     
     def update(self, instance, validated_data):
         """Update an existing rating"""
+        # movie_id is a TMDB id and the URL already picked the rating; it must not touch the FK
+        validated_data.pop('movie_id', None)
+        validated_data.pop('media_type', None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
@@ -288,4 +196,13 @@ class MovieRatingSerializer(serializers.ModelSerializer):
         """Validate that the movie_id is a positive integer"""
         if not isinstance(value, int) or value <= 0:
             raise serializers.ValidationError("movie_id must be a positive integer")
-        return value 
\ No newline at end of file
+        return value 
+
+class UserRatingSerializer(serializers.ModelSerializer):
+    """Serializer for listing a user's ratings without per-movie user lookups"""
+    movie = SimpleMovieSerializer(read_only=True)
+    
+    class Meta:
+        model = MovieRating
+        fields = ['id', 'movie', 'rating', 'review', 'created_at', 'updated_at']
+        read_only_fields = fields
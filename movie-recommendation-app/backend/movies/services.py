@@ -4,7 +4,42 @@ from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from .models import Movie
+from .cache_service import MovieCacheService
+from .suggest import SuggestionIndex
+from .ann import MovieEmbeddingIndex
+
+
+# Search result caching
+SEARCH_CACHE_TIMEOUT = 60 * 10  # 10 minutes
+POPULAR_SEARCH_CACHE_TIMEOUT = 60 * 60  # 1 hour for frequently searched queries
+POPULAR_SEARCH_THRESHOLD = 5  # Searches before a query counts as popular
+SEARCH_PREFETCH_MIN_POPULARITY = 3  # Searches before pagination behaviour is trusted
+SEARCH_PREFETCH_RATIO = 0.3  # Share of searches that reach page 2 before it is prefetched
+POPULAR_SEARCHES_KEY = 'movie_api:search:popular'
+PAGINATED_SEARCHES_KEY = 'movie_api:search:paginated'
+MAX_TRACKED_SEARCHES = 10000
+
+_search_prefetch_executor = ThreadPoolExecutor(max_workers=2)
+
+TMDB_TIMEOUT = 15  # Seconds per TMDB request
+SEARCH_TMDB_TIMEOUT = 3  # Search requests wait on TMDB; past this the local catalog answers instead
+
+# Movie fields that feed facet counts; changing one invalidates facet caches. Vote
+# averages and counts drift on every sync, so vote thresholds are left to the cache TTL.
+CATALOG_FACET_FIELDS = (
+    'media_type', 'genre_ids', 'original_language', 'release_date', 'runtime',
+)
+
+
+class TMDBUnavailable(Exception):
+    """TMDB could not answer a strict request (no credentials, error status, timeout)"""
+
+
+def normalize_search_query(query):
+    """Trim, case-fold and collapse whitespace so equivalent queries share a cache entry"""
+    return ' '.join((query or '').split()).casefold()
 
 
 class TMDBService:
@@ -31,12 +66,19 @@ class TMDBService:
         else:
             print("TMDB Service: No read token available")
     
-    def _make_request(self, endpoint, params=None):
-        """Make a request to TMDB API with optimized performance"""
+    def _make_request(self, endpoint, params=None, strict=False, timeout=TMDB_TIMEOUT):
+        """
+        Make a request to TMDB API with optimized performance
+
+        Failures fall back to mock data, unless `strict` is set: then they
+        raise TMDBUnavailable, so callers never cache or sync mock titles.
+        """
         print(f"TMDB Service: _make_request called for endpoint: {endpoint}")  # Debug
         
         # Check if we have a valid API key or read token
         if (self.api_key == 'your-tmdb-api-key' or not self.api_key or self.api_key == 'your-tmdb-api-key-here') and not self.read_token:
+            if strict:
+                raise TMDBUnavailable(f'No TMDB credentials for {endpoint}')
             print("TMDB Service: No valid API credentials, using mock data")  # Debug
             # Return mock data for development
             return self._get_mock_data(endpoint, params)
@@ -55,14 +97,15 @@ class TMDBService:
         
         try:
             print(f"TMDB Service: Making request to: {url} with params: {params}")  # Debug
-            # Increased timeout for better reliability
-            response = self.session.get(url, params=params, timeout=15)  # Increased from 10 to 15 seconds
+            response = self.session.get(url, params=params, timeout=timeout)
             print(f"TMDB Service: Response status: {response.status_code}")  # Debug
             
             if response.status_code != 200:
                 print(f"TMDB Service: Error response from TMDB API: {response.status_code} - {response.text}")  # Debug
                 # Only fall back to mock data for 4xx and 5xx errors, not for rate limits
                 if response.status_code >= 400:
+                    if strict:
+                        raise TMDBUnavailable(f'TMDB returned {response.status_code} for {endpoint}')
                     print(f"TMDB Service: Falling back to mock data for endpoint: {endpoint}")  # Debug
                     return self._get_mock_data(endpoint, params)
                 else:
@@ -73,17 +116,25 @@ class TMDBService:
             data = response.json()
             print(f"TMDB Service: Successfully parsed JSON response with {len(data.get('results', []))} results")  # Debug
             return data
+        except TMDBUnavailable:
+            raise
         except requests.Timeout:
             print(f"TMDB Service: Timeout for {endpoint}")  # Debug
+            if strict:
+                raise TMDBUnavailable(f'TMDB timed out for {endpoint}')
             print(f"TMDB Service: Falling back to mock data for endpoint: {endpoint}")  # Debug
             return self._get_mock_data(endpoint, params)
         except requests.RequestException as e:
             print(f"TMDB Service: RequestException for {endpoint}: {str(e)}")  # Debug
+            if strict:
+                raise TMDBUnavailable(f'TMDB request failed for {endpoint}: {e}')
             print(f"TMDB Service: Falling back to mock data for endpoint: {endpoint}")  # Debug
             # Fall back to mock data if API fails
             return self._get_mock_data(endpoint, params)
         except Exception as e:
             print(f"TMDB Service: Unexpected error for {endpoint}: {str(e)}")  # Debug
+            if strict:
+                raise TMDBUnavailable(f'TMDB request failed for {endpoint}: {e}')
             print(f"TMDB Service: Falling back to mock data for endpoint: {endpoint}")  # Debug
             # Fall back to mock data for any other errors
             return self._get_mock_data(endpoint, params)
@@ -314,70 +365,70 @@ class TMDBService:
         """Set data in cache"""
         cache.set(cache_key, data, timeout)
     
-    def get_trending_movies(self, page=1, media_type='movie', time_window='week'):
-        """Get trending movies from TMDB"""
-        print(f"TMDB Service: Getting trending movies, page={page}")  # Debug
-        cache_key = self._get_cache_key('/trending/movie/week', {'page': page})
+    def _get_list_page(self, endpoint, params, strict=False):
+        """
+        A TMDB list page, cached only when TMDB actually answered
+
+        On failure the mock fallback is returned uncached, or TMDBUnavailable
+        is raised when `strict` (the ranked list refresh must not sync or
+        publish mock titles).
+        """
+        cache_key = self._get_cache_key(endpoint, params)
         cached_data = self._get_cached_data(cache_key)
         
         if cached_data:
-            print("TMDB Service: Using cached trending data")  # Debug
+            print(f"TMDB Service: Using cached data for {endpoint}")  # Debug
             return cached_data
         
-        data = self._make_request('/trending/movie/week', {'page': page})
-        print(f"TMDB Service: Got {len(data.get('results', []))} trending items")  # Debug
+        try:
+            data = self._make_request(endpoint, dict(params), strict=True)
+        except TMDBUnavailable as e:
+            if strict:
+                raise
+            print(f"TMDB Service: {e}, serving uncached mock data")  # Debug
+            return self._get_mock_data(endpoint, params)
         self._set_cached_data(cache_key, data)
         return data
     
-    def get_movies(self, page=1, sort_by='popularity.desc'):
+    def get_trending_movies(self, page=1, media_type='movie', time_window='week', strict=False):
+        """Get trending movies from TMDB"""
+        print(f"TMDB Service: Getting trending movies, page={page}")  # Debug
+        data = self._get_list_page('/trending/movie/week', {'page': page}, strict=strict)
+        print(f"TMDB Service: Got {len(data.get('results', []))} trending items")  # Debug
+        return data
+    
+    def get_movies(self, page=1, sort_by='popularity.desc', strict=False):
         """Get movies from TMDB"""
         print(f"TMDB Service: Getting movies, page={page}, sort_by={sort_by}")  # Debug
-        cache_key = self._get_cache_key('/discover/movie', {'page': page, 'sort_by': sort_by})
-        cached_data = self._get_cached_data(cache_key)
-        
-        if cached_data:
-            print("TMDB Service: Using cached movies data")  # Debug
-            return cached_data
-        
-        data = self._make_request('/discover/movie', {
-            'page': page,
-            'sort_by': sort_by
-        })
+        data = self._get_list_page('/discover/movie', {'page': page, 'sort_by': sort_by}, strict=strict)
         print(f"TMDB Service: Got {len(data.get('results', []))} movie items")  # Debug
-        self._set_cached_data(cache_key, data)
         return data
     
-    def get_tv_shows(self, page=1, sort_by='popularity.desc'):
+    def get_tv_shows(self, page=1, sort_by='popularity.desc', strict=False):
         """Get TV shows from TMDB"""
         print(f"TMDB Service: Getting TV shows, page={page}, sort_by={sort_by}")  # Debug
-        cache_key = self._get_cache_key('/discover/tv', {'page': page, 'sort_by': sort_by})
-        cached_data = self._get_cached_data(cache_key)
-        
-        if cached_data:
-            print("TMDB Service: Using cached TV data")  # Debug
-            return cached_data
-        
-        data = self._make_request('/discover/tv', {
-            'page': page,
-            'sort_by': sort_by
-        })
+        data = self._get_list_page('/discover/tv', {'page': page, 'sort_by': sort_by}, strict=strict)
         print(f"TMDB Service: Got {len(data.get('results', []))} TV items")  # Debug
-        self._set_cached_data(cache_key, data)
         return data
     
-    def get_top_rated_movies(self, page=1):
+    def discover(self, media_type='movie', page=1, genre_ids=None, original_language=None, sort_by='popularity.desc', strict=False):
+        """Discover movies or TV shows with all of the given genres and an original language"""
+        print(f"TMDB Service: Discovering {media_type}, page={page}, genres={genre_ids}, language={original_language}")  # Debug
+        params = {'page': page, 'sort_by': sort_by}
+        if genre_ids:
+            params['with_genres'] = ','.join(str(genre_id) for genre_id in genre_ids)
+        if original_language:
+            params['with_original_language'] = original_language
+        
+        data = self._get_list_page(f'/discover/{media_type}', params, strict=strict)
+        print(f"TMDB Service: Got {len(data.get('results', []))} discover items")  # Debug
+        return data
+    
+    def get_top_rated_movies(self, page=1, strict=False):
         """Get top rated movies from TMDB"""
         print(f"TMDB Service: Getting top rated movies, page={page}")  # Debug
-        cache_key = self._get_cache_key('/movie/top_rated', {'page': page})
-        cached_data = self._get_cached_data(cache_key)
-        
-        if cached_data:
-            print("TMDB Service: Using cached top rated data")  # Debug
-            return cached_data
-        
-        data = self._make_request('/movie/top_rated', {'page': page})
+        data = self._get_list_page('/movie/top_rated', {'page': page}, strict=strict)
         print(f"TMDB Service: Got {len(data.get('results', []))} top rated items")  # Debug
-        self._set_cached_data(cache_key, data)
         return data
     
     def search_multi(self, query, page=1):
@@ -414,57 +465,49 @@ class TMDBService:
 
     def search_movies_and_tv(self, query, page=1):
         """Search movies and TV shows separately for consistent results"""
-        print(f"TMDB Service: search_movies_and_tv called with query: '{query}', page: {page}")  # Debug
-        
+        return self._cached_search('general', query, page, self._fetch_movies_and_tv)
+
+    def search_by_actor(self, actor_name, page=1):
+        """Search for movies and TV shows by actor name"""
+        return self._cached_search('actor', actor_name, page, self._fetch_by_actor)
+
+    def search_by_genre(self, genre_name, page=1):
+        """Search for movies and TV shows by genre"""
+        return self._cached_search('genre', genre_name, page, self._fetch_by_genre)
+
+    def _get_search_cache_key(self, search_type, normalized_query, page):
+        """Generate cache key for a normalized search"""
+        return f"tmdb:search:{search_type}:{page}:{normalized_query}"
+
+    def _cached_search(self, search_type, query, page, fetch):
+        """
+        Serve a search from cache, falling back to TMDB and caching the result
+
+        Fetchers make strict TMDB requests with a short timeout, so only real
+        TMDB responses are cached or prefetched. TMDBUnavailable propagates
+        so the caller can answer from the local catalog; other fetch errors
+        return an uncached empty page.
+        """
+        normalized_query = normalize_search_query(query)
+        print(f"TMDB Service: {search_type} search for normalized query: '{normalized_query}', page: {page}")  # Debug
+
+        popularity = self._track_search(search_type, normalized_query, page)
+        cache_key = self._get_search_cache_key(search_type, normalized_query, page)
+        cached_data = self._get_cached_data(cache_key)
+
+        if cached_data is not None:
+            print(f"TMDB Service: Using cached {search_type} search data for query: '{normalized_query}'")  # Debug
+            return cached_data
+
         try:
-            # Search movies
-            print(f"TMDB Service: Searching movies for query: '{query}', page: {page}")  # Debug
-            movies_data = self._make_request('/search/movie', {
-                'query': query,
-                'page': page
-            })
-            
-            # Search TV shows
-            print(f"TMDB Service: Searching TV shows for query: '{query}', page: {page}")  # Debug
-            tv_data = self._make_request('/search/tv', {
-                'query': query,
-                'page': page
-            })
-            
-            # Combine results
-            combined_results = []
-            
-            # Add movies with media_type
-            for movie in movies_data.get('results', []):
-                movie['media_type'] = 'movie'
-                combined_results.append(movie)
-            
-            # Add TV shows with media_type
-            for tv in tv_data.get('results', []):
-                tv['media_type'] = 'tv'
-                combined_results.append(tv)
-            
-            # Sort by popularity (vote_average * vote_count)
-            combined_results.sort(key=lambda x: (x.get('vote_average', 0) * x.get('vote_count', 0)), reverse=True)
-            
-            # Calculate combined totals
-            total_results = movies_data.get('total_results', 0) + tv_data.get('total_results', 0)
-            total_pages = max(movies_data.get('total_pages', 0), tv_data.get('total_pages', 0))
-            
-            print(f"TMDB Service: Combined search results - {len(combined_results)} items (movies: {len(movies_data.get('results', []))}, TV: {len(tv_data.get('results', []))})")  # Debug
-            
-            return {
-                'page': page,
-                'results': combined_results,
-                'total_pages': total_pages,
-                'total_results': total_results
-            }
-            
+            data = fetch(normalized_query, page)
+        except TMDBUnavailable:
+            raise
         except Exception as e:
-            print(f"TMDB Service: Error in search_movies_and_tv for query '{query}': {str(e)}")  # Debug
+            print(f"TMDB Service: Error in {search_type} search for query '{normalized_query}': {str(e)}")  # Debug
             import traceback
             print(f"TMDB Service: Full traceback: {traceback.format_exc()}")  # Debug
-            # Return empty results instead of raising exception
+            # Return empty results instead of raising exception (not cached)
             return {
                 'page': page,
                 'results': [],
@@ -472,189 +515,255 @@ class TMDBService:
                 'total_results': 0
             }
 
-    def search_by_actor(self, actor_name, page=1):
-        """Search for movies and TV shows by actor name"""
-        print(f"TMDB Service: search_by_actor called with actor: '{actor_name}', page: {page}")  # Debug
-        
+        # Popular queries stay cached longer so they are served without TMDB traffic
+        timeout = POPULAR_SEARCH_CACHE_TIMEOUT if popularity >= POPULAR_SEARCH_THRESHOLD else SEARCH_CACHE_TIMEOUT
+        self._set_cached_data(cache_key, data, timeout=timeout)
+
+        if page == 1 and data.get('total_pages', 0) > 1 and self._should_prefetch_search(search_type, normalized_query, popularity):
+            self._prefetch_search_page(search_type, normalized_query, 2, fetch, timeout)
+
+        return data
+
+    def _track_search(self, search_type, normalized_query, page):
+        """Record a search in the popular query and pagination counters, returning its popularity"""
+        client = MovieCacheService.get_redis_client()
+        if client is None or not normalized_query:
+            return 0
+
+        member = f"{search_type}:{normalized_query}"
         try:
-            # First, search for the actor/actress
-            print(f"TMDB Service: Searching for actor: '{actor_name}'")  # Debug
-            person_data = self._make_request('/search/person', {
-                'query': actor_name,
-                'page': 1
-            })
-            
-            if not person_data.get('results'):
-                print(f"TMDB Service: No actor found for '{actor_name}'")  # Debug
-                return {
-                    'page': page,
-                    'results': [],
-                    'total_pages': 0,
-                    'total_results': 0
-                }
-            
-            # Get the first (most relevant) person
-            person = person_data['results'][0]
-            person_id = person['id']
-            person_name = person['name']
-            
-            print(f"TMDB Service: Found actor '{person_name}' with ID {person_id}")  # Debug
-            
-            # Get movies and TV shows for this person
-            combined_results = []
-            
-            # Get movies
-            movies_data = self._make_request(f'/discover/movie', {
-                'with_cast': person_id,
-                'page': page,
-                'sort_by': 'popularity.desc'
-            })
-            
-            # Get TV shows
-            tv_data = self._make_request(f'/discover/tv', {
-                'with_cast': person_id,
-                'page': page,
-                'sort_by': 'popularity.desc'
-            })
-            
-            # Add movies with media_type
-            for movie in movies_data.get('results', []):
-                movie['media_type'] = 'movie'
-                combined_results.append(movie)
-            
-            # Add TV shows with media_type
-            for tv in tv_data.get('results', []):
-                tv['media_type'] = 'tv'
-                combined_results.append(tv)
-            
-            # Sort by popularity
-            combined_results.sort(key=lambda x: (x.get('vote_average', 0) * x.get('vote_count', 0)), reverse=True)
-            
-            # Calculate combined totals
-            total_results = movies_data.get('total_results', 0) + tv_data.get('total_results', 0)
-            total_pages = max(movies_data.get('total_pages', 0), tv_data.get('total_pages', 0))
-            
-            print(f"TMDB Service: Actor search results - {len(combined_results)} items for '{person_name}'")  # Debug
-            
-            return {
-                'page': page,
-                'results': combined_results,
-                'total_pages': total_pages,
-                'total_results': total_results
-            }
-            
+            pipe = client.pipeline()
+            if page == 1:
+                pipe.zincrby(POPULAR_SEARCHES_KEY, 1, member)
+                # Keep only the most searched queries so the set stays bounded
+                pipe.zremrangebyrank(POPULAR_SEARCHES_KEY, 0, -(MAX_TRACKED_SEARCHES + 1))
+            else:
+                pipe.zscore(POPULAR_SEARCHES_KEY, member)
+            if page == 2:
+                pipe.zincrby(PAGINATED_SEARCHES_KEY, 1, member)
+                pipe.zremrangebyrank(PAGINATED_SEARCHES_KEY, 0, -(MAX_TRACKED_SEARCHES + 1))
+            result = pipe.execute()
+            return int(float(result[0] or 0))
         except Exception as e:
-            print(f"TMDB Service: Error in search_by_actor for actor '{actor_name}': {str(e)}")  # Debug
-            import traceback
-            print(f"TMDB Service: Full traceback: {traceback.format_exc()}")  # Debug
+            print(f"TMDB Service: Search tracking unavailable: {str(e)}")  # Debug
+            return 0
+
+    def _should_prefetch_search(self, search_type, normalized_query, popularity):
+        """Decide whether page 2 of a search is likely to be requested"""
+        if popularity < SEARCH_PREFETCH_MIN_POPULARITY:
+            return False
+
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return False
+
+        try:
+            paginated = client.zscore(PAGINATED_SEARCHES_KEY, f"{search_type}:{normalized_query}") or 0
+        except Exception:
+            return False
+        return paginated / popularity >= SEARCH_PREFETCH_RATIO
+
+    def _prefetch_search_page(self, search_type, normalized_query, page, fetch, timeout):
+        """Warm the cache for the next page of a search in the background"""
+        cache_key = self._get_search_cache_key(search_type, normalized_query, page)
+        if cache.get(cache_key) is not None:
+            return
+
+        def prefetch():
+            try:
+                data = fetch(normalized_query, page)
+                self._set_cached_data(cache_key, data, timeout=timeout)
+                print(f"TMDB Service: Prefetched {search_type} search page {page} for query: '{normalized_query}'")  # Debug
+            except Exception as e:
+                print(f"TMDB Service: Prefetch failed for query '{normalized_query}': {str(e)}")  # Debug
+
+        _search_prefetch_executor.submit(prefetch)
+
+    def get_popular_searches(self, limit=10):
+        """Get the most frequently searched queries"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return []
+
+        try:
+            entries = client.zrevrange(POPULAR_SEARCHES_KEY, 0, limit - 1, withscores=True)
+        except Exception as e:
+            print(f"TMDB Service: Popular searches unavailable: {str(e)}")  # Debug
+            return []
+
+        popular = []
+        for member, score in entries:
+            search_type, _, query = member.decode().partition(':')
+            popular.append({'query': query, 'type': search_type, 'count': int(score)})
+        return popular
+
+    def _fetch_movies_and_tv(self, query, page):
+        """Fetch combined movie and TV search results from TMDB"""
+        # Search movies
+        print(f"TMDB Service: Searching movies for query: '{query}', page: {page}")  # Debug
+        movies_data = self._make_request('/search/movie', {
+            'query': query,
+            'page': page
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        # Search TV shows
+        print(f"TMDB Service: Searching TV shows for query: '{query}', page: {page}")  # Debug
+        tv_data = self._make_request('/search/tv', {
+            'query': query,
+            'page': page
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        combined = self._combine_movie_and_tv_results(movies_data, tv_data, page)
+        print(f"TMDB Service: Combined search results - {len(combined['results'])} items (movies: {len(movies_data.get('results', []))}, TV: {len(tv_data.get('results', []))})")  # Debug
+        return combined
+
+    def _fetch_by_actor(self, actor_name, page):
+        """Fetch movies and TV shows for the best matching actor from TMDB"""
+        # First, search for the actor/actress
+        print(f"TMDB Service: Searching for actor: '{actor_name}'")  # Debug
+        person_data = self._make_request('/search/person', {
+            'query': actor_name,
+            'page': 1
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        if not person_data.get('results'):
+            print(f"TMDB Service: No actor found for '{actor_name}'")  # Debug
             return {
                 'page': page,
                 'results': [],
                 'total_pages': 0,
                 'total_results': 0
             }
+        
+        # Get the first (most relevant) person
+        person = person_data['results'][0]
+        person_id = person['id']
+        person_name = person['name']
+        
+        print(f"TMDB Service: Found actor '{person_name}' with ID {person_id}")  # Debug
+        
+        # Get movies
+        movies_data = self._make_request('/discover/movie', {
+            'with_cast': person_id,
+            'page': page,
+            'sort_by': 'popularity.desc'
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        # Get TV shows
+        tv_data = self._make_request('/discover/tv', {
+            'with_cast': person_id,
+            'page': page,
+            'sort_by': 'popularity.desc'
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        combined = self._combine_movie_and_tv_results(movies_data, tv_data, page)
+        print(f"TMDB Service: Actor search results - {len(combined['results'])} items for '{person_name}'")  # Debug
+        return combined
 
-    def search_by_genre(self, genre_name, page=1):
-        """Search for movies and TV shows by genre"""
-        print(f"TMDB Service: search_by_genre called with genre: '{genre_name}', page: {page}")  # Debug
+    def _fetch_by_genre(self, genre_name, page):
+        """Fetch movies and TV shows for a genre name from TMDB"""
+        # First, get all genres to find the genre ID
+        print(f"TMDB Service: Getting genres to find '{genre_name}'")  # Debug
+        genres_data = self.get_genres()
+        tv_genres_data = self.get_tv_genres()
         
-        try:
-            # First, get all genres to find the genre ID
-            print(f"TMDB Service: Getting genres to find '{genre_name}'")  # Debug
-            genres_data = self._make_request('/genre/movie/list')
-            tv_genres_data = self._make_request('/genre/tv/list')
-            
-            # Combine movie and TV genres
-            all_genres = genres_data.get('genres', []) + tv_genres_data.get('genres', [])
-            
-            # Find the genre by name (case-insensitive)
-            genre_id = None
-            for genre in all_genres:
-                if genre['name'].lower() == genre_name.lower():
-                    genre_id = genre['id']
-                    break
-            
-            if not genre_id:
-                print(f"TMDB Service: No genre found for '{genre_name}'")  # Debug
-                return {
-                    'page': page,
-                    'results': [],
-                    'total_pages': 0,
-                    'total_results': 0
-                }
-            
-            print(f"TMDB Service: Found genre '{genre_name}' with ID {genre_id}")  # Debug
-            
-            # Get movies and TV shows for this genre
-            combined_results = []
-            
-            # Get movies
-            movies_data = self._make_request(f'/discover/movie', {
-                'with_genres': genre_id,
-                'page': page,
-                'sort_by': 'popularity.desc'
-            })
-            
-            # Get TV shows
-            tv_data = self._make_request(f'/discover/tv', {
-                'with_genres': genre_id,
-                'page': page,
-                'sort_by': 'popularity.desc'
-            })
-            
-            # Add movies with media_type
-            for movie in movies_data.get('results', []):
-                movie['media_type'] = 'movie'
-                combined_results.append(movie)
-            
-            # Add TV shows with media_type
-            for tv in tv_data.get('results', []):
-                tv['media_type'] = 'tv'
-                combined_results.append(tv)
-            
-            # Sort by popularity
-            combined_results.sort(key=lambda x: (x.get('vote_average', 0) * x.get('vote_count', 0)), reverse=True)
-            
-            # Calculate combined totals
-            total_results = movies_data.get('total_results', 0) + tv_data.get('total_results', 0)
-            total_pages = max(movies_data.get('total_pages', 0), tv_data.get('total_pages', 0))
-            
-            print(f"TMDB Service: Genre search results - {len(combined_results)} items for '{genre_name}'")  # Debug
-            
-            return {
-                'page': page,
-                'results': combined_results,
-                'total_pages': total_pages,
-                'total_results': total_results
-            }
-            
-        except Exception as e:
-            print(f"TMDB Service: Error in search_by_genre for genre '{genre_name}': {str(e)}")  # Debug
-            import traceback
-            print(f"TMDB Service: Full traceback: {traceback.format_exc()}")  # Debug
+        # Combine movie and TV genres
+        all_genres = genres_data.get('genres', []) + tv_genres_data.get('genres', [])
+        
+        # Find the genre by name (case-insensitive)
+        genre_id = None
+        for genre in all_genres:
+            if genre['name'].lower() == genre_name.lower():
+                genre_id = genre['id']
+                break
+        
+        if not genre_id:
+            print(f"TMDB Service: No genre found for '{genre_name}'")  # Debug
             return {
                 'page': page,
                 'results': [],
                 'total_pages': 0,
                 'total_results': 0
             }
+        
+        print(f"TMDB Service: Found genre '{genre_name}' with ID {genre_id}")  # Debug
+        
+        # Get movies
+        movies_data = self._make_request('/discover/movie', {
+            'with_genres': genre_id,
+            'page': page,
+            'sort_by': 'popularity.desc'
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        # Get TV shows
+        tv_data = self._make_request('/discover/tv', {
+            'with_genres': genre_id,
+            'page': page,
+            'sort_by': 'popularity.desc'
+        }, strict=True, timeout=SEARCH_TMDB_TIMEOUT)
+        
+        combined = self._combine_movie_and_tv_results(movies_data, tv_data, page)
+        print(f"TMDB Service: Genre search results - {len(combined['results'])} items for '{genre_name}'")  # Debug
+        return combined
+
+    def _combine_movie_and_tv_results(self, movies_data, tv_data, page):
+        """Merge movie and TV result pages into one page sorted by popularity"""
+        combined_results = []
+        
+        # Add movies with media_type
+        for movie in movies_data.get('results', []):
+            movie['media_type'] = 'movie'
+            combined_results.append(movie)
+        
+        # Add TV shows with media_type
+        for tv in tv_data.get('results', []):
+            tv['media_type'] = 'tv'
+            combined_results.append(tv)
+        
+        # Sort by popularity (vote_average * vote_count)
+        combined_results.sort(key=lambda x: (x.get('vote_average', 0) * x.get('vote_count', 0)), reverse=True)
+        
+        # Calculate combined totals
+        total_results = movies_data.get('total_results', 0) + tv_data.get('total_results', 0)
+        total_pages = max(movies_data.get('total_pages', 0), tv_data.get('total_pages', 0))
+        
+        return {
+            'page': page,
+            'results': combined_results,
+            'total_pages': total_pages,
+            'total_results': total_results
+        }
     
     def get_movie_details(self, movie_id):
-        """Get detailed movie information with credits, videos, reviews, and similar movies"""
+        """Get detailed movie information with credits, videos and reviews"""
         cache_key = self._get_cache_key(f'/movie/{movie_id}')
         cached_data = self._get_cached_data(cache_key)
         
         if cached_data:
             return cached_data
         
-        # Fetch comprehensive movie data with all append_to_response parameters
+        # Similar movies are served from the local content index (see movies/content.py)
         data = self._make_request(f'/movie/{movie_id}', {
-            'append_to_response': 'credits,videos,reviews,similar'
+            'append_to_response': 'credits,videos,reviews'
         })
         # Cache movie details for 6 hours 
         self._set_cached_data(cache_key, data, timeout=21600)  # 6 hours = 21600 seconds
         return data
     
+    def get_tv_details(self, tv_id):
+        """Get detailed TV show information with credits, videos and reviews"""
+        cache_key = self._get_cache_key(f'/tv/{tv_id}')
+        cached_data = self._get_cached_data(cache_key)
+        
+        if cached_data:
+            return cached_data
+        
+        data = self._make_request(f'/tv/{tv_id}', {
+            'append_to_response': 'credits,videos,reviews'
+        })
+        self._set_cached_data(cache_key, data, timeout=21600)  # 6 hours, like movie details
+        return data
+    
     def get_genres(self):
         """Get movie genres"""
         cache_key = self._get_cache_key('/genre/movie/list')
@@ -667,6 +776,52 @@ class TMDBService:
         self._set_cached_data(cache_key, data, timeout=86400)  # Cache for 24 hours
         return data
     
+    def get_tv_genres(self):
+        """Get TV genres"""
+        cache_key = self._get_cache_key('/genre/tv/list')
+        cached_data = self._get_cached_data(cache_key)
+        
+        if cached_data:
+            return cached_data
+        
+        data = self._make_request('/genre/tv/list')
+        self._set_cached_data(cache_key, data, timeout=86400)  # Cache for 24 hours
+        return data
+    
+    @staticmethod
+    def movies_for_results(tmdb_results):
+        """Movies from the database that match the TMDB results, in TMDB order"""
+        tmdb_ids = [item.get('id') for item in tmdb_results]
+        existing_movies = Movie.objects.filter(tmdb_id__in=tmdb_ids)
+        
+        # Create a mapping of tmdb_id to movie for quick lookup
+        existing_movie_map = {movie.tmdb_id: movie for movie in existing_movies}
+        
+        # Create a list of movies in the same order as TMDB results
+        ordered_movies = []
+        for item in tmdb_results:
+            tmdb_id = item.get('id')
+            if tmdb_id in existing_movie_map:
+                ordered_movies.append(existing_movie_map[tmdb_id])
+            else:
+                # Create a temporary movie object for display if not in database yet
+                temp_movie = Movie(
+                    tmdb_id=tmdb_id,
+                    title=item.get('title') or item.get('name', ''),
+                    overview=item.get('overview', ''),
+                    poster_path=item.get('poster_path'),
+                    backdrop_path=item.get('backdrop_path'),
+                    vote_average=item.get('vote_average', 0.0),
+                    vote_count=item.get('vote_count', 0),
+                    popularity=item.get('popularity', 0.0),
+                    genre_ids=item.get('genre_ids', []),
+                    media_type=item.get('media_type', 'movie'),
+                    runtime=item.get('runtime', 0),
+                    release_date=None  # Will be set during background sync
+                )
+                ordered_movies.append(temp_movie)
+        return ordered_movies
+    
     def sync_movie_to_db(self, tmdb_data):
         """Sync TMDB movie data to our database"""
         try:
@@ -690,7 +845,7 @@ class TMDBService:
                 'vote_average': tmdb_data.get('vote_average', 0.0),
                 'vote_count': tmdb_data.get('vote_count', 0),
                 'popularity': tmdb_data.get('popularity', 0.0),
-                'genre_ids': tmdb_data.get('genre_ids', []),
+                'genre_ids': tmdb_data.get('genre_ids') or [genre['id'] for genre in tmdb_data.get('genres', [])],
                 'media_type': media_type,
                 'tagline': tmdb_data.get('tagline', ''),
                 'imdb_id': tmdb_data.get('imdb_id', ''),
@@ -724,9 +879,20 @@ class TMDBService:
                     existing_movie.popularity != movie_data['popularity'] or
                     existing_movie.vote_count != movie_data['vote_count']):
                     
+                    # List payloads carry no runtime; keep the one from an earlier detail sync
+                    if 'runtime' not in tmdb_data:
+                        movie_data['runtime'] = existing_movie.runtime
+                    previous_media_type = existing_movie.media_type
+                    facets_changed = any(
+                        getattr(existing_movie, field) != movie_data[field] for field in CATALOG_FACET_FIELDS
+                    )
                     for key, value in movie_data.items():
                         setattr(existing_movie, key, value)
                     existing_movie.save()
+                    if facets_changed:
+                        for changed_media_type in {previous_media_type, existing_movie.media_type}:
+                            MovieCacheService.bump_catalog_version(changed_media_type)
+                    SuggestionIndex.add_movies([existing_movie])
                     print(f"TMDB Service: Updated movie '{existing_movie.title}'")  # Debug
                 else:
                     print(f"TMDB Service: Using cached movie '{existing_movie.title}'")  # Debug
@@ -734,6 +900,9 @@ class TMDBService:
             else:
                 # Create new movie
                 movie = Movie.objects.create(**movie_data)
+                MovieCacheService.bump_catalog_version(movie.media_type)
+                SuggestionIndex.add_movies([movie])
+                MovieEmbeddingIndex.insert('content', movie)
                 print(f"TMDB Service: Created movie '{movie.title}'")  # Debug
                 return movie
             
@@ -0,0 +1,143 @@
+"""
+Shared helpers for the recommendation engines
+Batched top-K similarity search and versioned on-disk array artifacts
+"""
+
+import json
+import os
+import shutil
+import time
+import numpy as np
+from django.conf import settings
+
+
+SIMILARITY_BATCH_CELLS = 20_000_000  # Dense cells per batch (~80 MB of float32)
+ARTIFACT_BUILDS_KEPT = 2
+
+
+def top_k_similar(rows, columns, top_k, adjust=None):
+    """
+    Top-K most similar columns for every row of `rows @ columns`
+
+    `rows` is an (n x d) sparse matrix and `columns` a (d x n) one over the
+    same items, so the diagonal is an item's similarity to itself and is
+    excluded. Similarities are materialized a batch of rows at a time, so
+    memory stays bounded by SIMILARITY_BATCH_CELLS. `adjust(similarity, start,
+    stop)` may rescale a batch in place. Yields (item_index, neighbor_indices,
+    scores) with positive scores in descending order.
+    """
+    n_items = columns.shape[1]
+    if n_items < 2:
+        return
+
+    rows = rows.tocsr()
+    columns = columns.tocsc()
+    top_k = min(top_k, n_items - 1)
+    batch_size = max(1, SIMILARITY_BATCH_CELLS // n_items)
+
+    for start in range(0, rows.shape[0], batch_size):
+        stop = min(start + batch_size, rows.shape[0])
+        offsets = np.arange(stop - start)
+
+        similarity = (rows[start:stop] @ columns).toarray()
+        if adjust is not None:
+            adjust(similarity, start, stop)
+        # An item is never its own neighbour
+        similarity[offsets, np.arange(start, stop)] = -np.inf
+
+        candidates = np.argpartition(-similarity, top_k - 1, axis=1)[:, :top_k]
+        scores = similarity[offsets[:, None], candidates]
+        order = np.argsort(-scores, axis=1)
+        candidates = candidates[offsets[:, None], order]
+        scores = scores[offsets[:, None], order]
+
+        for offset in offsets:
+            positive = scores[offset] > 0
+            if positive.any():
+                yield start + offset, candidates[offset][positive], scores[offset][positive]
+
+
+def top_scored(ids, scores, limit, exclude_ids=()):
+    """Best (id, score) pairs from parallel id and score arrays, skipping `exclude_ids`"""
+    if exclude_ids:
+        scores = np.where(np.isin(ids, np.fromiter(exclude_ids, dtype=np.int64)), -np.inf, scores)
+    limit = min(limit, len(scores))
+    if not limit:
+        return []
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[np.argsort(-scores[top])]
+    return [(int(ids[index]), float(scores[index])) for index in top if np.isfinite(scores[index])]
+
+
+class ArtifactStore:
+    """
+    Versioned .npy artifacts under RECOMMENDER_DATA_DIR/<name>/
+
+    Each build is written to its own directory and published by atomically
+    replacing a CURRENT pointer file, so readers never see a half-written
+    build. Arrays are loaded memory-mapped and shared by every worker process
+    through the page cache.
+    """
+
+    def __init__(self, name):
+        self.root = os.path.join(settings.RECOMMENDER_DATA_DIR, name)
+        self.pointer = os.path.join(self.root, 'CURRENT')
+
+    def save(self, arrays, metadata=None):
+        """Write a new build from a dict of name -> ndarray (plus optional JSON metadata) and publish it"""
+        build_id = time.strftime('%Y%m%d%H%M%S') + f'-{os.getpid()}'
+        build_dir = os.path.join(self.root, build_id)
+        os.makedirs(build_dir, exist_ok=True)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(build_dir, f'{array_name}.npy'), array)
+        if metadata is not None:
+            with open(os.path.join(build_dir, 'metadata.json'), 'w') as metadata_file:
+                json.dump(metadata, metadata_file)
+
+        temporary_pointer = f'{self.pointer}.{os.getpid()}'
+        with open(temporary_pointer, 'w') as pointer_file:
+            pointer_file.write(build_id)
+        os.replace(temporary_pointer, self.pointer)
+
+        self.prune(keep=build_id)
+        return build_id
+
+    def current_build(self):
+        try:
+            with open(self.pointer) as pointer_file:
+                return pointer_file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, array_names, build_id=None):
+        """Memory-map the arrays of a build (the current one by default)"""
+        build_id = build_id or self.current_build()
+        if build_id is None:
+            return None
+        build_dir = os.path.join(self.root, build_id)
+        try:
+            return {
+                array_name: np.load(os.path.join(build_dir, f'{array_name}.npy'), mmap_mode='r')
+                for array_name in array_names
+            }
+        except FileNotFoundError:
+            return None
+
+    def load_metadata(self, build_id=None):
+        build_id = build_id or self.current_build()
+        if build_id is None:
+            return None
+        try:
+            with open(os.path.join(self.root, build_id, 'metadata.json')) as metadata_file:
+                return json.load(metadata_file)
+        except FileNotFoundError:
+            return None
+
+    def prune(self, keep):
+        """Delete old builds; the previous one stays for readers still mapping it"""
+        builds = sorted(
+            entry for entry in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, entry)) and entry != keep
+        )
+        for build_id in builds[:-(ARTIFACT_BUILDS_KEPT - 1) or None]:
+            shutil.rmtree(os.path.join(self.root, build_id), ignore_errors=True)
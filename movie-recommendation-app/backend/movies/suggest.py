@@ -0,0 +1,130 @@
+"""
+Typeahead suggestions for movie titles
+Prefix index in Redis sorted sets: one set per normalized prefix, scored by popularity
+"""
+
+import json
+import re
+import unicodedata
+from .cache_service import MovieCacheService
+from .models import Movie
+
+
+SUGGEST_KEY_PREFIX = 'movie_api:suggest:'
+SUGGEST_PREFIX_KEY = SUGGEST_KEY_PREFIX + 'prefix:'
+SUGGEST_TITLES_KEY = SUGGEST_KEY_PREFIX + 'titles'
+SUGGEST_BUILT_KEY = SUGGEST_KEY_PREFIX + 'built'  # Set once a full rebuild has finished
+MAX_PREFIX_LENGTH = 20  # Longer inputs are looked up by their first 20 characters
+MAX_SUGGESTIONS = 10  # Entries kept per prefix set, and the largest page served
+
+_non_alphanumeric = re.compile(r'[^\w\s]+')
+
+
+def normalize_title(title):
+    """Case-fold, strip accents and punctuation, collapse whitespace"""
+    decomposed = unicodedata.normalize('NFKD', title or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(_non_alphanumeric.sub(' ', without_accents.casefold()).split())
+
+
+def title_prefixes(title):
+    """Prefixes of the title starting at every word, so 'dark' matches 'The Dark Knight'"""
+    words = normalize_title(title).split()
+    prefixes = set()
+    for start in range(len(words)):
+        suffix = ' '.join(words[start:])[:MAX_PREFIX_LENGTH]
+        prefixes.update(suffix[:end] for end in range(1, len(suffix) + 1))
+    prefixes.discard('')
+    return {prefix.rstrip() for prefix in prefixes}
+
+
+class SuggestionIndex:
+    """Maintain and query the Redis prefix index"""
+
+    @staticmethod
+    def add_movies(movies):
+        """Add or re-score movies in the index; safe to call repeatedly with the same rows"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return 0
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for movie in movies:
+                member = str(movie.tmdb_id)
+                for prefix in title_prefixes(movie.title):
+                    key = SUGGEST_PREFIX_KEY + prefix
+                    pipe.zadd(key, {member: movie.popularity})
+                    # Only the most popular titles per prefix are ever served
+                    pipe.zremrangebyrank(key, 0, -(MAX_SUGGESTIONS + 1))
+                pipe.hset(SUGGEST_TITLES_KEY, member, json.dumps(SuggestionIndex.describe(movie)))
+            pipe.execute()
+            return len(movies)
+        except Exception as e:
+            print(f"⚠️ Suggestion index update error: {e}")
+            return 0
+
+    @staticmethod
+    def mark_built():
+        """Record that the index covers the whole catalog, so empty prefixes are real misses"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return
+        try:
+            client.set(SUGGEST_BUILT_KEY, 1)
+        except Exception as e:
+            print(f"⚠️ Suggestion index update error: {e}")
+
+    @staticmethod
+    def describe(movie):
+        return {
+            'tmdb_id': movie.tmdb_id,
+            'title': movie.title,
+            'media_type': movie.media_type,
+            'poster_path': movie.poster_path,
+            'release_year': movie.release_date.year if movie.release_date else None,
+        }
+
+    @staticmethod
+    def suggest(query, limit=MAX_SUGGESTIONS):
+        """Top titles by popularity for a typed prefix"""
+        prefix = normalize_title(query)[:MAX_PREFIX_LENGTH].rstrip()
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+
+        client = MovieCacheService.get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.exists(SUGGEST_BUILT_KEY)
+                pipe.zrevrange(SUGGEST_PREFIX_KEY + prefix, 0, limit - 1)
+                built, members = pipe.execute()
+                if members:
+                    return [json.loads(entry) for entry in client.hmget(SUGGEST_TITLES_KEY, members) if entry]
+                if built:
+                    return []
+            except Exception as e:
+                print(f"⚠️ Suggestion lookup error, falling back to database: {e}")
+
+        # Without Redis or a built index (never rebuilt, cleared or evicted), fall back to a prefix match on the title
+        movies = Movie.objects.filter(title__istartswith=query.strip()).order_by('-popularity')[:limit]
+        return [SuggestionIndex.describe(movie) for movie in movies]
+
+    @staticmethod
+    def clear():
+        """Remove every suggestion key"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return 0
+
+        deleted = 0
+        batch = []
+        for key in client.scan_iter(match=SUGGEST_KEY_PREFIX + '*', count=1000):
+            batch.append(key)
+            if len(batch) >= 1000:
+                deleted += client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += client.delete(*batch)
+        return deleted
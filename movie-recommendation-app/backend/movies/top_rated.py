@@ -0,0 +1,73 @@
+"""
+Bayesian weighted ratings blending TMDB votes with our own users' ratings
+Recomputed in bulk with set-based UPDATEs into a denormalized, indexed column,
+so the local top-rated list is a single index range scan
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import Movie, MovieRating
+
+
+PRIOR_VOTES = 250.0  # Votes' worth of weight the catalog mean gets in every score
+LOCAL_VOTE_WEIGHT = 5.0  # TMDB votes one local rating counts as; our users are the audience of this list
+LOCAL_RATING_SCALE = 2.0  # 1-5 stars onto TMDB's 0-10 scale
+
+
+class WeightedRatingService:
+    """
+    Recompute `Movie.weighted_rating`
+
+    score = (C * m + sum of vote points) / (C + votes), where TMDB contributes
+    vote_average * vote_count points over vote_count votes, local ratings
+    contribute their (rescaled, weighted) sum over their count, m is the
+    catalog-wide mean and C is PRIOR_VOTES. Titles with few votes are pulled
+    towards the mean instead of topping the list on a handful of 10s.
+    """
+
+    @staticmethod
+    def refresh_local_aggregates():
+        """Copy per-movie MovieRating counts and sums onto Movie; returns rows changed"""
+        ratings = MovieRating.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        count = Coalesce(Subquery(ratings.annotate(count=Count('id')).values('count')), 0)
+        total = Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')), 0)
+        return (
+            Movie.objects
+            .exclude(local_rating_count=count, local_rating_sum=total)
+            .update(local_rating_count=count, local_rating_sum=total)
+        )
+
+    @staticmethod
+    def catalog_mean():
+        """Mean rating on the 0-10 scale over every TMDB vote and weighted local rating"""
+        totals = Movie.objects.aggregate(
+            tmdb_votes=Sum('vote_count'),
+            tmdb_points=Sum(F('vote_average') * F('vote_count'), output_field=FloatField()),
+            local_votes=Sum('local_rating_count'),
+            local_points=Sum('local_rating_sum'),
+        )
+        votes = (totals['tmdb_votes'] or 0) + LOCAL_VOTE_WEIGHT * (totals['local_votes'] or 0)
+        points = (totals['tmdb_points'] or 0) + LOCAL_VOTE_WEIGHT * LOCAL_RATING_SCALE * (totals['local_points'] or 0)
+        return points / votes if votes else 0.0
+
+    @staticmethod
+    def score_expression(mean):
+        points = (
+            Value(PRIOR_VOTES * mean)
+            + F('vote_average') * F('vote_count')
+            + Value(LOCAL_VOTE_WEIGHT * LOCAL_RATING_SCALE) * F('local_rating_sum')
+        )
+        votes = Value(PRIOR_VOTES) + F('vote_count') + Value(LOCAL_VOTE_WEIGHT) * F('local_rating_count')
+        return Coalesce(points / votes, Value(0.0), output_field=FloatField())
+
+    @staticmethod
+    def recompute():
+        """Refresh every movie's weighted rating; returns (aggregate rows changed, score rows changed, mean)"""
+        with transaction.atomic():
+            aggregates_changed = WeightedRatingService.refresh_local_aggregates()
+            mean = WeightedRatingService.catalog_mean()
+            score = WeightedRatingService.score_expression(mean)
+            # Rows whose score didn't move are skipped, so a quiet day rewrites almost nothing
+            scores_changed = Movie.objects.exclude(weighted_rating=score).update(weighted_rating=score)
+        return aggregates_changed, scores_changed, mean
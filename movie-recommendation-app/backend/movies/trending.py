@@ -0,0 +1,122 @@
+"""
+Locally computed trending from our users' favorites, watchlists and ratings
+Interaction events are counted into a Redis sorted set with exponential time
+decay, so reading the top of the chart is a single ZREVRANGE
+"""
+
+import time
+from .cache_service import MovieCacheService
+
+
+TRENDING_KEY_PREFIX = 'movie_api:trending:local:'
+TRENDING_HALF_LIFE = 60 * 60 * 24 * 2  # An event counts half as much after two days
+TRENDING_EPOCH = 60 * 60 * 24 * 7  # Scores are rebased onto a new key once per epoch
+TRENDING_MAX_MEMBERS = 10_000  # Titles kept in the chart; the long tail is trimmed on write
+TRENDING_MIN_SCORE = 0.01  # Titles that decayed below this are dropped at rebase
+
+# Event weights by interaction
+FAVORITE_EVENT = 3.0
+WATCHLIST_EVENT = 2.0
+RATING_EVENT = 1.0
+
+
+def _key(epoch):
+    return f'{TRENDING_KEY_PREFIX}{epoch}'
+
+
+class LocalTrendingService:
+    """
+    Time-decayed interaction counters
+
+    Instead of decaying every member as time passes, each event is added with
+    weight * 2^((t - epoch start) / half-life) ("forward decay"): newer events
+    count exponentially more, which ranks titles exactly as if all older
+    scores had been decayed. The multiplier is bounded by rebasing onto a new
+    key each epoch, scaling the previous scores down by one epoch's decay.
+    Writes are O(log N) ZINCRBYs and reads an O(log N + page) ZREVRANGE; the
+    database is never touched.
+    """
+
+    @staticmethod
+    def epoch_for(timestamp):
+        return int(timestamp // TRENDING_EPOCH)
+
+    @staticmethod
+    def decayed_weight(weight, timestamp, epoch):
+        return weight * 2 ** ((timestamp - epoch * TRENDING_EPOCH) / TRENDING_HALF_LIFE)
+
+    @staticmethod
+    def current_key(client, now=None):
+        """Key of the current epoch, carrying the previous epoch's scores over once"""
+        epoch = LocalTrendingService.epoch_for(now or time.time())
+        key = _key(epoch)
+        previous = _key(epoch - 1)
+        # Only the first caller of an epoch rebases; later ones find the marker set
+        if client.set(f'{key}:rebased', 1, nx=True, ex=2 * TRENDING_EPOCH) and client.exists(previous):
+            pipe = client.pipeline()
+            # Union with the new key itself keeps events recorded by other workers meanwhile
+            pipe.zunionstore(key, {key: 1.0, previous: 2 ** (-TRENDING_EPOCH / TRENDING_HALF_LIFE)})
+            pipe.zremrangebyscore(key, '-inf', f'({TRENDING_MIN_SCORE}')
+            pipe.zremrangebyrank(key, 0, -(TRENDING_MAX_MEMBERS + 1))
+            pipe.expire(key, 2 * TRENDING_EPOCH)
+            pipe.execute()
+        return epoch, key
+
+    @staticmethod
+    def record_events(events, now=None):
+        """Add (Movie id, weight[, timestamp]) events to the chart"""
+        client = MovieCacheService.get_redis_client()
+        if client is None or not events:
+            return
+
+        try:
+            now = now or time.time()
+            epoch, key = LocalTrendingService.current_key(client, now)
+            pipe = client.pipeline()
+            for event in events:
+                movie_id, weight = event[0], event[1]
+                timestamp = event[2] if len(event) > 2 else now
+                pipe.zincrby(key, LocalTrendingService.decayed_weight(weight, timestamp, epoch), movie_id)
+            pipe.zremrangebyrank(key, 0, -(TRENDING_MAX_MEMBERS + 1))
+            pipe.expire(key, 2 * TRENDING_EPOCH)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Local trending write error: {e}")
+
+    @staticmethod
+    def record_event(movie_id, weight):
+        LocalTrendingService.record_events([(movie_id, weight)])
+
+    @staticmethod
+    def get_trending_ids(limit=20, offset=0):
+        """A page of the chart as (Movie ids, total titles charted)"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return [], 0
+
+        try:
+            _, key = LocalTrendingService.current_key(client)
+            pipe = client.pipeline()
+            pipe.zrevrange(key, offset, offset + limit - 1)
+            pipe.zcard(key)
+            movie_ids, total = pipe.execute()
+            return [int(movie_id) for movie_id in movie_ids], total
+        except Exception as e:
+            print(f"⚠️ Local trending read error: {e}")
+            return [], 0
+
+    @staticmethod
+    def clear():
+        """Delete every local trending key"""
+        client = MovieCacheService.get_redis_client()
+        if client is None:
+            return 0
+
+        try:
+            keys = list(client.scan_iter(match=f'{TRENDING_KEY_PREFIX}*', count=1000))
+            if keys:
+                client.delete(*keys)
+            return len(keys)
+        except Exception as e:
+            print(f"⚠️ Local trending clear error: {e}")
+            return 0
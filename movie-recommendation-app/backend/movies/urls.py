@@ -10,20 +10,31 @@ urlpatterns = [
     # Movies
     path('', views.MovieListView.as_view(), name='movie_list'),
     path('search/', views.SearchView.as_view(), name='search'),
+    path('search/popular/', views.popular_searches, name='popular_searches'),
+    path('suggest/', views.suggest_titles, name='suggest_titles'),
     path('genres/', views.genres_list, name='genres_list'),
+    path('facets/', views.catalog_facets, name='catalog_facets'),
+    path('home/', views.home_feed, name='home_feed'),
+    path('batch/', views.movie_batch, name='movie_batch'),
+    path('recommendations/', views.recommendations, name='recommendations'),
     path('<int:tmdb_id>/', views.MovieDetailView.as_view(), name='movie_detail'),
+    path('<int:tmdb_id>/neighbors/', views.movie_neighbors, name='movie_neighbors'),
     
     # Favorites
     path('favorites/', views.FavoriteListView.as_view(), name='favorite_list'),
+    path('favorites/bulk/', views.favorites_bulk, name='favorites_bulk'),
     path('favorites/<int:pk>/', views.FavoriteDetailView.as_view(), name='favorite_detail'),
     path('favorites/movie/<int:movie_id>/', views.FavoriteRemoveByMovieView.as_view(), name='favorite_remove_by_movie'),
     
     # Watchlist
     path('watchlist/', views.WatchlistListView.as_view(), name='watchlist_list'),
+    path('watchlist/bulk/', views.watchlist_bulk, name='watchlist_bulk'),
     path('watchlist/<int:pk>/', views.WatchlistDetailView.as_view(), name='watchlist_detail'),
     path('watchlist/movie/<int:movie_id>/', views.WatchlistRemoveByMovieView.as_view(), name='watchlist_remove_by_movie'),
     
     # Ratings
+    path('ratings/', views.RatingListView.as_view(), name='rating_list'),
     path('<int:movie_id>/rate/', views.MovieRatingView.as_view(), name='movie_rating'),
     path('health/', views.health_check, name='health_check'),
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
 ] 
\ No newline at end of file
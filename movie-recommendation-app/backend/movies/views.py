@@ -12,16 +12,37 @@ from .serializers import (
     MovieDetailSerializer,
     FavoriteSerializer, 
     WatchlistSerializer,
-    MovieRatingSerializer
+    MovieRatingSerializer,
+    UserRatingSerializer,
+    SimpleMovieSerializer
 )
 from .models import Movie, Favorite, Watchlist, MovieRating
+from .collaborative import ItemNeighborService
+from .content import ContentSimilarityService
+from .recommendations import RecommendationService
 from .services import TMDBService
-from .cache_service import MovieCacheService
+from .cache_service import MovieCacheService, CacheStats
+from .catalog import CatalogSnapshot
+from .batch import MovieBatchService, parse_tmdb_ids, MAX_BATCH_IDS
+from .library import LibraryService, parse_operation_ids, MAX_BULK_OPERATIONS
+from .home import HomeFeedService, HOME_SECTIONS, HOME_CACHE_KEY, HOME_CACHE_TIMEOUT
+from .ranked_lists import RankedListService, list_key, category_queryset, TMDB_LIST_TYPES, CATEGORY_LISTS, RANKED_LIST_PAGE_SIZE
+from .pagination import PopularityKeysetPagination, WeightedRatingKeysetPagination, LibraryKeysetPagination
+from .facets import CatalogFacetService
+from .search import LocalSearchService
+from .suggest import SuggestionIndex, MAX_SUGGESTIONS
+from .trending import LocalTrendingService, FAVORITE_EVENT, WATCHLIST_EVENT, RATING_EVENT
+from django.conf import settings
 from django.utils import timezone
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 
+SIMILAR_MOVIES_LIMIT = 20
+RECOMMENDATIONS_PAGE_SIZE = 20
+LOCAL_TRENDING_PER_PAGE = 10  # Local titles interleaved into each page of TMDB trending
+
+
 @method_decorator(cache_page(60 * 60), name='dispatch')  # Cache for 1 hour
 class MovieListView(generics.ListAPIView):
     """
@@ -31,12 +52,25 @@ class MovieListView(generics.ListAPIView):
     - **movies**: Regular movies
     - **tv**: TV shows
     - **trending**: Currently trending content
+    - **local_trending**: What our own users favorite, watchlist and rate most
+      lately, interleaved with TMDB trending
     - **top_rated**: Top rated content
+    - **browse**: Filtered browsing of the local catalog, ordered by popularity
+    - **local_top_rated**: The local catalog ordered by a Bayesian rating that
+      blends TMDB votes with our users' ratings; accepts the browse filters
+    - **genre**: The local catalog's most popular titles in one genre (`genre_id`)
+    - **anime** / **kdrama**: Japanese animation and Korean drama series
     
-    The response includes pagination information and movie details.
+    The response includes pagination information and movie details. Browse
+    and local_top_rated use cursor pagination (`cursor`, `page_size`) instead of `page`.
+    Trending, top rated, movies, TV, category and genre pages are slices of rankings
+    materialized by `refresh_ranked_lists`; TMDB is only called for lists that
+    haven't been materialized yet.
     """
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
+    browse_pagination_class = PopularityKeysetPagination
+    top_rated_pagination_class = WeightedRatingKeysetPagination
     
     @swagger_auto_schema(
         operation_description="Get a list of movies or TV shows",
@@ -46,7 +80,7 @@ class MovieListView(generics.ListAPIView):
                 openapi.IN_QUERY,
                 description="Type of content to retrieve",
                 type=openapi.TYPE_STRING,
-                enum=['movies', 'tv', 'trending', 'top_rated'],
+                enum=['movies', 'tv', 'trending', 'local_trending', 'top_rated', 'local_top_rated', 'browse', 'genre', 'anime', 'kdrama'],
                 default='movies'
             ),
             openapi.Parameter(
@@ -56,6 +90,19 @@ class MovieListView(generics.ListAPIView):
                 type=openapi.TYPE_INTEGER,
                 default=1
             ),
+            openapi.Parameter('genre_id', openapi.IN_QUERY, description="Genre: TMDB genre ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('media_type', openapi.IN_QUERY, description="Browse: 'movie' or 'tv'", type=openapi.TYPE_STRING),
+            openapi.Parameter('genre_ids', openapi.IN_QUERY, description="Browse: comma-separated genre IDs", type=openapi.TYPE_STRING),
+            openapi.Parameter('genre_match', openapi.IN_QUERY, description="Browse: 'all' genres must match (default) or 'any'", type=openapi.TYPE_STRING, enum=['all', 'any']),
+            openapi.Parameter('original_language', openapi.IN_QUERY, description="Browse: ISO 639-1 language code", type=openapi.TYPE_STRING),
+            openapi.Parameter('year_from', openapi.IN_QUERY, description="Browse: earliest release year", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('year_to', openapi.IN_QUERY, description="Browse: latest release year", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('min_vote_average', openapi.IN_QUERY, description="Browse: minimum vote average", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('min_vote_count', openapi.IN_QUERY, description="Browse: minimum vote count", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('min_runtime', openapi.IN_QUERY, description="Browse: minimum runtime in minutes", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('max_runtime', openapi.IN_QUERY, description="Browse: maximum runtime in minutes", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Browse: cursor from a previous response's next_cursor", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Browse: results per page (max 100)", type=openapi.TYPE_INTEGER, default=20),
         ],
         responses={
             200: openapi.Response(
@@ -87,8 +134,12 @@ class MovieListView(generics.ListAPIView):
         print(f"Requesting movies with type: {movie_type}, page: {page}")  # Debug
         
         try:
+            materialized = self._get_materialized_page(movie_type, page)
+            if materialized is not None:
+                return materialized
+            
             # Handle different movie types
-            if movie_type == 'trending':
+            if movie_type in ('trending', 'local_trending'):
                 print("Getting trending movies")  # Debug
                 data = tmdb_service.get_trending_movies(page=page)
             elif movie_type == 'top_rated':
@@ -113,36 +164,9 @@ class MovieListView(generics.ListAPIView):
             # Start background sync process
             self._start_background_sync(data.get('results', []), tmdb_service)
             
-            # Return movies from database that match the TMDB IDs for immediate display
-            tmdb_ids = [item.get('id') for item in data.get('results', [])]
-            existing_movies = Movie.objects.filter(tmdb_id__in=tmdb_ids)
-            
-            # Create a mapping of tmdb_id to movie for quick lookup
-            existing_movie_map = {movie.tmdb_id: movie for movie in existing_movies}
-            
-            # Create a list of movies in the same order as TMDB results
-            ordered_movies = []
-            for item in data.get('results', []):
-                tmdb_id = item.get('id')
-                if tmdb_id in existing_movie_map:
-                    ordered_movies.append(existing_movie_map[tmdb_id])
-                else:
-                    # Create a temporary movie object for display if not in database yet
-                    temp_movie = Movie(
-                        tmdb_id=tmdb_id,
-                        title=item.get('title') or item.get('name', ''),
-                        overview=item.get('overview', ''),
-                        poster_path=item.get('poster_path'),
-                        backdrop_path=item.get('backdrop_path'),
-                        vote_average=item.get('vote_average', 0.0),
-                        vote_count=item.get('vote_count', 0),
-                        popularity=item.get('popularity', 0.0),
-                        genre_ids=item.get('genre_ids', []),
-                        media_type=item.get('media_type', 'movie'),
-                        runtime=item.get('runtime', 0),
-                        release_date=None  # Will be set during background sync
-                    )
-                    ordered_movies.append(temp_movie)
+            ordered_movies = TMDBService.movies_for_results(data.get('results', []))
+            if movie_type == 'local_trending':
+                ordered_movies = self._merge_local_trending(ordered_movies, page)
             
             print(f"Returning {len(ordered_movies)} movies for immediate display")  # Debug
             return ordered_movies
@@ -152,6 +176,65 @@ class MovieListView(generics.ListAPIView):
             # Fallback to database if TMDB fails
             return Movie.objects.all()
     
+    def _get_materialized_page(self, movie_type, page):
+        """This page of the precomputed ranking for the list type, or None if it isn't materialized"""
+        local_queryset = None
+        if movie_type == 'genre':
+            genre_id = _parse_number(self.request.query_params.get('genre_id'), int)
+            key = list_key('genre', genre_id)
+            local_queryset = Movie.objects.with_genres([genre_id]) if genre_id is not None else Movie.objects.none()
+        elif movie_type in CATEGORY_LISTS:
+            key = list_key(movie_type)
+            local_queryset = category_queryset(movie_type)
+        else:
+            list_type = 'trending' if movie_type == 'local_trending' else movie_type
+            key = list_key(list_type if list_type in TMDB_LIST_TYPES else 'movies')
+        
+        result = RankedListService.get_page(key, page)
+        if result is None:
+            if local_queryset is None:
+                return None
+            # Genre and category pages can be served locally; rank on the fly until the list is materialized
+            offset = (page - 1) * RANKED_LIST_PAGE_SIZE
+            local_queryset = local_queryset.by_popularity()
+            result = list(local_queryset[offset:offset + RANKED_LIST_PAGE_SIZE]), local_queryset.count()
+        
+        movies, total = result
+        print(f"Serving {len(movies)} {movie_type} movies from the materialized ranking")  # Debug
+        self.tmdb_data = {'total_pages': max(-(-total // RANKED_LIST_PAGE_SIZE), 1), 'total_results': total}
+        if local_queryset is None:
+            # TMDB lists continue past the materialized pages; report TMDB's own totals
+            upstream = RankedListService.get_upstream_totals(key)
+            if upstream and upstream.get('total_pages', 0) > self.tmdb_data['total_pages']:
+                self.tmdb_data = dict(upstream)
+        if movie_type == 'local_trending':
+            movies = self._merge_local_trending(movies, page)
+        return movies
+    
+    def _merge_local_trending(self, tmdb_movies, page):
+        """Interleave this page of the local trending chart with TMDB trending, local first"""
+        offset = (page - 1) * LOCAL_TRENDING_PER_PAGE
+        movie_ids, local_total = LocalTrendingService.get_trending_ids(limit=LOCAL_TRENDING_PER_PAGE, offset=offset)
+        local_map = Movie.objects.in_bulk(movie_ids)
+        local_movies = [local_map[movie_id] for movie_id in movie_ids if movie_id in local_map]
+        print(f"Local trending: {len(local_movies)} of {local_total} charted titles on page {page}")  # Debug
+        
+        merged = []
+        seen_tmdb_ids = set()
+        for position in range(max(len(local_movies), len(tmdb_movies))):
+            for movies in (local_movies, tmdb_movies):
+                if position < len(movies) and movies[position].tmdb_id not in seen_tmdb_ids:
+                    seen_tmdb_ids.add(movies[position].tmdb_id)
+                    merged.append(movies[position])
+        
+        local_pages = -(-local_total // LOCAL_TRENDING_PER_PAGE)
+        self.tmdb_data = {
+            **self.tmdb_data,
+            'total_pages': max(self.tmdb_data.get('total_pages', 1), local_pages),
+            'total_results': self.tmdb_data.get('total_results', 0) + local_total,
+        }
+        return merged
+    
     def _start_background_sync(self, tmdb_results, tmdb_service):
         """Start background sync process for movies"""
         try:
@@ -161,20 +244,22 @@ class MovieListView(generics.ListAPIView):
             def sync_movie_batch():
                 """Sync a batch of movies to database"""
                 synced_count = 0
-                for item in tmdb_results:
-                    try:
-                        # Handle TV shows from /discover/tv endpoint (they don't have media_type field)
-                        is_tv_show = 'first_air_date' in item
-                        is_movie = item.get('media_type') == 'movie' or ('release_date' in item and not is_tv_show)
-                        
-                        if is_movie or is_tv_show:
-                            print(f"Background sync: Syncing {item.get('title', item.get('name', 'Unknown'))}")  # Debug
-                            movie = tmdb_service.sync_movie_to_db(item)
-                            if movie:
-                                synced_count += 1
-                                print(f"Background sync: Successfully synced {movie.title}")  # Debug
-                    except Exception as e:
-                        print(f"Background sync: Error syncing movie {item.get('title', item.get('name', 'Unknown'))}: {e}")  # Debug
+                # One facet invalidation for the whole batch
+                with MovieCacheService.deferred_catalog_versions():
+                    for item in tmdb_results:
+                        try:
+                            # Handle TV shows from /discover/tv endpoint (they don't have media_type field)
+                            is_tv_show = 'first_air_date' in item
+                            is_movie = item.get('media_type') == 'movie' or ('release_date' in item and not is_tv_show)
+                            
+                            if is_movie or is_tv_show:
+                                print(f"Background sync: Syncing {item.get('title', item.get('name', 'Unknown'))}")  # Debug
+                                movie = tmdb_service.sync_movie_to_db(item)
+                                if movie:
+                                    synced_count += 1
+                                    print(f"Background sync: Successfully synced {movie.title}")  # Debug
+                        except Exception as e:
+                            print(f"Background sync: Error syncing movie {item.get('title', item.get('name', 'Unknown'))}: {e}")  # Debug
                 
                 print(f"Background sync: Completed syncing {synced_count} movies")  # Debug
             
@@ -190,8 +275,35 @@ class MovieListView(generics.ListAPIView):
         context['request'] = self.request
         return context
     
+    def get_browse_queryset(self):
+        """Filter the local catalog from browse query params"""
+        return Movie.objects.browse(**parse_browse_filters(self.request.query_params))
+    
+    def browse(self, request):
+        """Serve a filtered, keyset-paginated page straight from the local catalog"""
+        if request.query_params.get('type') == 'local_top_rated':
+            paginator = self.top_rated_pagination_class()
+        else:
+            paginator = self.browse_pagination_class()
+        
+        # Filter and sort on the in-memory catalog snapshot when one is published;
+        # Postgres then only serves the page's rows by primary key
+        snapshot = CatalogSnapshot.current()
+        if snapshot is not None and paginator.snapshot_ordering:
+            filters = parse_browse_filters(request.query_params)
+            movie_ids = paginator.paginate_snapshot(snapshot, filters, request, view=self)
+            movie_map = Movie.objects.in_bulk(movie_ids)
+            movies = [movie_map[movie_id] for movie_id in movie_ids if movie_id in movie_map]
+        else:
+            movies = paginator.paginate_queryset(self.get_browse_queryset(), request, view=self)
+        serializer = self.get_serializer(movies, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
     def list(self, request, *args, **kwargs):
         """Override list method to return TMDB format instead of Django pagination"""
+        if request.query_params.get('type') in ('browse', 'local_top_rated'):
+            return self.browse(request)
+        
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
         
@@ -216,6 +328,57 @@ class MovieListView(generics.ListAPIView):
             })
 
 
+def _parse_number(value, cast):
+    """Parse an optional numeric query param, ignoring invalid values"""
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_int_list(value):
+    """Parse a comma-separated list of integers, ignoring invalid entries"""
+    if not value:
+        return []
+    return sorted({int(part) for part in value.split(',') if part.strip().isdigit()})
+
+
+def _add_user_flags(user, items):
+    """Set is_favorite, is_watchlisted and user_rating on serialized movies with three queries in total"""
+    favorite_ids, watchlist_ids, ratings = set(), set(), {}
+    if user.is_authenticated:
+        movie_ids = [item['id'] for item in items]
+        favorite_ids = set(Favorite.objects.filter(user=user, movie_id__in=movie_ids).values_list('movie_id', flat=True))
+        watchlist_ids = set(Watchlist.objects.filter(user=user, movie_id__in=movie_ids).values_list('movie_id', flat=True))
+        ratings = dict(MovieRating.objects.filter(user=user, movie_id__in=movie_ids).values_list('movie_id', 'rating'))
+    for item in items:
+        item['is_favorite'] = item['id'] in favorite_ids
+        item['is_watchlisted'] = item['id'] in watchlist_ids
+        item['user_rating'] = ratings.get(item['id'])
+    return items
+
+
+def parse_browse_filters(params):
+    """Parse catalog browse filters from query params into Movie.objects.browse() arguments"""
+    media_type = params.get('media_type')
+    original_language = params.get('original_language')
+    filters = {
+        'media_type': media_type if media_type in ('movie', 'tv') else None,
+        'genre_ids': _parse_int_list(params.get('genre_ids')) or None,
+        'genre_match': 'any' if params.get('genre_match') == 'any' else 'all',
+        'original_language': original_language.lower() if original_language else None,
+        'year_from': _parse_number(params.get('year_from'), int),
+        'year_to': _parse_number(params.get('year_to'), int),
+        'min_vote_average': _parse_number(params.get('min_vote_average'), float),
+        'min_vote_count': _parse_number(params.get('min_vote_count'), int),
+        'min_runtime': _parse_number(params.get('min_runtime'), int),
+        'max_runtime': _parse_number(params.get('max_runtime'), int),
+    }
+    return {key: value for key, value in filters.items() if value is not None}
+
+
 @method_decorator(cache_page(60 * 60 * 24), name='dispatch')  # Cache for 24 hours
 class MovieDetailView(generics.RetrieveAPIView):
     """
@@ -226,7 +389,7 @@ class MovieDetailView(generics.RetrieveAPIView):
     - Cast and crew information
     - Videos and trailers
     - Reviews and ratings
-    - Similar movies
+    - Similar movies (from the local content similarity index)
     - User-specific data (favorites, watchlist, ratings) if authenticated
     """
     serializer_class = MovieDetailSerializer
@@ -277,7 +440,7 @@ class MovieDetailView(generics.RetrieveAPIView):
                     movie.credits = enhanced_data.get('credits')
                     movie.videos = enhanced_data.get('videos')
                     movie.reviews = enhanced_data.get('reviews')
-                    movie.similar = enhanced_data.get('similar')
+                    movie.similar = self.get_similar(movie)
                     
                     # Update movie with additional fields if they exist
                     additional_fields = ['tagline', 'imdb_id', 'original_language', 'budget', 'revenue', 'status', 
@@ -293,6 +456,7 @@ class MovieDetailView(generics.RetrieveAPIView):
                 except Exception as e:
                     print(f"MovieDetailView: Error fetching enhanced data from TMDB: {str(e)}")  # Debug
                     # Return movie without enhanced data if TMDB fails
+                    movie.similar = self.get_similar(movie)
                     return movie
                     
             except Movie.DoesNotExist:
@@ -312,7 +476,7 @@ class MovieDetailView(generics.RetrieveAPIView):
                         movie.credits = enhanced_data.get('credits')
                         movie.videos = enhanced_data.get('videos')
                         movie.reviews = enhanced_data.get('reviews')
-                        movie.similar = enhanced_data.get('similar')
+                        movie.similar = self.get_similar(movie)
                         
                         # Update movie with additional fields if they exist
                         additional_fields = ['tagline', 'imdb_id', 'original_language', 'budget', 'revenue', 'status', 
@@ -341,6 +505,22 @@ class MovieDetailView(generics.RetrieveAPIView):
             from django.http import Http404
             raise Http404(f"Error retrieving movie: {str(e)}")
     
+    def get_similar(self, movie):
+        """Similar titles from the local content similarity index, in the TMDB page format"""
+        try:
+            similar_movies = ContentSimilarityService.get_similar(movie, limit=SIMILAR_MOVIES_LIMIT)
+        except Exception as e:
+            print(f"MovieDetailView: Error loading similar movies: {str(e)}")  # Debug
+            similar_movies = []
+        
+        results = SimpleMovieSerializer(similar_movies, many=True).data
+        return {
+            'page': 1,
+            'results': results,
+            'total_pages': 1 if results else 0,
+            'total_results': len(results),
+        }
+    
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -357,6 +537,9 @@ class SearchView(generics.ListAPIView):
     - **page**: Page number for pagination
     
     The search is performed against TMDB's database and returns matching results.
+    With `SEARCH_BACKEND=local`, general searches use ranked full-text search (plus
+    trigram title similarity with `SEARCH_TRIGRAM`) over the local catalog first; the local catalog is also the fallback
+    whenever TMDB fails or returns nothing.
     """
     serializer_class = MovieSerializer
     permission_classes = [permissions.AllowAny]
@@ -419,6 +602,15 @@ class SearchView(generics.ListAPIView):
         
         tmdb_service = TMDBService()
         
+        # Serve general searches from the local catalog first when configured
+        if search_type == 'general' and settings.SEARCH_BACKEND == 'local':
+            local_data = LocalSearchService.search(query, page=page)
+            if local_data['results']:
+                print(f"SearchView: Local search returned {len(local_data['results'])} results for page {page}")  # Debug
+                self.tmdb_data = local_data
+                return local_data['results']
+            print("SearchView: No local results, falling back to TMDB")  # Debug
+        
         try:
             # Choose search method based on type
             if search_type == 'actor':
@@ -430,6 +622,13 @@ class SearchView(generics.ListAPIView):
             else:  # general search
                 print(f"SearchView: Performing general search for: '{query}'")  # Debug
                 data = tmdb_service.search_movies_and_tv(query, page=page)
+                if not data.get('results') and settings.SEARCH_BACKEND != 'local':
+                    # TMDB had nothing; try the local catalog (failures are handled below)
+                    local_data = LocalSearchService.search(query, page=page)
+                    if local_data['results']:
+                        print(f"SearchView: TMDB returned nothing, local search returned {len(local_data['results'])} results")  # Debug
+                        self.tmdb_data = local_data
+                        return local_data['results']
             
             print(f"SearchView: TMDB search returned {len(data.get('results', []))} results for page {page}")  # Debug
             
@@ -490,15 +689,17 @@ class SearchView(generics.ListAPIView):
             return ordered_movies
             
         except Exception as e:
+            # TMDBUnavailable lands here too: TMDB down, erroring or slower than SEARCH_TMDB_TIMEOUT
             print(f"SearchView: Error in search: {str(e)}")  # Debug
             import traceback
             print(f"SearchView: Full traceback: {traceback.format_exc()}")  # Debug
             
-            # Fallback to database search
+            # Fallback to ranked local search
             try:
-                fallback_results = Movie.objects.filter(title__icontains=query)
-                print(f"SearchView: Fallback search returned {fallback_results.count()} results")  # Debug
-                return fallback_results
+                fallback_data = LocalSearchService.search(query, page=page)
+                print(f"SearchView: Fallback search returned {fallback_data['total_results']} results")  # Debug
+                self.tmdb_data = fallback_data
+                return fallback_data['results']
             except Exception as fallback_error:
                 print(f"SearchView: Fallback search also failed: {str(fallback_error)}")  # Debug
                 return Movie.objects.none()
@@ -512,16 +713,18 @@ class SearchView(generics.ListAPIView):
             def sync_search_batch():
                 """Sync a batch of search results to database"""
                 synced_count = 0
-                for item in tmdb_results:
-                    try:
-                        if item.get('media_type') in ['movie', 'tv']:
-                            print(f"Background sync search: Syncing {item.get('title', item.get('name', 'Unknown'))}")  # Debug
-                            movie = tmdb_service.sync_movie_to_db(item)
-                            if movie:
-                                synced_count += 1
-                                print(f"Background sync search: Successfully synced {movie.title}")  # Debug
-                    except Exception as e:
-                        print(f"Background sync search: Error syncing movie {item.get('title', item.get('name', 'Unknown'))}: {e}")  # Debug
+                # One facet invalidation for the whole batch
+                with MovieCacheService.deferred_catalog_versions():
+                    for item in tmdb_results:
+                        try:
+                            if item.get('media_type') in ['movie', 'tv']:
+                                print(f"Background sync search: Syncing {item.get('title', item.get('name', 'Unknown'))}")  # Debug
+                                movie = tmdb_service.sync_movie_to_db(item)
+                                if movie:
+                                    synced_count += 1
+                                    print(f"Background sync search: Successfully synced {movie.title}")  # Debug
+                        except Exception as e:
+                            print(f"Background sync search: Error syncing movie {item.get('title', item.get('name', 'Unknown'))}: {e}")  # Debug
                 
                 print(f"Background sync search: Completed syncing {synced_count} movies")  # Debug
             
@@ -563,6 +766,22 @@ class SearchView(generics.ListAPIView):
             })
 
 
+LIBRARY_PAGE_PARAMETERS = [
+    openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor from a previous response's next_cursor", type=openapi.TYPE_STRING),
+    openapi.Parameter('page_size', openapi.IN_QUERY, description="Results per page (max 100)", type=openapi.TYPE_INTEGER, default=20),
+]
+
+LIBRARY_PAGE_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        'next': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+        'next_cursor': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+        'page_size': openapi.Schema(type=openapi.TYPE_INTEGER),
+    }
+)
+
+
 class FavoriteListView(generics.ListCreateAPIView):
     """
     Manage user favorites
@@ -574,16 +793,15 @@ class FavoriteListView(generics.ListCreateAPIView):
     """
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LibraryKeysetPagination
     
     @swagger_auto_schema(
-        operation_description="Get user's favorite movies",
+        operation_description="Get user's favorite movies, newest first",
+        manual_parameters=LIBRARY_PAGE_PARAMETERS,
         responses={
             200: openapi.Response(
                 description="List of favorite movies",
-                                 schema=openapi.Schema(
-                     type=openapi.TYPE_ARRAY,
-                     items=openapi.Schema(type=openapi.TYPE_OBJECT)
-                 )
+                schema=LIBRARY_PAGE_SCHEMA
             ),
             401: 'Unauthorized - Authentication required'
         }
@@ -600,15 +818,20 @@ class FavoriteListView(generics.ListCreateAPIView):
                 'movie_id': openapi.Schema(
                     type=openapi.TYPE_INTEGER,
                     description="TMDB ID of the movie to add to favorites"
+                ),
+                'media_type': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=['movie', 'tv'],
+                    description="Media type of the TMDB ID, used to fill in titles missing from the catalog"
                 )
             }
         ),
         responses={
             201: openapi.Response(
-                description="Movie added to favorites",
+                description="Movie added to favorites (adding it again moves it to the top)",
                 schema=openapi.Schema(type=openapi.TYPE_OBJECT)
             ),
-            400: 'Bad Request - Invalid movie ID or already in favorites',
+            400: 'Bad Request - Invalid movie ID',
             401: 'Unauthorized - Authentication required'
         }
     )
@@ -618,17 +841,16 @@ class FavoriteListView(generics.ListCreateAPIView):
     def get_queryset(self):
         print(f"FavoriteListView: User {self.request.user.email} requesting favorites")
         # Use select_related to fetch movie data in a single query
-        favorites = Favorite.objects.filter(user=self.request.user).select_related('movie')
-        print(f"FavoriteListView: Found {favorites.count()} favorites for user")
-        for fav in favorites:
-            print(f"FavoriteListView: Favorite - {fav.movie.title} (ID: {fav.movie.tmdb_id})")
-        return favorites
+        return Favorite.objects.filter(user=self.request.user).select_related('movie')
     
     def perform_create(self, serializer):
         print(f"FavoriteListView: Creating favorite for user {self.request.user.email}")
-        serializer.save(user=self.request.user)
+        favorite = serializer.save(user=self.request.user)
         # Clear user cache when favorites change
         MovieCacheService.clear_user_cache(self.request.user.id)
+        RecommendationService.record_interaction(self.request.user.id, [favorite.movie_id])
+        if serializer.created:
+            LocalTrendingService.record_event(favorite.movie_id, FAVORITE_EVENT)
 
 
 class FavoriteDetailView(generics.DestroyAPIView):
@@ -638,6 +860,10 @@ class FavoriteDetailView(generics.DestroyAPIView):
     
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        RecommendationService.record_interaction(self.request.user.id, [instance.movie_id])
 
 
 class FavoriteRemoveByMovieView(generics.DestroyAPIView):
@@ -648,6 +874,10 @@ class FavoriteRemoveByMovieView(generics.DestroyAPIView):
     def get_object(self):
         movie_id = self.kwargs.get('movie_id')
         return Favorite.objects.get(user=self.request.user, movie__tmdb_id=movie_id)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        RecommendationService.record_interaction(self.request.user.id, [instance.movie_id])
 
 
 class WatchlistListView(generics.ListCreateAPIView):
@@ -661,16 +891,15 @@ class WatchlistListView(generics.ListCreateAPIView):
     """
     serializer_class = WatchlistSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LibraryKeysetPagination
     
     @swagger_auto_schema(
-        operation_description="Get user's watchlist",
+        operation_description="Get user's watchlist, newest first",
+        manual_parameters=LIBRARY_PAGE_PARAMETERS,
         responses={
             200: openapi.Response(
                 description="List of watchlist movies",
-                                 schema=openapi.Schema(
-                     type=openapi.TYPE_ARRAY,
-                     items=openapi.Schema(type=openapi.TYPE_OBJECT)
-                 )
+                schema=LIBRARY_PAGE_SCHEMA
             ),
             401: 'Unauthorized - Authentication required'
         }
@@ -687,15 +916,20 @@ class WatchlistListView(generics.ListCreateAPIView):
                 'movie_id': openapi.Schema(
                     type=openapi.TYPE_INTEGER,
                     description="TMDB ID of the movie to add to watchlist"
+                ),
+                'media_type': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=['movie', 'tv'],
+                    description="Media type of the TMDB ID, used to fill in titles missing from the catalog"
                 )
             }
         ),
         responses={
             201: openapi.Response(
-                description="Movie added to watchlist",
+                description="Movie added to watchlist (adding it again moves it to the top)",
                 schema=openapi.Schema(type=openapi.TYPE_OBJECT)
             ),
-            400: 'Bad Request - Invalid movie ID or already in watchlist',
+            400: 'Bad Request - Invalid movie ID',
             401: 'Unauthorized - Authentication required'
         }
     )
@@ -705,17 +939,16 @@ class WatchlistListView(generics.ListCreateAPIView):
     def get_queryset(self):
         print(f"WatchlistListView: User {self.request.user.email} requesting watchlist")
         # Use select_related to fetch movie data in a single query
-        watchlist = Watchlist.objects.filter(user=self.request.user).select_related('movie')
-        print(f"WatchlistListView: Found {watchlist.count()} items in watchlist for user")
-        for item in watchlist:
-            print(f"WatchlistListView: Watchlist Item - {item.movie.title} (ID: {item.movie.tmdb_id})")
-        return watchlist
+        return Watchlist.objects.filter(user=self.request.user).select_related('movie')
     
     def perform_create(self, serializer):
         print(f"WatchlistListView: Creating watchlist item for user {self.request.user.email}")
-        serializer.save(user=self.request.user)
+        item = serializer.save(user=self.request.user)
         # Clear user cache when watchlist changes
         MovieCacheService.clear_user_cache(self.request.user.id)
+        RecommendationService.record_interaction(self.request.user.id, [item.movie_id])
+        if serializer.created:
+            LocalTrendingService.record_event(item.movie_id, WATCHLIST_EVENT)
 
 
 class WatchlistDetailView(generics.DestroyAPIView):
@@ -725,6 +958,10 @@ class WatchlistDetailView(generics.DestroyAPIView):
     
     def get_queryset(self):
         return Watchlist.objects.filter(user=self.request.user)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        RecommendationService.record_interaction(self.request.user.id, [instance.movie_id])
 
 
 class WatchlistRemoveByMovieView(generics.DestroyAPIView):
@@ -735,6 +972,80 @@ class WatchlistRemoveByMovieView(generics.DestroyAPIView):
     def get_object(self):
         movie_id = self.kwargs.get('movie_id')
         return Watchlist.objects.get(user=self.request.user, movie__tmdb_id=movie_id)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        RecommendationService.record_interaction(self.request.user.id, [instance.movie_id])
+
+
+BULK_LIBRARY_REQUEST = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'add': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER), description="TMDB ids to add"),
+        'remove': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER), description="TMDB ids to remove"),
+        'media_type': openapi.Schema(type=openapi.TYPE_STRING, enum=['movie', 'tv'], description="Media type of the added ids; unknown movie ids are filled in from TMDB only when this is 'movie'"),
+    }
+)
+
+BULK_LIBRARY_RESPONSES = {
+    200: openapi.Response(
+        description="TMDB ids actually added and removed; ids already present or absent are skipped",
+        schema=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'added': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                'removed': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+            }
+        )
+    ),
+    400: 'Bad Request - Malformed id lists, too many operations or too many ids outside the catalog',
+    401: 'Unauthorized - Authentication required'
+}
+
+
+def _bulk_library_update(request, model, weight):
+    add = parse_operation_ids(request.data.get('add'))
+    remove = parse_operation_ids(request.data.get('remove'))
+    if add is None or remove is None:
+        return Response({'error': 'add and remove must be lists of TMDB ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(add) + len(remove) > MAX_BULK_OPERATIONS:
+        return Response({'error': f'At most {MAX_BULK_OPERATIONS} operations per request'}, status=status.HTTP_400_BAD_REQUEST)
+    media_type = request.data.get('media_type')
+    if media_type not in (None, 'movie', 'tv'):
+        return Response({'error': "media_type must be 'movie' or 'tv'"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        added, removed = LibraryService.apply(model, request.user, add, remove, weight, media_type=media_type)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    print(f"{model.__name__} bulk update for user {request.user.email}: +{len(added)} -{len(removed)}")  # Debug
+    return Response({'added': added, 'removed': removed}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Add and remove many favorites in one request",
+    request_body=BULK_LIBRARY_REQUEST,
+    responses=BULK_LIBRARY_RESPONSES
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def favorites_bulk(request):
+    """Apply a list of favorite adds and removes"""
+    return _bulk_library_update(request, Favorite, FAVORITE_EVENT)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_description="Add and remove many watchlist titles in one request",
+    request_body=BULK_LIBRARY_REQUEST,
+    responses=BULK_LIBRARY_RESPONSES
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def watchlist_bulk(request):
+    """Apply a list of watchlist adds and removes"""
+    return _bulk_library_update(request, Watchlist, WATCHLIST_EVENT)
 
 
 class MovieRatingView(generics.CreateAPIView, generics.UpdateAPIView):
@@ -773,7 +1084,7 @@ class MovieRatingView(generics.CreateAPIView, generics.UpdateAPIView):
         ),
         responses={
             201: openapi.Response(
-                description="Rating created successfully",
+                description="Rating created, or updated if the movie was already rated",
                 schema=openapi.Schema(type=openapi.TYPE_OBJECT)
             ),
             400: 'Bad Request - Invalid rating or movie ID',
@@ -819,10 +1130,46 @@ class MovieRatingView(generics.CreateAPIView, generics.UpdateAPIView):
     
     def perform_create(self, serializer):
         movie_id = self.kwargs.get('movie_id')
-        movie = Movie.objects.get(tmdb_id=movie_id)
-        serializer.save(user=self.request.user, movie=movie)
+        # The URL names the movie; the upsert creates a placeholder if it isn't in the catalog yet
+        rating = serializer.save(user=self.request.user, movie_id=movie_id)
         # Clear movie cache when ratings change
         MovieCacheService.clear_movie_cache(movie_id)
+        RecommendationService.record_interaction(self.request.user.id, [rating.movie_id])
+        if serializer.created:
+            LocalTrendingService.record_event(rating.movie_id, RATING_EVENT)
+    
+    def perform_update(self, serializer):
+        rating = serializer.save()
+        MovieCacheService.clear_movie_cache(rating.movie.tmdb_id)
+        RecommendationService.record_interaction(self.request.user.id, [rating.movie_id])
+
+
+class RatingListView(generics.ListAPIView):
+    """
+    List the user's ratings, newest first
+    
+    Cursor paginated like favorites and watchlist. Requires authentication.
+    """
+    serializer_class = UserRatingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LibraryKeysetPagination
+    
+    @swagger_auto_schema(
+        operation_description="Get user's movie ratings, newest first",
+        manual_parameters=LIBRARY_PAGE_PARAMETERS,
+        responses={
+            200: openapi.Response(
+                description="List of ratings with their movies",
+                schema=LIBRARY_PAGE_SCHEMA
+            ),
+            401: 'Unauthorized - Authentication required'
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        return MovieRating.objects.filter(user=self.request.user).select_related('movie')
 
 
 @swagger_auto_schema(
@@ -864,6 +1211,338 @@ def genres_list(request):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get title counts per genre, decade, language and media type for the current browse filters",
+    manual_parameters=[
+        openapi.Parameter('media_type', openapi.IN_QUERY, description="'movie' or 'tv'", type=openapi.TYPE_STRING),
+        openapi.Parameter('genre_ids', openapi.IN_QUERY, description="Comma-separated genre IDs", type=openapi.TYPE_STRING),
+        openapi.Parameter('genre_match', openapi.IN_QUERY, description="'all' (default) or 'any'", type=openapi.TYPE_STRING, enum=['all', 'any']),
+        openapi.Parameter('original_language', openapi.IN_QUERY, description="ISO 639-1 language code", type=openapi.TYPE_STRING),
+        openapi.Parameter('year_from', openapi.IN_QUERY, description="Earliest release year", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('year_to', openapi.IN_QUERY, description="Latest release year", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('min_vote_average', openapi.IN_QUERY, description="Minimum vote average", type=openapi.TYPE_NUMBER),
+        openapi.Parameter('min_vote_count', openapi.IN_QUERY, description="Minimum vote count", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('min_runtime', openapi.IN_QUERY, description="Minimum runtime in minutes", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('max_runtime', openapi.IN_QUERY, description="Maximum runtime in minutes", type=openapi.TYPE_INTEGER),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Facet counts; each facet ignores its own filter",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'total': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'genres': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'decades': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'languages': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'media_types': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def catalog_facets(request):
+    """Get facet counts over the local catalog for discover filters"""
+    filters = parse_browse_filters(request.query_params)
+    return Response(CatalogFacetService.get_facets(filters), status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Every home page section (trending, top rated, popular) and the genre list in one response",
+    responses={
+        200: openapi.Response(
+            description="Sections list TMDB ids; each movie appears once in `movies`, keyed by TMDB id",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'sections': openapi.Schema(type=openapi.TYPE_OBJECT, description="Section -> {results: [tmdb_id], total_results}"),
+                    'movies': openapi.Schema(type=openapi.TYPE_OBJECT, description="TMDB id -> movie"),
+                    'genres': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def home_feed(request):
+    """Composite home feed; the whole response is cached for anonymous users"""
+    # Authenticated responses carry per-user favorite/watchlist/rating flags
+    anonymous = not request.user.is_authenticated
+    if anonymous:
+        try:
+            cached = cache.get(HOME_CACHE_KEY)
+        except Exception as e:
+            print(f"⚠️ Home feed cache error: {e}")
+            cached = None
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+    
+    sections, genres = HomeFeedService.get_sections()
+    unique_movies = {}
+    for movies, _ in sections.values():
+        for movie in movies:
+            unique_movies.setdefault(movie.tmdb_id, movie)
+    # Serialized without the request so per-user flags are filled in bulk, not three queries per movie
+    serialized = _add_user_flags(request.user, MovieSerializer(list(unique_movies.values()), many=True).data)
+    
+    data = {
+        'sections': {
+            section: {
+                'results': [movie.tmdb_id for movie in sections[section][0]],
+                'total_results': sections[section][1],
+            }
+            for section in HOME_SECTIONS
+        },
+        'movies': {str(item['tmdb_id']): item for item in serialized},
+        'genres': genres,
+    }
+    
+    if anonymous:
+        try:
+            cache.set(HOME_CACHE_KEY, data, HOME_CACHE_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Home feed cache error: {e}")
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Look up many movies by TMDB id in one request; ids outside the local catalog are fetched from TMDB for authenticated users who pass `media_type`",
+    manual_parameters=[
+        openapi.Parameter('ids', openapi.IN_QUERY, description=f"Comma-separated TMDB ids (at most {MAX_BATCH_IDS})", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter('media_type', openapi.IN_QUERY, description="Media type of the ids; TMDB movie and TV ids overlap, so unknown ids are only fetched from TMDB when this is set", type=openapi.TYPE_STRING, enum=['movie', 'tv']),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Movies in request order, plus the ids that couldn't be resolved",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                    'missing': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                }
+            )
+        ),
+        400: 'Bad Request - No ids, too many ids or an invalid media_type'
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def movie_batch(request):
+    """Movies for a list of TMDB ids, in request order"""
+    tmdb_ids = parse_tmdb_ids(request.query_params.get('ids'))
+    if not tmdb_ids:
+        return Response({'error': 'ids must be a comma-separated list of TMDB ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(tmdb_ids) > MAX_BATCH_IDS:
+        return Response({'error': f'At most {MAX_BATCH_IDS} ids per request'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    media_type = request.query_params.get('media_type')
+    if media_type not in (None, 'movie', 'tv'):
+        return Response({'error': "media_type must be 'movie' or 'tv'"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Anonymous callers can't make the server fetch from TMDB on their behalf
+    found = MovieBatchService.get_movies(tmdb_ids, fill_from_tmdb=request.user.is_authenticated, media_type=media_type)
+    
+    # Per-user fields for every movie at once instead of three queries per movie
+    results = _add_user_flags(request.user, [dict(found[tmdb_id]) for tmdb_id in tmdb_ids if tmdb_id in found])
+    
+    return Response({
+        'results': results,
+        'missing': [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in found],
+    }, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Personalized recommendations from the user's favorites, watchlist, ratings and favorite genres",
+    manual_parameters=[
+        openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER, default=1),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Recommended movies in the TMDB page format, each with a `score`",
+            schema=openapi.Schema(type=openapi.TYPE_OBJECT)
+        ),
+        401: 'Unauthorized - Authentication required'
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def recommendations(request):
+    """Ranked "for you" list, served from the user's cached recommendations"""
+    page = max(_parse_number(request.query_params.get('page'), int) or 1, 1)
+    page_size = RECOMMENDATIONS_PAGE_SIZE
+    
+    entries, total_results = RecommendationService.get_recommendations(
+        request.user.id, limit=page_size, offset=(page - 1) * page_size
+    )
+    movies = Movie.objects.in_bulk([movie_id for movie_id, _ in entries])
+    
+    results = []
+    for movie_id, score in entries:
+        if movie_id in movies:
+            data = SimpleMovieSerializer(movies[movie_id]).data
+            data['score'] = round(score, 4)
+            results.append(data)
+    
+    return Response({
+        'page': page,
+        'results': results,
+        'total_pages': (total_results + page_size - 1) // page_size,
+        'total_results': total_results,
+    }, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Movies most often liked by the same users, from the precomputed item neighbour table",
+    manual_parameters=[
+        openapi.Parameter('limit', openapi.IN_QUERY, description="Number of neighbours (1-50)", type=openapi.TYPE_INTEGER, default=20),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Item neighbours",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'tmdb_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT, description="Movie with a similarity `score`")
+                    )
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def movie_neighbors(request, tmdb_id):
+    """Collaborative filtering neighbours of a movie"""
+    limit = _parse_number(request.query_params.get('limit'), int) or 20
+    limit = min(max(limit, 1), 50)
+    
+    entries = ItemNeighborService.get_neighbors(tmdb_id, limit=limit)
+    # Serialized without the request; per-user flags are filled in bulk below
+    results = MovieSerializer([entry.neighbor for entry in entries], many=True).data
+    for data, entry in zip(results, entries):
+        data['score'] = round(entry.score, 4)
+    return Response({'tmdb_id': tmdb_id, 'results': _add_user_flags(request.user, results)}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Typeahead title suggestions for a prefix, ordered by popularity",
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, description="Typed prefix", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter('limit', openapi.IN_QUERY, description=f"Number of suggestions (max {MAX_SUGGESTIONS})", type=openapi.TYPE_INTEGER, default=MAX_SUGGESTIONS),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Title suggestions",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'query': openapi.Schema(type=openapi.TYPE_STRING),
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'tmdb_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'title': openapi.Schema(type=openapi.TYPE_STRING),
+                                'media_type': openapi.Schema(type=openapi.TYPE_STRING),
+                                'poster_path': openapi.Schema(type=openapi.TYPE_STRING, nullable=True),
+                                'release_year': openapi.Schema(type=openapi.TYPE_INTEGER, nullable=True),
+                            }
+                        )
+                    )
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def suggest_titles(request):
+    """Typeahead suggestions from the prefix index"""
+    query = request.query_params.get('q', '')
+    limit = _parse_number(request.query_params.get('limit'), int) or MAX_SUGGESTIONS
+    results = SuggestionIndex.suggest(query, limit=max(limit, 1))
+    return Response({'query': query, 'results': results}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get the most frequently searched queries (admin only)",
+    manual_parameters=[
+        openapi.Parameter(
+            'limit',
+            openapi.IN_QUERY,
+            description="Number of queries to return (max 50)",
+            type=openapi.TYPE_INTEGER,
+            default=10
+        ),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Popular search queries",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'query': openapi.Schema(type=openapi.TYPE_STRING),
+                                'type': openapi.Schema(type=openapi.TYPE_STRING),
+                                'count': openapi.Schema(type=openapi.TYPE_INTEGER)
+                            }
+                        )
+                    )
+                }
+            )
+        ),
+        403: 'Forbidden - Admin access required'
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def popular_searches(request):
+    """Get the most frequently searched queries; raw user search text, so admins only"""
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    
+    tmdb_service = TMDBService()
+    return Response({'results': tmdb_service.get_popular_searches(limit=limit)}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get cache statistics including query string canonicalization metrics (admin only)",
+    responses={
+        200: openapi.Response(
+            description="Cache statistics",
+            schema=openapi.Schema(type=openapi.TYPE_OBJECT)
+        ),
+        403: 'Forbidden - Admin access required'
+    }
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_stats(request):
+    """Get cache statistics for monitoring"""
+    return Response(CacheStats.get_cache_stats(), status=status.HTTP_200_OK)
+
+
 @swagger_auto_schema(
     method='get',
     operation_description="Test API endpoint to verify API is working",
@@ -13,6 +13,7 @@ from .serializers import (
     PasswordChangeSerializer
 )
 from .models import User, UserProfile
+from movies.recommendations import RecommendationService
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -202,6 +203,13 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         return self.request.user.profile
+    
+    def perform_update(self, serializer):
+        previous_genres = serializer.instance.favorite_genres
+        super().perform_update(serializer)
+        # Genre-based lists are stale once the favorite genres change
+        if serializer.instance.favorite_genres != previous_genres:
+            RecommendationService.invalidate(self.request.user.id)
 
 
 @swagger_auto_schema(
@@ -17,6 +17,7 @@ interface MovieCardProps {
     vote_average?: number;
     release_date?: string;
     first_air_date?: string;
+    media_type?: 'movie' | 'tv';
   };
   onFavoriteToggle?: () => void;
   onWatchlistToggle?: () => void;
@@ -492,7 +493,7 @@ const MovieCard = ({ movie, onFavoriteToggle, onWatchlistToggle }: MovieCardProp
       if (isFavorite) {
         await movieAPI.removeFromFavoritesByMovie(movie.tmdb_id);
       } else {
-        await movieAPI.addToFavorites(movie.tmdb_id);
+        await movieAPI.addToFavorites(movie.tmdb_id, movie.media_type || (movie.first_air_date ? 'tv' : undefined));
       }
       
       console.log('Favorite toggle completed, clearing cache...');
@@ -549,7 +550,7 @@ const MovieCard = ({ movie, onFavoriteToggle, onWatchlistToggle }: MovieCardProp
       if (isInWatchlist) {
         await movieAPI.removeFromWatchlistByMovie(movie.tmdb_id);
       } else {
-        await movieAPI.addToWatchlist(movie.tmdb_id);
+        await movieAPI.addToWatchlist(movie.tmdb_id, movie.media_type || (movie.first_air_date ? 'tv' : undefined));
       }
       
       // Clear watchlist cache to ensure fresh data
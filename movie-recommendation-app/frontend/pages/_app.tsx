@@ -6,7 +6,7 @@ import Layout from '@/components/Layout';
 import SplashScreen from '@/components/SplashScreen';
 import { theme } from '@/styles/theme';
 import GlobalStyle from '@/styles/GlobalStyle';
-import { fetchTrendingMovies, fetchTopRatedMovies, fetchPopularMovies, warmCache } from '@/utils/api';
+import { fetchHomeSections } from '@/utils/api';
 import { setGlobalErrorHandler, checkTokenExpiration } from '@/utils/api';
 import { initializeSettings } from '@/utils/settings';
 import { initializeLanguageSystem } from '@/utils/translations';
@@ -162,15 +162,8 @@ export default function App({ Component, pageProps }: AppProps) {
         setStatus('Loading trending movies...');
         setPreloadProgress(40);
 
-        // Start all API calls in parallel but don't await them
-        const trendingPromise = fetchTrendingMovies();
-        const topRatedPromise = fetchTopRatedMovies();
-        const popularPromise = fetchPopularMovies();
-        
-        // Also warm the cache for better performance
-        warmCache().catch(error => {
-          console.error('Cache warming failed:', error);
-        });
+        // One composite request for every home section, not awaited
+        const homePromise = fetchHomeSections();
 
         setStatus('Loading top rated movies...');
         setPreloadProgress(70);
@@ -193,8 +186,8 @@ export default function App({ Component, pageProps }: AppProps) {
         }, 1000); // Reduced from 1.5 seconds to 1 second for better perceived performance
 
         // Continue loading content in background
-        Promise.all([trendingPromise, topRatedPromise, popularPromise])
-          .then(([trending, topRated, popular]) => {
+        homePromise
+          .then(({ trending, topRated, popular }) => {
             // Store preloaded content globally and in session storage
             preloadedContent.trending = trending;
             preloadedContent.topRated = topRated;
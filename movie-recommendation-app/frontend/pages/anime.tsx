@@ -186,16 +186,11 @@ export default function Anime({ isSidebarOpen }: { isSidebarOpen?: boolean }) {
 
     setLoading(true);
     try {
-      const data = await movieAPI.getMovies({ type: 'movies', page });
+      // Japanese animation, filtered and ranked by the backend
+      const data = await movieAPI.getMovies({ type: 'anime', page });
       
       if (data?.results?.length) {
-        // Filter for animation genre (ID: 16)
-        const animeMovies = data.results.filter((movie: {
-          id: number;
-          genre_ids?: number[];
-        }) => 
-          movie.genre_ids?.includes(16)
-        );
+        const animeMovies = data.results;
         
         setMovies(prev => {
           const existingIds = new Set(prev.map((m: { id: number }) => m.id));
@@ -3,7 +3,7 @@ import { useRouter } from 'next/router';
 import styled from 'styled-components';
 import dynamic from 'next/dynamic';
 import Hero from '@/components/Hero';
-import { movieAPI } from '@/utils/api';
+import { movieAPI, expandHomeFeed } from '@/utils/api';
 import { 
   MdMovie, 
   MdTrendingUp, 
@@ -573,16 +573,16 @@ export default function Home({ isSidebarOpen = false }: { isSidebarOpen?: boolea
 
 
 
-  // Optimized content loading - use single trending call for both featured and trending
+  // Optimized content loading - every home section from one composite request
   const loadAllContentOptimized = async () => {
     try {
       console.log('Loading all content with optimization...');
       
-      // Load trending and top rated in parallel
-      const [trendingData, topRatedData] = await Promise.all([
-        movieAPI.getMovies({ type: 'trending', page: 1 }),
-        movieAPI.getMovies({ type: 'top_rated', page: 1 })
-      ]);
+      const feed = await movieAPI.getHomeFeed();
+      if (feed?.error) {
+        throw new Error(`Home feed failed: ${feed.error}`);
+      }
+      const { trending: trendingData, topRated: topRatedData } = expandHomeFeed(feed);
       
       if (trendingData?.results?.length) {
         const trendingMovies = trendingData.results.slice(0, 21);
@@ -619,23 +619,16 @@ export default function Home({ isSidebarOpen = false }: { isSidebarOpen?: boolea
           return; // Content already loaded from cache
         }
         
-        // Test API connectivity first
+        // Use optimized content loading; a failure here also means the server is unreachable
         try {
-          const testResponse = await movieAPI.getMovies({ type: 'trending', page: 1 });
-          console.log('API test response received');
-          if (testResponse.error) {
-            throw new Error(`API test failed: ${testResponse.error}`);
-          }
-        } catch (apiTestError) {
-          console.error('API connectivity test failed:', apiTestError);
+          await loadAllContentOptimized();
+        } catch (apiError) {
+          console.error('Home feed request failed:', apiError);
           setError('Cannot connect to the server. Please make sure the backend is running.');
           setLoading(false);
           return;
         }
         
-        // Use optimized content loading
-        await loadAllContentOptimized();
-        
         const endTime = performance.now();
         console.log(`All content loaded successfully in ${(endTime - startTime).toFixed(2)}ms`);
       } catch (err) {
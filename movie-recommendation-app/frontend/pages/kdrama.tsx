@@ -175,15 +175,11 @@ export default function KDrama({ isSidebarOpen }: { isSidebarOpen?: boolean }) {
 
     setLoading(true);
     try {
-      const data = await movieAPI.getMovies({ type: 'tv', page });
+      // Korean drama series, filtered and ranked by the backend
+      const data = await movieAPI.getMovies({ type: 'kdrama', page });
       
       if (data?.results?.length) {
-        // Filter for Korean dramas (genre ID: 10768 for Korean TV shows)
-        const kdramaShows = data.results.filter((show: any) => 
-          show.genre_ids?.includes(10768) || 
-          show.original_language === 'ko' ||
-          (show.title && show.title.toLowerCase().includes('korean'))
-        );
+        const kdramaShows: TMDBMovie[] = data.results;
         
         setShows(prev => {
           const existingIds = new Set(prev.map((s: TMDBMovie) => s.id));
@@ -261,14 +261,8 @@ export const clearMovieDetailsCache = () => {
 // Cache warming function to preload popular data
 export const warmCache = async () => {
   try {
-    // Preload trending movies
-    await fetchTrendingMovies();
-    
-    // Preload top rated movies
-    await fetchTopRatedMovies();
-    
-    // Preload popular movies
-    await fetchPopularMovies();
+    // Preload every home section in one request
+    await fetchHomeSections();
     
     console.log('Cache warmed successfully');
   } catch (error) {
@@ -663,7 +657,7 @@ export const authAPI = {
 export const movieAPI = {
   // Get movies with filtering
   getMovies: async (params: {
-    type?: 'trending' | 'top_rated' | 'movies' | 'tv';
+    type?: 'trending' | 'top_rated' | 'movies' | 'tv' | 'anime' | 'kdrama';
     page?: number;
     search?: string;
     media_type?: 'movie' | 'tv';
@@ -690,6 +684,11 @@ export const movieAPI = {
     }
   },
 
+  // Every home section in one response: sections list TMDB ids, movies are keyed by TMDB id
+  getHomeFeed: async () => {
+    return await apiRequest('/movies/home/');
+  },
+
   // Search movies and TV shows
   searchMovies: async (query: string, page: number = 1, searchType: 'general' | 'actor' | 'genre' = 'general') => {
     try {
@@ -728,6 +727,16 @@ export const movieAPI = {
     return response;
   },
 
+  // Look up many movies by TMDB id in one request; results come back in request order.
+  // TMDB movie and TV ids overlap, so ids outside the catalog are only fetched when mediaType is given
+  getMoviesBatch: async (tmdbIds: number[], mediaType?: 'movie' | 'tv') => {
+    if (!tmdbIds.length) {
+      return { results: [], missing: [] };
+    }
+    const mediaTypeParam = mediaType ? `&media_type=${mediaType}` : '';
+    return await apiRequest(`/movies/batch/?ids=${tmdbIds.join(',')}${mediaTypeParam}`);
+  },
+
   // Get genres
   getGenres: async () => {
     const response = await apiRequest('/movies/genres/');
@@ -741,16 +750,16 @@ export const movieAPI = {
   },
 
   // Get favorites
-  getFavorites: async () => {
+  getFavorites: async (cursor?: string) => {
     try {
-      // Use a shorter cache duration for user-specific data
+      // Use a shorter cache duration for user-specific data; later pages are cursor-paginated and not cached
       const cacheKey = `favorites:${getAuthToken()}`;
-      const cached = getCachedResponse(cacheKey);
+      const cached = cursor ? null : getCachedResponse(cacheKey);
       if (cached) {
         return cached;
       }
       
-      const response = await apiRequest('/movies/favorites/');
+      const response = await apiRequest(cursor ? `/movies/favorites/?cursor=${encodeURIComponent(cursor)}` : '/movies/favorites/');
       
       // Return empty array if there was an error
       if (response && response.error) {
@@ -758,7 +767,9 @@ export const movieAPI = {
       }
       
       // Cache the response for 2 minutes (shorter than general cache)
-      setCachedResponse(cacheKey, response);
+      if (!cursor) {
+        setCachedResponse(cacheKey, response);
+      }
       
       return response;
     } catch (error) {
@@ -768,11 +779,11 @@ export const movieAPI = {
   },
 
   // Add to favorites
-  addToFavorites: async (movieId: number) => {
+  addToFavorites: async (movieId: number, mediaType?: 'movie' | 'tv') => {
     try {
       const response = await apiRequest('/movies/favorites/', {
         method: 'POST',
-        body: JSON.stringify({ movie_id: movieId }),
+        body: JSON.stringify({ movie_id: movieId, media_type: mediaType }),
       });
       
       // Check if response has error property
@@ -847,17 +858,32 @@ export const movieAPI = {
     }
   },
 
+  // Add and remove many favorites in one request
+  updateFavoritesBulk: async (add: number[], remove: number[] = [], mediaType?: 'movie' | 'tv') => {
+    const response = await apiRequest('/movies/favorites/bulk/', {
+      method: 'POST',
+      body: JSON.stringify({ add, remove, media_type: mediaType }),
+    });
+    
+    if (response && response.error) {
+      return { error: response.error, errorTitle: response.errorTitle };
+    }
+    
+    cache.delete(`favorites:${getAuthToken()}`);
+    return response;
+  },
+
   // Watchlist
-  getWatchlist: async () => {
+  getWatchlist: async (cursor?: string) => {
     try {
-      // Use a shorter cache duration for user-specific data
+      // Use a shorter cache duration for user-specific data; later pages are cursor-paginated and not cached
       const cacheKey = `watchlist:${getAuthToken()}`;
-      const cached = getCachedResponse(cacheKey);
+      const cached = cursor ? null : getCachedResponse(cacheKey);
       if (cached) {
         return cached;
       }
       
-      const response = await apiRequest('/movies/watchlist/');
+      const response = await apiRequest(cursor ? `/movies/watchlist/?cursor=${encodeURIComponent(cursor)}` : '/movies/watchlist/');
       
       // Return empty array if there was an error
       if (response && response.error) {
@@ -865,7 +891,9 @@ export const movieAPI = {
       }
       
       // Cache the response for 2 minutes (shorter than general cache)
-      setCachedResponse(cacheKey, response);
+      if (!cursor) {
+        setCachedResponse(cacheKey, response);
+      }
       
       return response;
     } catch (error) {
@@ -874,11 +902,11 @@ export const movieAPI = {
     }
   },
 
-  addToWatchlist: async (movieId: number) => {
+  addToWatchlist: async (movieId: number, mediaType?: 'movie' | 'tv') => {
     try {
       const response = await apiRequest('/movies/watchlist/', {
         method: 'POST',
-        body: JSON.stringify({ movie_id: movieId }),
+        body: JSON.stringify({ movie_id: movieId, media_type: mediaType }),
       });
       
       // Check if response has error property
@@ -953,13 +981,38 @@ export const movieAPI = {
     }
   },
 
+  // Add and remove many watchlist titles in one request
+  updateWatchlistBulk: async (add: number[], remove: number[] = [], mediaType?: 'movie' | 'tv') => {
+    const response = await apiRequest('/movies/watchlist/bulk/', {
+      method: 'POST',
+      body: JSON.stringify({ add, remove, media_type: mediaType }),
+    });
+    
+    if (response && response.error) {
+      return { error: response.error, errorTitle: response.errorTitle };
+    }
+    
+    cache.delete(`watchlist:${getAuthToken()}`);
+    return response;
+  },
+
   // Ratings
-  rateMovie: async (movieId: number, rating: number, review?: string) => {
+  // The user's ratings, newest first; pass the previous response's next_cursor for the next page
+  getRatings: async (cursor?: string) => {
+    const response = await apiRequest(cursor ? `/movies/ratings/?cursor=${encodeURIComponent(cursor)}` : '/movies/ratings/');
+    if (response && response.error) {
+      return { results: [], next_cursor: null };
+    }
+    return response;
+  },
+
+  rateMovie: async (movieId: number, rating: number, review?: string, mediaType?: 'movie' | 'tv') => {
     try {
       const response = await apiRequest(`/movies/${movieId}/rate/`, {
         method: 'POST',
         body: JSON.stringify({ 
           movie_id: movieId,
+          media_type: mediaType,
           rating,
           review: review || '',
         }),
@@ -1056,6 +1109,32 @@ export const fetchPopularMovies = async () => {
   }
 };
 
+// Expand the home feed's id references into the { results, total_results } shape of list responses
+export const expandHomeFeed = (feed: any) => {
+  const section = (name: string) => {
+    const ids: number[] = feed?.sections?.[name]?.results || [];
+    return {
+      results: ids.map(id => feed.movies[String(id)]).filter(Boolean),
+      total_results: feed?.sections?.[name]?.total_results || 0,
+    };
+  };
+  return {
+    trending: section('trending'),
+    topRated: section('top_rated'),
+    popular: section('popular'),
+    genres: feed?.genres || [],
+  };
+};
+
+export const fetchHomeSections = async () => {
+  try {
+    return expandHomeFeed(await movieAPI.getHomeFeed());
+  } catch (error) {
+    console.log('Home feed preload timeout, returning empty results');
+    return expandHomeFeed(null);
+  }
+};
+
 // Global error handler
 let globalErrorHandler: ((title: string, message: string, type?: 'error' | 'warning' | 'info') => void) | null = null;
 